@@ -0,0 +1,109 @@
+"""Dispatch benchmark against the local OBS stand-in (obs_standin).
+
+Sends --actions actions through the threaded and the asyncio core and
+reports throughput and send-to-ack latency. The drop and auth-failure rates
+exercise the reconnect and retry paths, whose waits show up in 'reconnect'.
+
+    python benchmarks/bench_dispatch.py [--actions 500] [--latency-ms 1] [--drop-rate 0.01]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from obs_standin import StandInOBS
+
+ACTIONS = ("Start Streaming", "Stop Streaming", "Start Recording", "Stop Recording")
+
+
+def write_config(directory, host, port, password):
+    path = os.path.join(directory, "obs_scheduler_config.json")
+    with open(path, "w") as f:
+        json.dump({"host": host, "port": port, "password": password, "retry_window_seconds": 30, "tasks": []}, f)
+    return path
+
+
+def quiet(message):
+    pass
+
+
+def wait_for(core, count, timeout=60):
+    # Queued retries finish on the connection thread
+    deadline = time.time() + timeout
+    while sum(core.metrics.result_counts().values()) < count and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def bench_threaded(config, count):
+    from obs_core import OBSSchedulerCore
+    core = OBSSchedulerCore(config, log_callback=quiet)
+    try:
+        core.connect_obs()
+        start = time.perf_counter()
+        for i in range(count):
+            core.execute_action(ACTIONS[i % len(ACTIONS)])
+        wait_for(core, count)
+        return time.perf_counter() - start, core.latency_stats()
+    finally:
+        core.shutdown()
+
+
+def bench_async(config, count):
+    from obs_async import AsyncOBSSchedulerCore
+
+    async def run():
+        core = AsyncOBSSchedulerCore(config, log_callback=quiet)
+        try:
+            await core.connect_obs()
+            start = time.perf_counter()
+            for i in range(count):
+                await core.execute_action(ACTIONS[i % len(ACTIONS)])
+            return time.perf_counter() - start, core.latency_stats()
+        finally:
+            await core.shutdown()
+    return asyncio.run(run())
+
+
+def report(name, elapsed, stats, count):
+    stages = next(iter(stats["by_host"].values()), {}) # one host: the stand-in
+    print(f"{name:<9} {count / elapsed:8.0f} actions/s", end="")
+    for stage in ("ack", "reconnect"):
+        summary = stages.get(stage, {})
+        if summary.get("count"):
+            print(f"  {stage} p50 {summary['p50'] * 1000:.2f} ms p99 {summary['p99'] * 1000:.2f} ms", end="")
+    print(f"  results {stats['results']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--actions", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--auth-failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    server = StandInOBS(password="bench", latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                        drop_rate=args.drop_rate, auth_failure_rate=args.auth_failure_rate, seed=args.seed)
+    host, port = server.start_in_thread()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            config = write_config(directory, host, port, "bench")
+            elapsed, stats = bench_threaded(config, args.actions)
+            report("threaded", elapsed, stats, args.actions)
+            elapsed, stats = bench_async(config, args.actions)
+            report("asyncio", elapsed, stats, args.actions)
+        print(f"stand-in  {server.stats}")
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
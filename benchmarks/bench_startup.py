@@ -0,0 +1,165 @@
+"""Startup latency benchmark for the headless service and the GUI.
+
+Measures, each in a fresh interpreter:
+  import   - time to 'import obs_core'
+  headless - 'python -m obs_core run' until the config watcher is live
+  gui      - main.py until the window is shown, and until all jobs are scheduled
+
+Exits with status 1 if any measurement exceeds its budget. The GUI part is
+skipped when no display is available.
+
+    python benchmarks/bench_startup.py [--tasks 500] [--runs 5]
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds, median of --runs
+BUDGETS = {
+    "import": 0.15,
+    "headless": 0.5,
+    "gui_window": 1.0,
+    "gui_scheduled": 1.5,
+}
+
+GUI_PROBE = r"""
+import json, sys, time
+start = time.perf_counter()
+import tkinter as tk
+try:
+    root = tk.Tk()
+except tk.TclError as e:
+    print(json.dumps({"skipped": str(e)}))
+    sys.exit(0)
+import obs_core
+obs_core.setup_logging(sys.argv[1])
+import main
+result = {}
+
+def window_shown():
+    result["gui_window"] = time.perf_counter() - start
+    poll()
+
+def poll():
+    if app.core.scheduler.job_count() >= int(sys.argv[2]):
+        result["gui_scheduled"] = time.perf_counter() - start
+        print(json.dumps(result))
+        root.destroy()
+    else:
+        root.after(1, poll)
+
+root.bind("<Map>", lambda e: e.widget is root and "gui_window" not in result and window_shown())
+# Reads obs_scheduler_config.json from the working directory
+app = main.OBSSchedulerApp(root)
+root.mainloop()
+"""
+
+
+def write_config(directory, task_count):
+    tasks = []
+    for i in range(task_count):
+        t = f"{i % 24:02d}:{i % 60:02d}:00"
+        if i % 2:
+            tasks.append({"time": t, "action": "Start Recording", "type": "daily", "enabled": True})
+        else:
+            tasks.append({"time": t, "action": "Stop Recording", "type": "weekly", "days": ["mon", "wed", "fri"], "enabled": True})
+    path = os.path.join(directory, "obs_scheduler_config.json")
+    with open(path, "w") as f:
+        json.dump({"host": "localhost", "port": "4455", "password": "", "auto_connect": False, "tasks": tasks}, f)
+    return path
+
+
+def job_total(task_count):
+    # One job per daily or weekly task
+    return task_count
+
+
+def env():
+    environ = dict(os.environ, PYTHONUNBUFFERED="1")
+    environ["PYTHONPATH"] = ROOT + os.pathsep + environ.get("PYTHONPATH", "")
+    return environ
+
+
+def measure_import():
+    out = subprocess.run(
+        [sys.executable, "-c", "import time; t = time.perf_counter(); import obs_core; print(time.perf_counter() - t)"],
+        capture_output=True, text=True, env=env(), cwd=ROOT, check=True
+    )
+    return float(out.stdout.strip())
+
+
+def measure_headless(config, log_file):
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "obs_core", "run", "--config", config, "--log-file", log_file],
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env(), cwd=os.path.dirname(config)
+    )
+    try:
+        for line in proc.stdout:
+            if line.startswith("Watching "):
+                return time.perf_counter() - start
+        raise RuntimeError(f"headless service exited early (status {proc.wait()})")
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def measure_gui(config, log_file, jobs):
+    out = subprocess.run(
+        [sys.executable, "-c", GUI_PROBE, log_file, str(jobs)],
+        capture_output=True, text=True, env=env(), cwd=os.path.dirname(config), timeout=60
+    )
+    lines = [line for line in out.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        raise RuntimeError(f"GUI probe failed:\n{out.stdout}{out.stderr}")
+    return json.loads(lines[-1])
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=500, help="Number of tasks in the generated config.")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per measurement; the median is reported.")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        config = write_config(directory, args.tasks)
+        log_file = os.path.join(directory, "bench.log")
+
+        results["import"] = median([measure_import() for _ in range(args.runs)])
+        results["headless"] = median([measure_headless(config, log_file) for _ in range(args.runs)])
+
+        gui_runs = [measure_gui(config, log_file, job_total(args.tasks))]
+        if "skipped" not in gui_runs[0]:
+            gui_runs += [measure_gui(config, log_file, job_total(args.tasks)) for _ in range(args.runs - 1)]
+        if "skipped" in gui_runs[0]:
+            print(f"gui: skipped ({gui_runs[0]['skipped']})")
+        else:
+            for key in ("gui_window", "gui_scheduled"):
+                results[key] = median([run[key] for run in gui_runs])
+
+    failed = False
+    for key, value in results.items():
+        over = value > BUDGETS[key]
+        failed |= over
+        print(f"{key:<14} {value * 1000:8.1f} ms  (budget {BUDGETS[key] * 1000:.0f} ms){'  OVER BUDGET' if over else ''}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
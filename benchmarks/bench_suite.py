@@ -0,0 +1,321 @@
+"""Performance regression suite for the scheduler's hot paths.
+
+Benchmarks (seconds; best of --repeat, a single run from 10k tasks up):
+  schedule.build.N      first schedule_jobs_from_config with N tasks
+  schedule.reconcile.N  schedule_jobs_from_config with nothing changed
+  config.reload.N       config file change (one task edited) -> reload_config_data
+  presets.load.N        parse a presets.json of N presets (10 tasks each)
+  presets.save.N        save one changed preset into that library
+  presets.import.N      stream that library's file into an empty one (import_presets_file)
+  simulate.year.N       a year of N tasks through obs_sim (virtual clock)
+  gui.refresh.N         refresh_task_list_ui with N rows (needs a display)
+  fire.{lag,ack,total}.{p50,p99}
+                        scheduled fires against the local OBS stand-in
+
+Results are printed and, with --output, written as JSON. --compare reads a
+baseline written earlier (e.g. benchmarks/baseline.json via --save-baseline)
+and exits with status 1 if any benchmark is slower than baseline by more
+than --threshold (relative) and --min-delta (absolute seconds).
+
+    python benchmarks/bench_suite.py --quick --compare benchmarks/baseline.json
+    python benchmarks/bench_suite.py --save-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+SIZES = {
+    "schedule": (10, 100, 1000, 10000, 100000),
+    "presets": (10, 100, 1000),
+    "simulate": (10, 100, 1000),
+    "gui": (100, 1000, 5000),
+}
+QUICK_MAX = 10000
+
+ACTIONS = ("Start Streaming", "Stop Streaming", "Start Recording", "Stop Recording")
+DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+def quiet(message):
+    pass
+
+
+def make_tasks(count, seed=1):
+    # A mix of daily, weekly and one-time tasks at distinct seconds of the day
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(count):
+        t = f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+        task = {"time": t, "action": ACTIONS[i % len(ACTIONS)], "enabled": True}
+        kind = i % 10
+        if kind < 5:
+            task["type"] = "weekly"
+            task["days"] = rng.sample(DAYS, rng.randrange(1, 6))
+        elif kind < 9:
+            task["type"] = "daily"
+        else:
+            task["type"] = "onetime"
+            task["date"] = datetime.fromtimestamp(time.time() + rng.randrange(1, 365) * 86400).strftime("%Y-%m-%d")
+        tasks.append(task)
+    return tasks
+
+
+def best(func, repeat):
+    # Minimum wall time of func() over repeat runs
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def repeats(size, repeat):
+    return repeat if size < 10000 else 1
+
+
+def write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+# --- Benchmarks ---
+
+def bench_schedule(directory, sizes, repeat, results):
+    from obs_core import OBSSchedulerCore
+    for size in sizes:
+        config = os.path.join(directory, f"schedule_{size}.json")
+        tasks = make_tasks(size)
+        write_json(config, {"tasks": tasks, "expired_tasks": "keep"})
+
+        def build():
+            core = OBSSchedulerCore(config, log_callback=quiet)
+            try:
+                start = time.perf_counter()
+                core.schedule_jobs_from_config(reload=False)
+                return time.perf_counter() - start, core
+            except BaseException:
+                core.shutdown()
+                raise
+
+        build_times = []
+        for _ in range(repeats(size, repeat)):
+            elapsed, core = build()
+            build_times.append(elapsed)
+            core.shutdown()
+        results[f"schedule.build.{size}"] = min(build_times)
+
+        _, core = build()
+        try:
+            results[f"schedule.reconcile.{size}"] = best(
+                lambda: core.schedule_jobs_from_config(reload=False), repeats(size, repeat))
+            edited = dict(core.config, tasks=list(tasks))
+
+            def reload():
+                # Alternate one task's time so every reload has one change
+                task = dict(edited["tasks"][0])
+                task["time"] = "12:00:00" if task["time"] != "12:00:00" else "12:00:01"
+                edited["tasks"][0] = task
+                core.reload_config_data(json.dumps(edited))
+            results[f"config.reload.{size}"] = best(reload, repeats(size, repeat))
+        finally:
+            core.shutdown()
+
+
+def bench_presets(directory, sizes, repeat, results):
+    from obs_core import OBSSchedulerCore
+    from obs_presets import PresetStore
+    for size in sizes:
+        library = {f"preset {i}": make_tasks(10, seed=i) for i in range(size)}
+        path = os.path.join(directory, f"presets_{size}.json")
+        write_json(path, library)
+        results[f"presets.load.{size}"] = best(lambda: PresetStore(path).names(), repeat)
+
+        store = PresetStore(path)
+        store.names()
+        counter = iter(range(1, 1 << 30))
+        results[f"presets.save.{size}"] = best(
+            lambda: store.set("preset 0", make_tasks(10, seed=next(counter))), repeat)
+
+        config = os.path.join(directory, f"presets_config_{size}.json")
+        write_json(config, {"tasks": []})
+        core = OBSSchedulerCore(config, log_callback=quiet)
+        try:
+            def import_library():
+                target = os.path.join(directory, f"import_{size}.json")
+                for stale in (target, target + ".bak"):
+                    if os.path.exists(stale):
+                        os.remove(stale)
+                core.presets_file = target
+                success, message, _ = core.import_presets_file(path)
+                assert success, message
+            results[f"presets.import.{size}"] = best(import_library, repeat)
+        finally:
+            core.shutdown()
+
+
+def bench_simulate(sizes, repeat, results):
+    from obs_sim import simulate
+    start = datetime(2026, 1, 1).timestamp()
+    for size in sizes:
+        config = {"tasks": [task for task in make_tasks(size) if task["type"] != "onetime"]}
+        results[f"simulate.year.{size}"] = best(
+            lambda: simulate(config, days=365, start=start, keep_timeline=False), repeats(size, repeat))
+
+
+def bench_gui(directory, sizes, repeat, results):
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"gui: skipped ({e})")
+        return
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        write_json("obs_scheduler_config.json", {"tasks": [], "auto_connect": False})
+        import main
+        app = main.OBSSchedulerApp(root)
+        root.update()
+        try:
+            for size in sizes:
+                app.current_tasks = make_tasks(size)
+
+                def refresh():
+                    app.refresh_task_list_ui()
+                    root.update_idletasks()
+                results[f"gui.refresh.{size}"] = best(refresh, repeat)
+        finally:
+            app.core.shutdown()
+    finally:
+        root.destroy()
+        os.chdir(cwd)
+
+
+def bench_fires(directory, fires, results):
+    # Schedules 'fires' daily tasks one second apart and measures how late
+    # they reach the stand-in
+    from obs_core import OBSSchedulerCore
+    from obs_standin import StandInOBS
+    server = StandInOBS(password="bench")
+    host, port = server.start_in_thread()
+    first = int(time.time()) + 2
+    tasks = [
+        {"time": datetime.fromtimestamp(first + i).strftime("%H:%M:%S"),
+         "action": ("Start Streaming", "Stop Streaming")[i % 2], "type": "daily"}
+        for i in range(fires)
+    ]
+    config = os.path.join(directory, "fires.json")
+    write_json(config, {"host": host, "port": port, "password": "bench", "prewarm_seconds": 1, "tasks": tasks})
+    core = OBSSchedulerCore(config, log_callback=quiet)
+    runner = threading.Thread(target=core.scheduler.run_forever, daemon=True)
+    try:
+        core.connect_obs()
+        core.schedule_jobs_from_config(reload=False)
+        runner.start()
+        deadline = first + fires + 10
+        while sum(core.metrics.result_counts().values()) < fires and time.time() < deadline:
+            time.sleep(0.05)
+        stages = core.latency_stats()["by_host"].get(host, {})
+        for stage in ("lag", "ack", "total"):
+            summary = stages.get(stage)
+            if summary and summary["count"]:
+                results[f"fire.{stage}.p50"] = summary["p50"]
+                results[f"fire.{stage}.p99"] = summary["p99"]
+    finally:
+        core.shutdown()
+        runner.join(timeout=2)
+        server.stop()
+
+
+# --- Baselines ---
+
+def compare(results, baseline, threshold, min_delta):
+    # -> [(name, baseline, current)] of regressions; prints the table
+    regressions = []
+    print(f"\n{'benchmark':<26} {'baseline':>11} {'current':>11} {'change':>8}")
+    for name in sorted(results):
+        current = results[name]
+        if name not in baseline:
+            print(f"{name:<26} {'-':>11} {current * 1000:9.2f}ms")
+            continue
+        base = baseline[name]
+        change = (current - base) / base if base else 0.0
+        regressed = current > base * (1 + threshold) and current - base > min_delta
+        if regressed:
+            regressions.append((name, base, current))
+        print(f"{name:<26} {base * 1000:9.2f}ms {current * 1000:9.2f}ms {change:+7.0%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help=f"Skip sizes above {QUICK_MAX}.")
+    parser.add_argument("--only", default=None, help="Comma-separated groups: schedule,presets,simulate,gui,fires.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the best is kept.")
+    parser.add_argument("--fires", type=int, default=5, help="Scheduled fires for the accuracy benchmark.")
+    parser.add_argument("--output", default=None, help="Write the results as JSON.")
+    parser.add_argument("--compare", default=None, metavar="BASELINE", help="Flag regressions against this baseline.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown (default 25%%).")
+    parser.add_argument("--min-delta", type=float, default=0.002, help="Ignore slowdowns below this many seconds.")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Write the results to {os.path.relpath(BASELINE, ROOT)}.")
+    args = parser.parse_args(argv)
+
+    groups = set(args.only.split(",")) if args.only else {"schedule", "presets", "simulate", "gui", "fires"}
+    sizes = {group: [n for n in values if not args.quick or n <= QUICK_MAX] for group, values in SIZES.items()}
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        if "schedule" in groups:
+            bench_schedule(directory, sizes["schedule"], args.repeat, results)
+        if "presets" in groups:
+            bench_presets(directory, sizes["presets"], args.repeat, results)
+        if "simulate" in groups:
+            bench_simulate(sizes["simulate"], args.repeat, results)
+        if "gui" in groups:
+            bench_gui(directory, sizes["gui"], args.repeat, results)
+        if "fires" in groups:
+            bench_fires(directory, args.fires, results)
+
+    for name in sorted(results):
+        print(f"{name:<26} {results[name] * 1000:10.2f} ms")
+
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    for path in [args.output] + ([BASELINE] if args.save_baseline else []):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=4, sort_keys=True)
+            print(f"Results written to {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,36 +1,80 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import obs_core
+from obs_conn import BACKOFF, CONNECTED, CONNECTING, DISCONNECTED
+from obs_log import LogRing
+from obs_tasklist import TaskListView
+from obs_worker import UIWorker
 import threading
 import time
-import json
+import logging
 import os
+import sys
 from datetime import datetime
 
+# The log pane keeps the last LOG_LINES lines and is updated every LOG_FLUSH_MS
+LOG_LINES = 1000
+LOG_FLUSH_MS = 200
+
 class OBSSchedulerApp:
-    def __init__(self, root):
+    def __init__(self, root, config_file="obs_scheduler_config.json"):
         self.root = root
         self.root.title("OBS Auto Scheduler")
         self.root.geometry("900x700")
         self.root.resizable(False, False)
 
+        # Lines for the log pane, from any thread
+        self.log_ring = LogRing(LOG_LINES)
+
         # Initialize Core Logic
         # Pass a thread-safe logging wrapper
-        self.core = obs_core.OBSSchedulerCore(log_callback=self.thread_safe_log)
+        self.core = obs_core.OBSSchedulerCore(config_file, log_callback=self.thread_safe_log)
+        # Background reconnects update the status label
+        self.core.conn.on_state = lambda state: self.root.after(0, self.update_status, state)
+        # Finished one-time tasks are removed from config by the core
+        self.core.on_tasks_changed = lambda: self.root.after(0, self.reload_tasks_from_core)
 
 
         # --- UI Layout ---
         self.create_widgets()
-        
+
+        # Connecting, saving, imports and rescheduling run off the UI thread
+        self.worker = UIWorker(self.root, on_busy=self.show_busy, log=self.log)
+
+        self.root.after(LOG_FLUSH_MS, self.flush_log)
+
+        # --- Deferred Startup ---
+        # Filling the lists, scheduling and connecting run once the window is up
+        self.root.after(0, self.finish_startup)
+
+    def finish_startup(self):
+        # Dropping one-time tasks that expired while the app was not running
+        # (a disk write) and reading the preset names run on the worker
+        def prepare():
+            self.core.compact_tasks(reschedule=False)
+            return self.core.get_preset_names()
+
+        def prepare_failed(error):
+            self.log(f"Startup error: {error}")
+            self.start_scheduler([])
+
+        self.worker.submit(prepare, label="Loading", done=self.start_scheduler, failed=prepare_failed)
+
+    def start_scheduler(self, preset_names):
+        self.show_preset_names(preset_names)
+
+        # Restore tasks from config (parsed once by the core)
+        self.current_tasks = [dict(task) for task in self.core.config.get("tasks", [])]
+
         # --- Start Scheduler Thread (GUI Mode) ---
-        # The GUI runs its own scheduler loop to provide feedback
-        self.running = True
+        # The initial scheduling pass runs on this thread, off the UI thread
         self.scheduler_thread = threading.Thread(target=self.run_scheduler, daemon=True)
         self.scheduler_thread.start()
 
         # --- Initial Connection Attempt ---
+        # In the background; the status label follows the connection state
         if self.core.config.get("auto_connect", False):
-            self.connect_obs()
+            self.core.conn.connect(wait=False)
 
     def create_widgets(self):
         # 1. Connection Frame
@@ -56,7 +100,14 @@ class OBSSchedulerApp:
         self.btn_connect.grid(row=0, column=6, padx=10, pady=5)
 
         self.lbl_status = ttk.Label(conn_frame, text="Status: Disconnected", foreground="red")
-        self.lbl_status.grid(row=1, column=0, columnspan=7, pady=5)
+        self.lbl_status.grid(row=1, column=0, columnspan=4, pady=5)
+
+        # Background work in progress
+        self.lbl_busy = ttk.Label(conn_frame, text="", foreground="gray")
+        self.lbl_busy.grid(row=1, column=4, columnspan=2, pady=5, sticky="e")
+        self.progress = ttk.Progressbar(conn_frame, mode="indeterminate", length=100)
+        self.progress.grid(row=1, column=6, padx=10, pady=5)
+        self.progress.grid_remove()
 
         # 2. Scheduling Frame
         sched_frame = ttk.LabelFrame(self.root, text="Schedule Task")
@@ -153,14 +204,16 @@ class OBSSchedulerApp:
         
         self.tree.pack(side="left", fill="both", expand=True)
 
-        scrollbar = ttk.Scrollbar(tree_container, orient="vertical", command=self.tree.yview)
+        scrollbar = ttk.Scrollbar(tree_container, orient="vertical")
         scrollbar.pack(side="right", fill="y")
-        self.tree.configure(yscrollcommand=scrollbar.set)
         
         # Configure tags for enabled/disabled
         self.tree.tag_configure("disabled", foreground="gray")
         self.tree.tag_configure("enabled", foreground="black")
 
+        # Owns the task list; the tree only holds the rows on screen
+        self.task_list = TaskListView(self.tree, scrollbar)
+
         # Container for Buttons (Right) - Vertical Stack
         btn_frame = ttk.Frame(list_frame)
         btn_frame.pack(side="right", fill="y", padx=5, pady=5)
@@ -174,6 +227,7 @@ class OBSSchedulerApp:
         ttk.Button(btn_frame, text="Toggle Enable/Disable", command=self.toggle_task_status, style="Big.TButton", width=20).pack(fill="x", pady=2)
         ttk.Button(btn_frame, text="Remove Selected", command=self.remove_task, style="Big.TButton", width=20).pack(fill="x", pady=2)
         ttk.Separator(btn_frame, orient="horizontal").pack(fill="x", pady=5)
+        ttk.Button(btn_frame, text="Timeline (7 days)", command=self.show_timeline, style="Big.TButton", width=20).pack(fill="x", pady=2)
         ttk.Button(btn_frame, text="Clear All", command=self.clear_all_tasks, style="Big.TButton", width=20).pack(fill="x", pady=2)
 
 
@@ -192,7 +246,6 @@ class OBSSchedulerApp:
         ttk.Label(preset_frame, text="Load/Delete:").grid(row=0, column=3, padx=5, pady=5)
         self.combo_presets = ttk.Combobox(preset_frame, state="readonly", width=15)
         self.combo_presets.grid(row=0, column=4, padx=5, pady=5)
-        self.refresh_preset_list()
 
         self.btn_load_preset = ttk.Button(preset_frame, text="Load", command=self.load_preset, takefocus=0)
         self.btn_load_preset.grid(row=0, column=5, padx=5, pady=5)
@@ -208,14 +261,6 @@ class OBSSchedulerApp:
         self.current_tasks = []
         self.editing_index = None
 
-        
-        # Restore tasks from config
-        for task in self.core.config.get("tasks", []):
-            self.add_task_to_ui(task)
-        
-        # Initialize schedule in core
-        self.core.schedule_jobs_from_config()
-
         # 5. Log Area
         log_frame = ttk.LabelFrame(self.root, text="Logs")
         log_frame.pack(padx=10, pady=5, fill="x")
@@ -224,6 +269,14 @@ class OBSSchedulerApp:
 
     # --- Logic Methods ---
 
+    @property
+    def current_tasks(self):
+        return self.task_list.tasks
+
+    @current_tasks.setter
+    def current_tasks(self, tasks):
+        self.task_list.set_tasks(tasks)
+
     def update_dynamic_options(self, event=None):
         # Clear dynamic frame
         for widget in self.dynamic_frame.winfo_children():
@@ -244,41 +297,82 @@ class OBSSchedulerApp:
             pass # Nothing extra needed
 
     def thread_safe_log(self, message):
-        # Schedule the log update on the main GUI thread
-        self.root.after(0, self.log, message)
+        # Buffered; flush_log moves it into the log pane on the GUI thread
+        timestamp = datetime.now().strftime("[%H:%M:%S]")
+        self.log_ring.append(f"{timestamp} {message}\n")
 
     def log(self, message):
-        timestamp = datetime.now().strftime("[%H:%M:%S]")
+        # Console and file output go through the core's logging queue
+        logging.info(message)
+        self.thread_safe_log(message)
+
+    def flush_log(self):
+        lines = self.log_ring.drain()
+        if lines:
+            self.log_text.config(state="normal")
+            self.log_text.insert("end", "".join(lines))
+            # Keep only the last LOG_LINES lines
+            excess = int(self.log_text.index("end-1c").split(".")[0]) - 1 - LOG_LINES
+            if excess > 0:
+                self.log_text.delete("1.0", f"{excess + 1}.0")
+            self.log_text.see("end")
+            self.log_text.config(state="disabled")
+        self.root.after(LOG_FLUSH_MS, self.flush_log)
+
+    def show_busy(self, labels):
+        # Called by the worker whenever background work starts or finishes
+        if labels:
+            text = f"{labels[0]}..."
+            if len(labels) > 1:
+                text += f" (+{len(labels) - 1})"
+            self.lbl_busy.config(text=text)
+            if not self.progress.winfo_ismapped():
+                self.progress.grid()
+                self.progress.start(15)
+        else:
+            self.lbl_busy.config(text="")
+            self.progress.stop()
+            self.progress.grid_remove()
+
+    def reschedule(self):
+        # Reconciles the schedule on the scheduler thread, shown as pending work
+        future = self.worker.future(label="Rescheduling")
+        self.core.request_reschedule(done=lambda: future.set_result(None))
+
+    def save_config_ui(self, reschedule=True, background=True, tasks=None):
+        # Merges the connection settings into the core config and saves it (on
+        # the worker unless background=False). Task edits go through the core
+        # one by one; the task list is only replaced when 'tasks' is given.
+        settings = {
+            "host": self.entry_host.get(),
+            "port": self.entry_port.get(),
+            "password": self.entry_pwd.get(),
+            "auto_connect": self.core.is_connected,
+        }
+        if tasks is not None:
+            tasks = [dict(task) for task in tasks]
 
-        full_msg = f"{timestamp} {message}\n"
-        self.log_text.config(state="normal")
-        self.log_text.insert("end", full_msg)
-        self.log_text.see("end")
-        self.log_text.config(state="disabled")
-        try:
-            print(full_msg.strip())
-        except:
-            pass
+        def apply():
+            self.core.apply_settings(settings, tasks)
 
-    def save_config_ui(self):
-        # Updates core config from UI state and saves it
-        config_data = self.core.config
-        config_data["host"] = self.entry_host.get()
-        config_data["port"] = self.entry_port.get()
-        config_data["password"] = self.entry_pwd.get()
-        config_data["auto_connect"] = self.core.is_connected
-        
-        # Use the internal list self.current_tasks which is kept in sync
-        config_data["tasks"] = self.current_tasks
+        def applied(result):
+            # Refresh core schedule (only changed tasks are rescheduled)
+            if reschedule:
+                self.reschedule()
 
-        self.core.config = config_data
-        self.core.save_config_file()
-        
-        # Refresh core schedule
-        self.core.schedule_jobs_from_config()
+        if background:
+            # Queued behind earlier task edits, which the snapshot already contains
+            self.worker.submit(apply, label="Saving settings", done=applied)
+        else:
+            apply()
+            applied(None)
 
     def refresh_preset_list(self):
-        presets = self.core.get_preset_names()
+        # Reading the names can mean re-parsing presets.json (e.g. after an
+        # import), so it runs on the worker
+        self.worker.submit(self.core.get_preset_names, label="Loading presets", done=self.show_preset_names)
+
+    def show_preset_names(self, presets):
         self.combo_presets['values'] = presets
         if presets:
             self.combo_presets.current(0)
@@ -295,10 +389,14 @@ class OBSSchedulerApp:
             if not messagebox.askyesno("Confirm", "Current task list is empty. Save empty preset?"):
                 return
 
-        self.core.save_preset(name, self.current_tasks)
-        self.refresh_preset_list()
-        self.log(f"Preset '{name}' saved.")
-        messagebox.showinfo("Success", f"Preset '{name}' saved successfully.")
+        def saved(result):
+            self.refresh_preset_list()
+            self.log(f"Preset '{name}' saved.")
+            messagebox.showinfo("Success", f"Preset '{name}' saved successfully.")
+
+        tasks = [dict(task) for task in self.current_tasks]
+        self.worker.submit(self.core.save_preset, name, tasks, label="Saving preset", done=saved,
+                           failed=lambda e: messagebox.showerror("Error", f"Failed to save preset: {e}"))
         self.entry_preset.delete(0, "end")
 
     def load_preset(self):
@@ -306,58 +404,69 @@ class OBSSchedulerApp:
         if not name:
             return
         
-        if self.core.load_preset(name):
-            # Clear current UI list and internal list
-            self.tree.delete(*self.tree.get_children())
-            self.current_tasks = []
-            
-            # Populate UI from loaded config
-            for task in self.core.config.get("tasks", []):
-                self.add_task_to_ui(task)
-            
+        def load():
+            if not self.core.load_preset(name, reschedule=False):
+                return None
+            return [dict(task) for task in self.core.config.get("tasks", [])]
+
+        def loaded(tasks):
+            if tasks is None:
+                messagebox.showerror("Error", "Failed to load preset.")
+                return
+            self.reschedule()
+            # Replace the list with the loaded config
+            self.current_tasks = tasks
             self.log(f"Preset '{name}' loaded.")
-        else:
-            messagebox.showerror("Error", "Failed to load preset.")
+
+        self.worker.submit(load, label="Loading preset", done=loaded,
+                           failed=lambda e: messagebox.showerror("Error", f"Failed to load preset: {e}"))
 
     def delete_preset(self):
         name = self.combo_presets.get()
         if not name:
             return
         
-        if messagebox.askyesno("Confirm", f"Are you sure you want to delete preset '{name}'?"):
-            if self.core.delete_preset(name):
+        def deleted(success):
+            if success:
                 self.refresh_preset_list()
                 self.log(f"Preset '{name}' deleted.")
             else:
                 messagebox.showerror("Error", "Failed to delete preset.")
 
+        if messagebox.askyesno("Confirm", f"Are you sure you want to delete preset '{name}'?"):
+            self.worker.submit(self.core.delete_preset, name, label="Deleting preset", done=deleted,
+                               failed=lambda e: messagebox.showerror("Error", f"Failed to delete preset: {e}"))
+
     def import_presets_ui(self):
         file_path = filedialog.askopenfilename(
             title="Select Preset File",
-            filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")]
+            filetypes=[("Preset Files", "*.json *.jsonl *.ndjson"), ("JSON Files", "*.json"),
+                       ("JSON Lines", "*.jsonl *.ndjson"), ("All Files", "*.*")]
         )
         if not file_path:
             return
-        
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            
-            success, msg = self.core.import_presets(data)
+
+        def imported(result):
+            # Streamed and validated by the core; invalid presets are listed
+            success, msg, report = result
             if success:
                 self.refresh_preset_list()
                 self.log(msg)
-                messagebox.showinfo("Import Success", msg)
+                if report.error_count:
+                    messagebox.showwarning("Import Finished", f"{msg}\n\n{report.details()}")
+                else:
+                    messagebox.showinfo("Import Success", msg)
             else:
-                messagebox.showerror("Import Failed", msg)
-        except json.JSONDecodeError:
-            messagebox.showerror("Error", "Invalid JSON file.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to import: {e}")
+                details = report.details()
+                messagebox.showerror("Import Failed", f"{msg}\n\n{details}" if details else msg)
+
+        self.worker.submit(self.core.import_presets_file, file_path, label="Importing presets", done=imported,
+                           failed=lambda e: messagebox.showerror("Error", f"Failed to import: {e}"))
 
 
     def toggle_connection(self):
-        if self.core.is_connected:
+        # Also cancels background reconnect attempts
+        if self.core.conn.state != DISCONNECTED:
             self.disconnect_obs()
         else:
             self.connect_obs()
@@ -368,17 +477,38 @@ class OBSSchedulerApp:
         self.core.config["port"] = self.entry_port.get()
         self.core.config["password"] = self.entry_pwd.get()
         
-        success, msg = self.core.connect_obs()
+        # The attempt can take up to the websocket timeout
+        self.btn_connect.config(state="disabled")
+        self.lbl_status.config(text="Status: Connecting...", foreground="orange")
+        self.worker.submit(self.core.connect_obs, lane="obs", label="Connecting to OBS",
+                           done=self.on_connect_result, failed=lambda e: self.on_connect_result((False, str(e))))
+
+    def on_connect_result(self, result):
+        success, msg = result
+        self.btn_connect.config(state="normal")
         if success:
             self.lbl_status.config(text="Status: Connected", foreground="green")
             self.btn_connect.config(text="Disconnect")
             self.log("Connected to OBS WebSocket.")
-            self.save_config_ui()
+            # Only the connection settings changed; tasks are already scheduled
+            self.save_config_ui(reschedule=False)
         else:
-            self.lbl_status.config(text="Status: Connection Failed", foreground="red")
+            # The manager may still be retrying in the background (BACKOFF)
+            self.update_status(self.core.conn.state)
             self.log(f"Connection Error: {msg}")
             messagebox.showerror("Connection Failed", f"Could not connect to OBS.\n\nDetails: {msg}")
 
+    def update_status(self, state):
+        if state == CONNECTED:
+            self.lbl_status.config(text="Status: Connected", foreground="green")
+            self.btn_connect.config(text="Disconnect")
+        elif state in (CONNECTING, BACKOFF):
+            self.lbl_status.config(text="Status: Reconnecting...", foreground="orange")
+            self.btn_connect.config(text="Disconnect")
+        else:
+            self.lbl_status.config(text="Status: Disconnected", foreground="red")
+            self.btn_connect.config(text="Connect")
+
     def disconnect_obs(self):
         self.core.disconnect_obs()
         self.lbl_status.config(text="Status: Disconnected", foreground="red")
@@ -438,8 +568,9 @@ class OBSSchedulerApp:
             old_task = self.current_tasks[self.editing_index]
             new_task["enabled"] = old_task.get("enabled", True) # Preserve enabled status
             
-            self.current_tasks[self.editing_index] = new_task
-            self.refresh_task_list_ui()
+            self.task_list.update(self.editing_index, new_task)
+            self.worker.submit(self.core.update_task, self.editing_index, dict(new_task), dict(old_task),
+                               label="Saving tasks")
             
             self.editing_index = None
             self.btn_add.config(text="Add Task")
@@ -448,92 +579,27 @@ class OBSSchedulerApp:
             # Add new task
             new_task["enabled"] = True
             self.add_task_to_ui(new_task)
+            self.worker.submit(self.core.add_task, dict(new_task), label="Saving tasks")
             self.log(f"Scheduled: {t_action} at {t_time} ({t_freq})")
 
-        self.save_config_ui()
-
 
     def add_task_to_ui(self, task):
         # Updates internal list and treeview
-        self.current_tasks.append(task)
-        
-        t_time = task.get("time")
-        t_action = task.get("action")
-        t_type = task.get("type", "daily") # Default to daily
-        
-        # Convert 24h string to 12h AM/PM for display
-        try:
-            if len(t_time.split(":")) == 2:
-                display_time = datetime.strptime(t_time, "%H:%M").strftime("%I:%M %p")
-            else:
-                display_time = datetime.strptime(t_time, "%H:%M:%S").strftime("%I:%M:%S %p")
-        except ValueError:
-            display_time = t_time # Fallback
-
-        details = ""
-        freq_display = "Daily"
-        
-        if t_type == "weekly":
-            freq_display = "Weekly"
-            details = ",".join(task.get("days", []))
-        elif t_type == "onetime":
-            freq_display = "One-time"
-            details = task.get("date", "")
-        elif t_type == "daily":
-            details = "Every day"
-
-        # Insert with new column order: Freq, Details, Time, Action
-        # Apply tag based on enabled status
-        is_enabled = task.get("enabled", True)
-        tag = "enabled" if is_enabled else "disabled"
-        
-        self.tree.insert("", "end", values=(freq_display, details, display_time, t_action), tags=(tag,))
+        self.task_list.append(task)
 
     def refresh_task_list_ui(self):
-        # Clear tree
-        self.tree.delete(*self.tree.get_children())
-        # Re-populate from current_tasks
-        # We temporarily clear current_tasks to avoid duplication in add_task_to_ui, 
-        # or we just copy the logic of inserting to tree.
-        # To avoid refactoring add_task_to_ui too much, let's just manually insert here or use a helper.
-        # Actually, add_task_to_ui appends to current_tasks. We shouldn't use it here.
-        
-        for task in self.current_tasks:
-            t_time = task.get("time")
-            t_action = task.get("action")
-            t_type = task.get("type", "daily")
-            t_enabled = task.get("enabled", True)
-            
-            try:
-                if len(t_time.split(":")) == 2:
-                    display_time = datetime.strptime(t_time, "%H:%M").strftime("%I:%M %p")
-                else:
-                    display_time = datetime.strptime(t_time, "%H:%M:%S").strftime("%I:%M:%S %p")
-            except ValueError:
-                display_time = t_time
+        # Redraws every row, e.g. after current_tasks was changed in place
+        self.task_list.invalidate()
 
-            details = ""
-            freq_display = "Daily"
-            
-            if t_type == "weekly":
-                freq_display = "Weekly"
-                details = ",".join(task.get("days", []))
-            elif t_type == "onetime":
-                freq_display = "One-time"
-                details = task.get("date", "")
-            elif t_type == "daily":
-                details = "Every day"
-
-            tag = "enabled" if t_enabled else "disabled"
-            self.tree.insert("", "end", values=(freq_display, details, display_time, t_action), tags=(tag,))
+    def reload_tasks_from_core(self):
+        self.current_tasks = [dict(task) for task in self.core.config.get("tasks", [])]
+        if self.editing_index is not None:
+            self.editing_index = None
+            self.btn_add.config(text="Add Task")
 
     def load_task_for_edit(self):
-        selected_item = self.tree.selection()
-        if not selected_item:
-            return
-        
-        index = self.tree.index(selected_item)
-        if not (0 <= index < len(self.current_tasks)):
+        index = self.task_list.selected_index()
+        if index is None:
             return
 
         task = self.current_tasks[index]
@@ -588,40 +654,30 @@ class OBSSchedulerApp:
         self.log(f"Editing task #{index + 1}")
 
     def toggle_task_status(self):
-        selected_item = self.tree.selection()
-        if not selected_item:
-            return
-        
-        index = self.tree.index(selected_item)
-        if 0 <= index < len(self.current_tasks):
+        index = self.task_list.selected_index()
+        if index is not None:
             task = self.current_tasks[index]
+            expected = dict(task)
             new_status = not task.get("enabled", True)
             task["enabled"] = new_status
-            self.current_tasks[index] = task
             
-            self.refresh_task_list_ui()
-            self.save_config_ui()
+            self.task_list.update(index)
+            self.worker.submit(self.core.set_task_enabled, index, new_status, expected, label="Saving tasks")
             
             status_str = "Enabled" if new_status else "Disabled"
             self.log(f"Task #{index + 1} {status_str}")
 
 
     def remove_task(self):
-        selected_item = self.tree.selection()
-        if not selected_item:
+        index = self.task_list.selected_index()
+        if index is None:
             return
         
-        # Get index of selected item
-        index = self.tree.index(selected_item)
-        
-        # Remove from internal list
-        if 0 <= index < len(self.current_tasks):
-            del self.current_tasks[index]
-
-        # Remove from UI
-        self.tree.delete(selected_item)
+        # Remove from internal list and UI
+        expected = dict(self.current_tasks[index])
+        self.task_list.remove(index)
+        self.worker.submit(self.core.remove_task, index, expected, label="Saving tasks")
         
-        self.save_config_ui()
         self.log("Task removed.")
         
         # Reset edit mode if we removed the task being edited
@@ -636,30 +692,73 @@ class OBSSchedulerApp:
             
         if messagebox.askyesno("Confirm", "Are you sure you want to delete ALL tasks?"):
             self.current_tasks = []
-            self.tree.delete(*self.tree.get_children())
-            self.save_config_ui()
+            self.save_config_ui(tasks=[])
             self.log("All tasks cleared.")
 
+    def show_timeline(self):
+        # Upcoming fires for the next week from the core's occurrence index
+        win = tk.Toplevel(self.root)
+        win.title("Timeline - next 7 days")
+        win.geometry("640x420")
+
+        tree = ttk.Treeview(win, columns=("When", "Action", "Targets"), show="headings")
+        tree.heading("When", text="When")
+        tree.heading("Action", text="Action")
+        tree.heading("Targets", text="Targets")
+        tree.column("When", width=180)
+        tree.column("Action", width=140)
+        tree.column("Targets", width=200)
+        tree.tag_configure("conflict", foreground="red")
+
+        scrollbar = ttk.Scrollbar(win, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+
+        summary = ttk.Label(win)
+        summary.pack(side="bottom", fill="x", padx=5, pady=5)
+        scrollbar.pack(side="right", fill="y")
+        tree.pack(side="left", fill="both", expand=True)
+
+        def refresh():
+            tree.delete(*tree.get_children())
+            now = time.time()
+            end = now + 7 * 86400
+            fires = self.core.fires_between(now, end)
+            conflicts = self.core.find_conflicts(start=now, end=end)
+            clashing = {(t, id(task)) for _, run in conflicts for t, task in run}
+            limit = 1000
+            for fire_time, task in fires[:limit]:
+                when = datetime.fromtimestamp(fire_time).strftime("%a %Y-%m-%d %I:%M:%S %p")
+                tags = ("conflict",) if (fire_time, id(task)) in clashing else ()
+                tree.insert("", "end", values=(when, task.action, ",".join(task.targets)), tags=tags)
+            text = f"{len(fires)} fires, {len(conflicts)} conflict(s) (red)"
+            if len(fires) > limit:
+                text += f" - showing the first {limit}"
+            summary.config(text=text)
+
+        ttk.Button(win, text="Refresh", command=refresh, takefocus=0).pack(side="bottom", pady=(5, 0))
+        refresh()
+
     def run_scheduler(self):
-        # Wrapper to run schedule.run_pending()
-        while self.running:
-            # Accessing global schedule via core's import of it (or import it here too)
-            # It's safer to import schedule here too or rely on core
-            obs_core.schedule.run_pending()
-            time.sleep(1)
+        # Sleeps until the next job is due; woken early whenever jobs change
+        self.core.schedule_jobs_from_config(reload=False)
+        self.core.scheduler.run_forever()
 
     def on_closing(self):
-        self.running = False
-        self.save_config_ui()
+        # Queued saves finish first; shutdown() flushes the pending config write
+        self.worker.shutdown()
+        self.save_config_ui(reschedule=False, background=False)
+        self.core.shutdown()
         self.root.destroy()
 
 
 if __name__ == "__main__":
     print("Starting application...")
     try:
+        obs_core.setup_logging()
         root = tk.Tk()
         print("Tkinter root created.")
-        app = OBSSchedulerApp(root)
+        # Optional argument: config path (*.db for the SQLite store)
+        app = OBSSchedulerApp(root, *sys.argv[1:2])
         print("App initialized.")
         root.protocol("WM_DELETE_WINDOW", app.on_closing)
         print("Entering main loop...")
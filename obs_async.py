@@ -0,0 +1,298 @@
+import asyncio
+import random
+import time
+
+from obs_conn import DROPPED, LOST
+from obs_core import OBSSchedulerCore, DEFAULT_ENDPOINT, ACTION_REQUESTS, group_batch
+from obs_watch import ConfigWatcher
+from obs_ws import AsyncOBSClient, NotSent, OBSRequestError
+
+# asyncio variant of OBSSchedulerCore. Same config and task JSON, but all OBS
+# I/O and the scheduler loop run on one event loop, so it can be embedded in
+# an existing asyncio service:
+#
+#     core = AsyncOBSSchedulerCore("obs_scheduler_config.json")
+#     asyncio.create_task(core.run_forever())
+
+
+class AsyncEndpoint:
+    # One endpoint's connection; reconnects lazily when a request needs it
+
+    def __init__(self, name, settings, log=None, timeout=3):
+        self.name = name
+        self.settings = settings # callable -> (host, port, password)
+        self.log = log
+        self.timeout = timeout
+        self.client = None
+        self.reconnect_attempts = 0
+        self._lock = None
+
+    def _log(self, message):
+        if self.log:
+            self.log(message if self.name == DEFAULT_ENDPOINT else f"[{self.name}] {message}")
+
+    @property
+    def is_connected(self):
+        return self.client is not None and self.client.connected
+
+    async def connect(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.is_connected:
+                return True, "Connected successfully."
+            host, port, password = self.settings()
+            client = AsyncOBSClient(host, port, password, self.timeout)
+            try:
+                await client.connect()
+            except ConnectionRefusedError:
+                msg = "Connection Refused. Is OBS running and WebSocket enabled?"
+            except (ConnectionError, OSError, ValueError, asyncio.TimeoutError) as e:
+                msg = str(e) or type(e).__name__
+            else:
+                self.client = client
+                self._log("Connected to OBS WebSocket.")
+                return True, "Connected successfully."
+            self.reconnect_attempts += 1
+            self._log(f"Connection Error: {msg}")
+            return False, msg
+
+    async def check(self):
+        # Health-check the link or open it ahead of a fire time
+        if self.is_connected:
+            try:
+                await self.client.request("GetVersion")
+                return True
+            except (ConnectionError, OBSRequestError) as e:
+                self._log(f"Connection health check failed: {e}")
+        return (await self.connect())[0]
+
+    async def close(self):
+        client, self.client = self.client, None
+        if client:
+            await client.close()
+
+    def stop(self):
+        client, self.client = self.client, None
+        if client and client.ws:
+            client.ws.abort()
+
+
+class AsyncOBSSchedulerCore(OBSSchedulerCore):
+    # Scheduler jobs still live in the DeadlineScheduler heap, but the heap is
+    # driven by run_scheduler() on the event loop and fired jobs become tasks.
+
+    def __init__(self, config_file="obs_scheduler_config.json", log_callback=None):
+        self._wake = None
+        self._running = False
+        self._tasks = set()
+        super().__init__(config_file, log_callback)
+
+    def add_endpoint(self, name):
+        conn = AsyncEndpoint(name, lambda: self.endpoint_settings(name), log=self.log)
+        self.connections[name] = conn
+        return conn
+
+    def _spawn(self, coro):
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    # --- Scheduler entry points (called from run_pending on the loop) ---
+
+    def dispatch_action(self, action, targets=(DEFAULT_ENDPOINT,), scheduled=None):
+        if scheduled is None:
+            scheduled = self.scheduler.firing
+        self._spawn(self.execute_action(action, targets, scheduled))
+
+    def dispatch_batch(self, items):
+        self._spawn(self.execute_batch(items))
+
+    def prewarm_connection(self, deadline):
+        for name in self.active_targets:
+            conn = self.connections.get(name)
+            if conn is not None:
+                self._spawn(conn.check())
+
+    # --- Connection and Execution ---
+
+    async def connect_obs(self, endpoint=DEFAULT_ENDPOINT):
+        return await self.connections[endpoint].connect()
+
+    async def disconnect_obs(self, endpoint=DEFAULT_ENDPOINT):
+        await self.connections[endpoint].close()
+        self.log("Disconnected from OBS.")
+
+    async def run_on(self, name, description, send, deadline, actions=(), scheduled=None):
+        # Runs send(client) on one endpoint, reconnecting with jittered
+        # exponential backoff until 'deadline' (epoch seconds). The attempt
+        # that reaches OBS is recorded in self.metrics for 'actions'. Only
+        # requests that never left are retried; one lost after it was written
+        # returns LOST.
+        conn = self.connections.get(name)
+        if conn is None:
+            self.log(f"Unknown endpoint '{name}' skipped.")
+            return "unknown endpoint"
+        delay = 1.0
+        dispatched = time.time()
+        reconnected = not conn.is_connected
+        while True:
+            if conn.is_connected or (await conn.connect())[0]:
+                sent = time.time()
+                try:
+                    result = await send(conn.client)
+                except NotSent as e:
+                    conn._log(f"Connection lost during {description}: {e}")
+                except ConnectionError as e:
+                    # Written before the link failed; OBS may have acted on it
+                    conn._log(f"Connection lost during {description} after it was sent; not retrying: {e}")
+                    self.record_failures(name, actions, scheduled or {}, dispatched, LOST)
+                    return LOST
+                else:
+                    waited = sent - dispatched if reconnected else 0.0
+                    self.record_fires(name, actions, scheduled or {}, dispatched, sent, time.time(), waited, result)
+                    return result
+            reconnected = True
+            wait = delay * random.uniform(0.5, 1.0)
+            if time.time() + wait > deadline:
+                conn._log(f"Dropping {description}: OBS not reachable before its deadline.")
+                self.record_failures(name, actions, scheduled or {}, dispatched, DROPPED)
+                return DROPPED
+            conn._log(f"Not connected. Retrying {description} in {wait:.1f}s.")
+            await asyncio.sleep(wait)
+            delay = min(delay * 2, 60.0)
+
+    async def execute_action(self, action, targets=(DEFAULT_ENDPOINT,), scheduled=None):
+        scheduled = {action: time.time() if scheduled is None else scheduled}
+        if tuple(targets) == (DEFAULT_ENDPOINT,):
+            self.log(f"Executing task: {action}...")
+        else:
+            self.log(f"Executing task: {action} on {', '.join(targets)}...")
+        deadline = time.time() + float(self.config.get("retry_window_seconds", 60))
+        results = await asyncio.gather(*(
+            self.run_on(
+                name, action, lambda client, name=name: self.send_action(client, action, name), deadline,
+                [action], scheduled
+            )
+            for name in targets
+        ))
+        results = dict(zip(targets, results))
+        if len(results) > 1:
+            summary = ", ".join(f"{name}={result}" for name, result in sorted(results.items()))
+            self.log(f"Fleet results: {summary}")
+        return results
+
+    async def send_action(self, client, action, endpoint=DEFAULT_ENDPOINT):
+        where = "" if endpoint == DEFAULT_ENDPOINT else f" on {endpoint}"
+        if action not in ACTION_REQUESTS:
+            self.log(f"Failed to execute {action}{where}: unknown action")
+            return "failed"
+        try:
+            await client.request(ACTION_REQUESTS[action])
+            self.log(f"Successfully executed: {action}{where}")
+            return "ok"
+        except OBSRequestError as e:
+            # OBS answered but refused (e.g. already streaming); not retried
+            self.log(f"Failed to execute {action}{where}: {e}")
+            return "failed"
+
+    async def execute_batch(self, items):
+        per_target = group_batch(items)
+        scheduled = {action: fire_time for fire_time, (action, _) in sorted(items, key=lambda item: item[0], reverse=True)}
+        for name, actions in per_target.items():
+            where = "" if name == DEFAULT_ENDPOINT else f" on {name}"
+            self.log(f"Executing batch{where}: {', '.join(actions)}...")
+        deadline = time.time() + float(self.config.get("retry_window_seconds", 60))
+        names = list(per_target)
+        results = await asyncio.gather(*(
+            self.run_on(
+                name,
+                f"batch ({', '.join(per_target[name])})",
+                lambda client, name=name: self.send_batch_actions(client, per_target[name], name),
+                deadline,
+                per_target[name],
+                scheduled
+            )
+            for name in names
+        ))
+        return dict(zip(names, results))
+
+    async def send_batch_actions(self, client, actions, endpoint=DEFAULT_ENDPOINT):
+        where = "" if endpoint == DEFAULT_ENDPOINT else f" on {endpoint}"
+        known = [a for a in actions if a in ACTION_REQUESTS]
+        for action in actions:
+            if action not in ACTION_REQUESTS:
+                self.log(f"Failed to execute {action}{where}: unknown action")
+        results = await client.request_batch([ACTION_REQUESTS[a] for a in known])
+        failed = 0
+        for action, (_, ok, comment) in zip(known, results):
+            if ok:
+                self.log(f"Successfully executed: {action}{where}")
+            else:
+                failed += 1
+                self.log(f"Failed to execute {action}{where}: {comment}")
+        return "ok" if not failed and len(known) == len(actions) else "failed"
+
+    # --- Scheduler loop ---
+
+    async def run_scheduler(self):
+        # Sleeps on the event loop until the next deadline or a schedule
+        # change; job changes and call_soon() from any thread set _wake
+        loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._running = True
+        self.scheduler.on_wake = lambda: loop.call_soon_threadsafe(self._wake.set)
+        try:
+            while self._running:
+                self.scheduler.run_pending()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.scheduler.next_delay())
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+        finally:
+            self.scheduler.on_wake = None
+
+    def stop(self):
+        self._running = False
+        if self._wake:
+            self._wake.set()
+
+    async def run_forever(self):
+        self.log("Starting Scheduler Service...")
+        if self.config.get("auto_connect", False):
+            # Connect in the background so scheduling is not held up by OBS
+            self._spawn(self.connect_obs())
+
+        self.compact_tasks(reschedule=False)
+        self.schedule_jobs_from_config(reload=False)
+
+        if self.store is None:
+            loop = asyncio.get_running_loop()
+            self.watcher = ConfigWatcher(
+                self.config_file,
+                lambda data: loop.call_soon_threadsafe(self.reload_config_data, data),
+                log=self.log
+            )
+            self.watcher.start()
+            self.log(f"Watching {self.config_file} for changes ({self.watcher.mode}).")
+
+        self.start_metrics_server()
+        try:
+            await self.run_scheduler()
+        finally:
+            self.stop_metrics_server()
+            if self.watcher:
+                self.watcher.stop()
+            await self.shutdown()
+
+    async def shutdown(self):
+        self.config_writer.flush()
+        self.stop()
+        for task in list(self._tasks):
+            task.cancel()
+        for conn in self.connections.values():
+            await conn.close()
+        if self.store:
+            self.store.close()
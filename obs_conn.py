@@ -0,0 +1,377 @@
+import json
+import random
+import threading
+import time
+from collections import deque
+
+DISCONNECTED = "disconnected"
+CONNECTING = "connecting"
+CONNECTED = "connected"
+BACKOFF = "backoff"
+
+# Returned by ConnectionManager.run when the request was queued for retry
+QUEUED = "queued"
+# Returned by ConnectionManager.run when the link failed after the request was
+# written; OBS may have acted on it, so it is not retried
+LOST = "lost"
+# Passed to a request's on_failed when it was never sent: its deadline passed
+# or the connection was closed on purpose while it was queued
+DROPPED = "dropped"
+
+# obs-websocket v5 opcodes and batch execution types
+OP_REQUEST_BATCH = 8
+OP_REQUEST_BATCH_RESPONSE = 9
+BATCH_SERIAL_REALTIME = 0
+
+
+def send_batch(client, request_types):
+    # Sends the requests as one RequestBatch (single round trip) executed
+    # serially in the given order. Returns [(requestType, ok, comment), ...].
+    # ReqClient has no batch API, so this talks to its websocket directly.
+    ws = client.base_client.ws
+    batch_id = f"batch-{random.getrandbits(32):08x}"
+    ws.send(json.dumps({
+        "op": OP_REQUEST_BATCH,
+        "d": {
+            "requestId": batch_id,
+            "haltOnFailure": False,
+            "executionType": BATCH_SERIAL_REALTIME,
+            "requests": [
+                {"requestType": request_type, "requestId": str(i)}
+                for i, request_type in enumerate(request_types)
+            ],
+        },
+    }))
+    while True:
+        message = json.loads(ws.recv())
+        if message.get("op") == OP_REQUEST_BATCH_RESPONSE and message["d"].get("requestId") == batch_id:
+            break
+
+    results = {}
+    for result in message["d"].get("results", []):
+        status = result.get("requestStatus", {})
+        results[result.get("requestId")] = (status.get("result", False), status.get("comment") or f"code {status.get('code')}")
+    return [
+        (request_type,) + results.get(str(i), (False, "no result returned"))
+        for i, request_type in enumerate(request_types)
+    ]
+
+
+class NotSent(ConnectionError):
+    # The websocket was already closed when a request frame was about to be written
+    pass
+
+
+class PendingRequest:
+    __slots__ = ("func", "description", "deadline", "on_failed")
+
+    def __init__(self, func, description, deadline, on_failed=None):
+        self.func = func
+        self.description = description
+        self.deadline = deadline
+        self.on_failed = on_failed
+
+    def failed(self, result):
+        if self.on_failed:
+            self.on_failed(result)
+
+
+class ConnectionManager:
+    # Owns the obs.ReqClient on a dedicated thread. Reconnects with jittered
+    # exponential backoff while a connection is wanted, and holds requests
+    # submitted while the link is down until it comes back or their deadline
+    # passes. Requests on a live connection run on the caller's thread.
+
+    def __init__(self, settings, log=None, timeout=3, backoff_initial=1.0, backoff_max=60.0, name="default"):
+        self.settings = settings # callable -> (host, port, password)
+        self.log = log
+        self.name = name
+        self.timeout = timeout
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.on_state = None
+        self.state = DISCONNECTED
+        self.client = None
+        self.last_error = ""
+        self.reconnect_attempts = 0
+
+        self.request_lock = threading.RLock() # ReqClient is not thread-safe
+        self._frames_sent = 0 # frames written on the client's websocket
+        self._cond = threading.Condition()
+        self._pending = deque()
+        self._want_connected = False
+        self._retry_at = 0.0
+        self._failures = 0
+        self._attempts_done = 0
+        self._check_requested = False
+        self._running = False
+        self._thread = None
+
+    def _log(self, message):
+        if self.log:
+            self.log(message if self.name == "default" else f"[{self.name}] {message}")
+
+    def _set_state(self, state):
+        # Caller holds self._cond
+        if state != self.state:
+            self.state = state
+            if self.on_state:
+                self.on_state(state)
+
+    @property
+    def is_connected(self):
+        return self.state == CONNECTED
+
+    # --- Public API ---
+
+    def start(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=self.timeout + 1)
+            self._thread = None
+        self._close_client()
+
+    def connect(self, wait=True):
+        # Requests an immediate attempt; with wait=True blocks until it finished
+        with self._cond:
+            self._want_connected = True
+            self._retry_at = 0.0
+            target = self._attempts_done + 1
+            self._cond.notify_all()
+            if not wait:
+                return None
+            while self._running and self.state != CONNECTED and self._attempts_done < target:
+                self._cond.wait()
+            if self.state == CONNECTED:
+                return True, "Connected successfully."
+            return False, self.last_error
+
+    def disconnect(self):
+        with self._cond:
+            self._want_connected = False
+            dropped = list(self._pending)
+            self._pending.clear()
+            self._set_state(DISCONNECTED)
+            self._cond.notify_all()
+        self._close_client()
+        if dropped:
+            self._log(f"Dropped {len(dropped)} queued request(s) on disconnect.")
+            for request in dropped:
+                request.failed(DROPPED)
+
+    def check(self):
+        # Health-check the link (or start connecting) on the manager thread
+        with self._cond:
+            self._want_connected = True
+            if self.state == CONNECTED:
+                self._check_requested = True
+            else:
+                self._retry_at = 0.0
+            self._cond.notify_all()
+
+    def run(self, func, description, deadline, on_failed=None):
+        # Runs func(client) now if connected and returns its result; otherwise
+        # queues it until the connection is back or 'deadline' (epoch seconds)
+        # has passed and returns QUEUED. A request that failed after it was
+        # written is not retried and returns LOST. on_failed(LOST or DROPPED)
+        # is called for requests that end without a result, also later ones.
+        request = PendingRequest(func, description, deadline, on_failed)
+        if self.is_connected:
+            ok, value = self._call(func, description)
+            if ok:
+                return value
+            if value:
+                request.failed(LOST)
+                return LOST
+        self._enqueue(request)
+        return QUEUED
+
+    # --- Internals ---
+
+    def _call(self, func, description):
+        # Runs func(client) -> (True, result), or (False, sent) if it raised;
+        # 'sent' is whether any frame was written, i.e. OBS may have seen it
+        error = None
+        with self.request_lock:
+            frames = self._frames_sent
+            try:
+                return True, func(self.client)
+            except Exception as e:
+                error = e
+            sent = self._frames_sent != frames
+        if sent:
+            self._log(f"Connection lost during {description} after it was sent; not retrying: {error}")
+        else:
+            self._log(f"Connection lost during {description}: {error}")
+        self._connection_lost()
+        return False, sent
+
+    def _count_sends(self, client):
+        # Wraps the websocket's send so _call can tell whether a failed
+        # request reached the wire; a closed socket fails before writing
+        ws = client.base_client.ws
+        send = ws.send
+
+        def counted(*args, **kwargs):
+            if not ws.connected:
+                raise NotSent("socket is already closed")
+            self._frames_sent += 1
+            return send(*args, **kwargs)
+        ws.send = counted
+
+    def _enqueue(self, request):
+        with self._cond:
+            self._pending.append(request)
+            self._want_connected = True
+            self._cond.notify_all()
+        remaining = max(0, request.deadline - time.time())
+        self._log(f"Not connected. Queued {request.description} for up to {remaining:.0f}s while reconnecting.")
+
+    def _connection_lost(self):
+        with self._cond:
+            if self.state == CONNECTED:
+                self._set_state(BACKOFF)
+                self._retry_at = 0.0
+                self._cond.notify_all()
+
+    def _close_client(self):
+        with self.request_lock:
+            client, self.client = self.client, None
+        if client:
+            try:
+                client.disconnect()
+            except Exception:
+                pass
+
+    def _backoff_delay(self):
+        base = min(self.backoff_max, self.backoff_initial * (2 ** (self._failures - 1)))
+        return base * random.uniform(0.5, 1.0)
+
+    def _expire_pending(self, now):
+        # Caller holds self._cond. Callers pass different deadlines, so an
+        # expired request can sit behind one that is still waiting.
+        if any(request.deadline <= now for request in self._pending):
+            expired = [request for request in self._pending if request.deadline <= now]
+            self._pending = deque(request for request in self._pending if request.deadline > now)
+            for request in expired:
+                self._expired(request)
+
+    def _expired(self, request):
+        self._log(f"Dropping {request.description}: OBS not reachable before its deadline.")
+        request.failed(DROPPED)
+
+    def _next_wakeup(self, now):
+        # Caller holds self._cond
+        times = []
+        if self._pending:
+            times.append(min(r.deadline for r in self._pending))
+        if self._want_connected and self.state != CONNECTED:
+            times.append(self._retry_at)
+        if not times:
+            return None
+        return max(0.0, min(times) - now)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._running:
+                        return
+                    now = time.time()
+                    self._expire_pending(now)
+                    if self._check_requested and self.state == CONNECTED:
+                        action = "check"
+                        self._check_requested = False
+                        break
+                    if self._want_connected and self.state != CONNECTED and now >= self._retry_at:
+                        action = "connect"
+                        self._set_state(CONNECTING)
+                        break
+                    if self._pending and self.state == CONNECTED:
+                        action = "drain"
+                        break
+                    self._cond.wait(self._next_wakeup(now))
+
+            if action == "check":
+                self._health_check()
+            elif action == "connect":
+                self._attempt()
+            else:
+                self._drain()
+
+    def _health_check(self):
+        try:
+            with self.request_lock:
+                self.client.get_version()
+        except Exception as e:
+            self._log(f"Connection health check failed: {e}")
+            self._connection_lost()
+
+    def _attempt(self):
+        import obsws_python as obs # Deferred: costs ~100 ms at import time
+        host, port, password = self.settings()
+        self._close_client()
+        error = ""
+        client = None
+        try:
+            client = obs.ReqClient(host=host, port=int(port), password=password, timeout=self.timeout)
+        except ConnectionRefusedError:
+            error = "Connection Refused. Is OBS running and WebSocket enabled?"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+
+        with self._cond:
+            self._attempts_done += 1
+            if client is not None and self._want_connected and self._running:
+                self._count_sends(client)
+                with self.request_lock:
+                    self.client = client
+                self._failures = 0
+                self.last_error = ""
+                self._set_state(CONNECTED)
+                self._log("Connected to OBS WebSocket.")
+            else:
+                if client is not None:
+                    # Disconnected or stopped while connecting
+                    client.disconnect()
+                    self.last_error = "Connection cancelled."
+                else:
+                    self.last_error = error
+                    self.reconnect_attempts += 1
+                    self._failures += 1
+                if self._want_connected:
+                    delay = self._backoff_delay()
+                    self._retry_at = time.time() + delay
+                    self._set_state(BACKOFF)
+                    self._log(f"Connection Error: {self.last_error} Retrying in {delay:.1f}s.")
+                else:
+                    self._set_state(DISCONNECTED)
+            self._cond.notify_all()
+
+    def _drain(self):
+        while True:
+            with self._cond:
+                if not self._pending or self.state != CONNECTED:
+                    return
+                request = self._pending.popleft()
+            if request.deadline <= time.time():
+                # Its deadline passed while earlier requests were draining
+                self._expired(request)
+                continue
+            self._log(f"Connection restored. Running queued {request.description}.")
+            ok, sent = self._call(request.func, request.description)
+            if not ok:
+                if sent:
+                    request.failed(LOST)
+                else:
+                    with self._cond:
+                        self._pending.appendleft(request)
+                return
@@ -1,266 +1,984 @@
-import obsws_python as obs
-import schedule
 import time
 import json
-import os
 import logging
+import signal
+import sys
+import threading
 from datetime import datetime
+from obs_engine import DeadlineScheduler, WEEKDAYS, ALL_DAYS, parse_time_of_day, weekday_mask, next_in_weekdays, at_date, once_at
+from obs_watch import ConfigWatcher
+from obs_conn import ConnectionManager, send_batch
+from obs_presets import PresetStore
+from obs_persist import DebouncedWriter, atomic_write, file_identity, load_json
+from obs_occurrences import OccurrenceIndex
+from obs_log import setup_logging, stop_logging
+from obs_metrics import FireMetrics, FireRecord
+
+# Heavy or rarely needed modules (obsws_python, concurrent.futures, argparse)
+# are imported where they are used so importing this module stays cheap.
+
+# OBS request type for each action. Actions due at the same moment are sent
+# in this order, so recording starts before and stops after the stream.
+ACTION_REQUESTS = {
+    "Start Recording": "StartRecord",
+    "Start Streaming": "StartStream",
+    "Stop Streaming": "StopStream",
+    "Stop Recording": "StopRecord",
+}
+ACTION_ORDER = list(ACTION_REQUESTS)
+
+# Name of the endpoint defined by the top-level host/port/password. Tasks
+# without "targets" run there; fleet endpoints are listed under "endpoints".
+DEFAULT_ENDPOINT = "default"
+
+# Config paths with these extensions use the SQLite store instead of JSON files
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+def task_targets(task):
+    targets = task.get("targets") or [DEFAULT_ENDPOINT]
+    return tuple([targets] if isinstance(targets, str) else targets)
+
+def group_batch(items):
+    # [(deadline, (action, targets)), ...] -> {endpoint: [action, ...]} in send order
+    per_target = {}
+    for deadline, (action, targets) in items:
+        for name in targets:
+            per_target.setdefault(name, []).append((deadline, action))
+    for name, pairs in per_target.items():
+        pairs.sort(key=lambda item: (item[0], ACTION_ORDER.index(item[1]) if item[1] in ACTION_ORDER else len(ACTION_ORDER)))
+        per_target[name] = [action for _, action in pairs]
+    return per_target
+
+def task_identity(task):
+    # Stable key for a task definition; 'enabled' only decides whether it is scheduled
+    return json.dumps({k: v for k, v in task.items() if k != "enabled"}, sort_keys=True)
+
+
+class CompiledTask:
+    # A task dict validated once: time as seconds since midnight, weekly days
+    # as a bitmask (bit 0 = Monday) and one-time dates as a date ordinal.
+    __slots__ = ("kind", "action", "time", "seconds", "weekdays", "date", "targets", "unknown_days")
+
+    def __init__(self, kind, action, time, seconds, weekdays=0, date=None, targets=(DEFAULT_ENDPOINT,), unknown_days=()):
+        self.kind = kind
+        self.action = action
+        self.time = time
+        self.seconds = seconds
+        self.weekdays = weekdays
+        self.date = date
+        self.targets = targets
+        self.unknown_days = unknown_days
+
+    @property
+    def date_str(self):
+        return datetime.fromordinal(self.date).strftime("%Y-%m-%d") if self.date is not None else None
+
+    def fire_time(self):
+        # Epoch seconds of a one-time task's single run
+        return at_date(self.date, self.seconds) if self.date is not None else None
+
+    def __repr__(self):
+        return f"CompiledTask({self.kind} {self.action} at {self.time})"
+
+
+def compile_task(task):
+    # Returns a CompiledTask, or None when the task lacks a time or action.
+    # Raises ValueError for an invalid time, date or type.
+    t_time = task.get("time")
+    t_action = task.get("action")
+    if not t_time or not t_action:
+        return None
+    seconds = parse_time_of_day(t_time)
+    # Default to 'daily' for backward compatibility
+    kind = task.get("type", "daily")
+    if kind == "daily":
+        return CompiledTask(kind, t_action, t_time, seconds, ALL_DAYS, targets=task_targets(task))
+    if kind == "weekly":
+        mask, unknown = weekday_mask(task.get("days", []))
+        return CompiledTask(kind, t_action, t_time, seconds, mask, targets=task_targets(task), unknown_days=tuple(unknown))
+    if kind == "onetime":
+        t_date = task.get("date")
+        if not t_date:
+            return None
+        ordinal = datetime.strptime(t_date, "%Y-%m-%d").toordinal()
+        return CompiledTask(kind, t_action, t_time, seconds, date=ordinal, targets=task_targets(task))
+    raise ValueError(f"Unknown task type '{kind}'")
+
+
+def split_expired(tasks, now):
+    # -> (kept, expired): one-time tasks whose run time has passed are expired.
+    # Tasks that do not compile are kept so nothing is lost silently.
+    kept, expired = [], []
+    for task in tasks:
+        try:
+            compiled = compile_task(task) if task.get("type") == "onetime" else None
+        except Exception:
+            compiled = None
+        if compiled is not None and compiled.fire_time() <= now:
+            expired.append(task)
+        else:
+            kept.append(task)
+    return kept, expired
 
-# Setup basic logging
-logging.basicConfig(
-    filename='obs_scheduler.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 
 class OBSSchedulerCore:
-        def __init__(self, config_file="obs_scheduler_config.json", log_callback=None):
+        def __init__(self, config_file="obs_scheduler_config.json", log_callback=None, clock=time.time):
             self.config_file = config_file
+            self.clock = clock # schedule time; obs_sim passes a virtual clock
             self.presets_file = "presets.json"
-            self.obs_client = None
-            self.is_connected = False
-            self.last_mtime = 0
+            self._preset_store = None
+            self.archive_file = "obs_scheduler_archive.json"
+            self.on_tasks_changed = None # called after compaction changed config["tasks"]
+            # Held while config["tasks"] is read and replaced, so edits from the
+            # GUI worker and compaction on the scheduler thread don't undo each other
+            self.config_lock = threading.RLock()
+            self._config_identity = None # config file as last written here
+            self.watcher = None
+            self.metrics_port = None # overrides config "metrics_port"
+            self.metrics_server = None
             self.log_callback = log_callback
+            self.scheduler = DeadlineScheduler(clock=clock, log=self.log)
+            self.scheduler.on_lead = self.prewarm_connection
+            self.scheduler.on_batch = self.dispatch_batch
+            self.task_jobs = {} # task identity -> scheduler job ids
+            self.compiled_tasks = {} # task identity -> CompiledTask
+            self.occurrences = OccurrenceIndex(clock=clock) # upcoming fires of the scheduled tasks
+            self.metrics = FireMetrics(log=self.log) # fire latency per action and host
+            # Optional SQLite storage, chosen by the config file's extension
+            self.store = None
+            if config_file.lower().endswith(SQLITE_SUFFIXES):
+                from obs_sqlite import SQLiteStore
+                self.store = SQLiteStore(config_file, log=self.log)
             self.config = self.load_config()
+            # Bursts of saves (every UI edit saves) become one durable write
+            self.config_writer = DebouncedWriter(
+                self.write_config_data,
+                delay=float(self.config.get("save_delay_ms", 500)) / 1000,
+                log=self.log
+            )
+            self.scheduler.lead_time = float(self.config.get("prewarm_seconds", 30))
+            self.scheduler.batch_window = float(self.config.get("batch_window_ms", 0)) / 1000
+            self.apply_slo()
+            # Each endpoint's manager owns its OBS client and reconnects in the background
+            self.connections = {}
+            self.fleet_pool = None
+            self.active_targets = set()
+            self.conn = self.add_endpoint(DEFAULT_ENDPOINT)
+            self.sync_endpoints()
+
+        @property
+        def is_connected(self):
+            return self.conn.is_connected
+
+        @property
+        def obs_client(self):
+            return self.conn.client
     
         def log(self, message):
-            print(message)
+            # Only enqueues; console and file output happen on the log thread
             logging.info(message)
             if self.log_callback:
                 self.log_callback(message)
     
         def load_config(self):
-            if os.path.exists(self.config_file):
-                try:
-                    # Update mtime
-                    self.last_mtime = os.path.getmtime(self.config_file)
-                    with open(self.config_file, "r") as f:
-                        return json.load(f)
-                except Exception as e:
-                    self.log(f"Error loading config: {e}")
-                    return {}
-            return {}
+            if self.store:
+                return self.store.load_config()
+            # Falls back to the .bak generation if the file is damaged
+            config = load_json(self.config_file, {}, log=self.log)
+            return config if isinstance(config, dict) else {}
         
-        def load_presets_file(self):
-            if os.path.exists(self.presets_file):
-                try:
-                    with open(self.presets_file, "r") as f:
-                        return json.load(f)
-                except Exception as e:
-                    self.log(f"Error loading presets: {e}")
-                    return {}
-            return {}
-    
-        def save_presets_file(self, data):
-            try:
-                with open(self.presets_file, "w") as f:
-                    json.dump(data, f, indent=4)
-            except Exception as e:
-                self.log(f"Error saving presets: {e}")
+        @property
+        def presets(self):
+            # Parsed presets.json, cached until the file changes on disk
+            if self.store:
+                return self.store.presets
+            if self._preset_store is None or self._preset_store.path != self.presets_file:
+                self._preset_store = PresetStore(self.presets_file, log=self.log)
+            return self._preset_store
     
-        # ... (Connection and Execution methods remain unchanged) ...
+        # --- Connection and Execution ---
+
+        def endpoint_settings(self, name):
+            if name == DEFAULT_ENDPOINT:
+                endpoint = self.config
+            else:
+                endpoint = self.config.get("endpoints", {}).get(name, {})
+            return (endpoint.get("host", "localhost"),
+                    endpoint.get("port", 4455),
+                    endpoint.get("password", ""))
+
+        def add_endpoint(self, name):
+            conn = ConnectionManager(lambda: self.endpoint_settings(name), log=self.log, name=name)
+            conn.start()
+            self.connections[name] = conn
+            return conn
+
+        def sync_endpoints(self):
+            # Starts managers for new fleet endpoints and stops removed ones
+            wanted = set(self.config.get("endpoints", {})) | {DEFAULT_ENDPOINT}
+            for name in list(self.connections):
+                if name not in wanted:
+                    self.connections.pop(name).stop()
+                    self.log(f"Endpoint '{name}' removed.")
+            for name in wanted:
+                if name not in self.connections:
+                    self.add_endpoint(name)
     
         def connect_obs(self):
-            host = self.config.get("host", "localhost")
-            port = self.config.get("port", 4455)
-            password = self.config.get("password", "")
-    
-            try:
-                # Ensure port is int
-                port = int(port)
-                self.obs_client = obs.ReqClient(host=host, port=port, password=password, timeout=3)
-                self.is_connected = True
-                self.log("Connected to OBS WebSocket.")
-                return True, "Connected successfully."
-            except ConnectionRefusedError:
-                msg = "Connection Refused. Is OBS running and WebSocket enabled?"
-                self.is_connected = False
-                self.log(msg)
-                return False, msg
-            except Exception as e:
-                self.is_connected = False
-                self.log(f"Connection Error: {e}")
-                return False, str(e)
+            # Blocks until one connection attempt finished; on failure the
+            # connection manager keeps retrying in the background with backoff
+            return self.conn.connect(wait=True)
     
+        def prewarm_connection(self, deadline):
+            # Called by the scheduler 'prewarm_seconds' before each fire time so the
+            # handshake and authentication are off the critical path of the action.
+            # The checks themselves run on each endpoint's manager thread.
+            for name in self.active_targets:
+                conn = self.connections.get(name)
+                if conn is None:
+                    continue
+                if not conn.is_connected:
+                    fire_time = datetime.fromtimestamp(deadline).strftime("%H:%M:%S")
+                    self.log(f"Pre-warming OBS connection to {name} for task at {fire_time}...")
+                conn.check()
+
         def disconnect_obs(self):
-            self.obs_client = None
-            self.is_connected = False
+            self.conn.disconnect()
             self.log("Disconnected from OBS.")
+
+        def shutdown(self):
+            self.config_writer.flush()
+            self.scheduler.stop()
+            for conn in self.connections.values():
+                conn.stop()
+            if self.fleet_pool:
+                self.fleet_pool.shutdown(wait=False)
+            if self.store:
+                self.store.close()
+
+        def fan_out(self, targets, call):
+            # Runs call(conn) for every target endpoint in parallel and returns
+            # {target: result}. A single target runs inline on the caller's thread.
+            results = {}
+            conns = []
+            for name in targets:
+                if name in self.connections:
+                    conns.append(self.connections[name])
+                else:
+                    self.log(f"Unknown endpoint '{name}' skipped.")
+                    results[name] = "unknown endpoint"
+
+            if len(conns) == 1:
+                results[conns[0].name] = call(conns[0])
+                return results
+
+            if self.fleet_pool is None:
+                from concurrent.futures import ThreadPoolExecutor
+                workers = int(self.config.get("fleet_workers", 32))
+                self.fleet_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="obs-fleet")
+            from concurrent.futures import as_completed
+            futures = {self.fleet_pool.submit(call, conn): conn.name for conn in conns}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    results[futures[future]] = f"error: {e}"
+            summary = ", ".join(f"{name}={result}" for name, result in sorted(results.items()))
+            self.log(f"Fleet results: {summary}")
+            return results
     
-        def execute_action(self, action):
-            self.log(f"Executing task: {action}...")
-            
-            # Attempt reconnect if needed
-            if not self.is_connected or not self.obs_client:
-                self.log("Not connected. Attempting to reconnect...")
-                if not self.connect_obs()[0]: # Check tuple first element
-                    self.log("Reconnect failed. Skipping task.")
-                    return
-    
+        # Scheduler jobs fire through dispatch_*; the asyncio core overrides
+        # these to hand the work to its event loop instead
+
+        def dispatch_action(self, action, targets=(DEFAULT_ENDPOINT,), scheduled=None):
+            if scheduled is None:
+                scheduled = self.scheduler.firing
+            return self.execute_action(action, targets, scheduled)
+
+        def dispatch_batch(self, items):
+            return self.execute_batch(items)
+
+        def record_fires(self, endpoint, actions, scheduled, dispatched, sent, acked, waited, result):
+            # One FireRecord per action; scheduled: {action: epoch seconds}
+            host = self.endpoint_settings(endpoint)[0]
+            for action in actions:
+                self.metrics.record(FireRecord(
+                    action, endpoint, host, scheduled.get(action, dispatched), dispatched,
+                    sent, acked, waited, result
+                ))
+
+        def record_failures(self, endpoint, actions, scheduled, dispatched, result):
+            # Fires that ended without an answer from OBS (lost or dropped)
+            for action in actions:
+                self.metrics.record_failure(action, endpoint, scheduled.get(action, dispatched), dispatched, result)
+
+        def run_timed(self, conn, actions, scheduled, description, deadline, send):
+            # conn.run(send) with the attempt that reaches OBS recorded, and
+            # requests that end without a result (lost, dropped) counted. Time
+            # spent queued while (re)connecting counts as 'reconnect' wait.
+            dispatched = time.time()
+            state = {"attempt": 0, "connected": conn.is_connected}
+
+            def request(client):
+                state["attempt"] += 1
+                sent = time.time()
+                result = send(client)
+                waited = 0.0 if state["connected"] and state["attempt"] == 1 else sent - dispatched
+                self.record_fires(conn.name, actions, scheduled, dispatched, sent, time.time(), waited, result)
+                return result
+
+            def failed(result):
+                self.record_failures(conn.name, actions, scheduled, dispatched, result)
+            return conn.run(request, description, deadline, on_failed=failed)
+
+        def execute_action(self, action, targets=(DEFAULT_ENDPOINT,), scheduled=None):
+            scheduled = {action: time.time() if scheduled is None else scheduled}
+            if tuple(targets) == (DEFAULT_ENDPOINT,):
+                self.log(f"Executing task: {action}...")
+            else:
+                self.log(f"Executing task: {action} on {', '.join(targets)}...")
+            # If OBS is unreachable the action is queued and retried as soon as
+            # the connection manager reconnects, for up to 'retry_window_seconds'
+            deadline = time.time() + float(self.config.get("retry_window_seconds", 60))
+            return self.fan_out(targets, lambda conn: self.run_timed(
+                conn, [action], scheduled, action, deadline,
+                lambda client: self.send_action(client, action, conn.name)
+            ))
+
+        def send_action(self, client, action, endpoint=DEFAULT_ENDPOINT):
+            from obsws_python.error import OBSSDKRequestError
+            where = "" if endpoint == DEFAULT_ENDPOINT else f" on {endpoint}"
             try:
                 if action == "Start Streaming":
-                    self.obs_client.start_stream()
+                    client.start_stream()
                 elif action == "Stop Streaming":
-                    self.obs_client.stop_stream()
+                    client.stop_stream()
                 elif action == "Start Recording":
-                    self.obs_client.start_record()
+                    client.start_record()
                 elif action == "Stop Recording":
-                    self.obs_client.stop_record()
-                self.log(f"Successfully executed: {action}")
-            except Exception as e:
-                self.log(f"Failed to execute {action}: {e}")
-                # If execution fails, it might be a connection drop
-                self.is_connected = False
+                    client.stop_record()
+                self.log(f"Successfully executed: {action}{where}")
+                return "ok"
+            except OBSSDKRequestError as e:
+                # OBS answered but refused (e.g. already streaming); not retried
+                self.log(f"Failed to execute {action}{where}: {e}")
+                return "failed"
+
+        def execute_batch(self, items):
+            # Called by the scheduler with [(deadline, (action, targets)), ...] for
+            # jobs due together; every endpoint gets one batch with its own actions
+            per_target = group_batch(items)
+            scheduled = {action: fire_time for fire_time, (action, _) in sorted(items, key=lambda item: item[0], reverse=True)}
+            for name, actions in per_target.items():
+                where = "" if name == DEFAULT_ENDPOINT else f" on {name}"
+                self.log(f"Executing batch{where}: {', '.join(actions)}...")
+            deadline = time.time() + float(self.config.get("retry_window_seconds", 60))
+            return self.fan_out(list(per_target), lambda conn: self.run_timed(
+                conn, per_target[conn.name], scheduled, f"batch ({', '.join(per_target[conn.name])})", deadline,
+                lambda client: self.send_batch_actions(client, per_target[conn.name], conn.name)
+            ))
+
+        def send_batch_actions(self, client, actions, endpoint=DEFAULT_ENDPOINT):
+            where = "" if endpoint == DEFAULT_ENDPOINT else f" on {endpoint}"
+            known = [a for a in actions if a in ACTION_REQUESTS]
+            for action in actions:
+                if action not in ACTION_REQUESTS:
+                    self.log(f"Failed to execute {action}{where}: unknown action")
+            results = send_batch(client, [ACTION_REQUESTS[a] for a in known])
+            failed = 0
+            for action, (_, ok, comment) in zip(known, results):
+                if ok:
+                    self.log(f"Successfully executed: {action}{where}")
+                else:
+                    failed += 1
+                    self.log(f"Failed to execute {action}{where}: {comment}")
+            return "ok" if not failed and len(known) == len(actions) else "failed"
     
-        def run_if_date_matches(self, target_date, action):
-            today_str = datetime.now().strftime("%Y-%m-%d")
-            if today_str == target_date:
-                self.log(f"Date matched ({target_date}). Executing one-time task.")
-                self.execute_action(action)
-                return schedule.CancelJob
-            elif today_str > target_date:
-                self.log(f"Task date {target_date} has passed. Removing job.")
-                return schedule.CancelJob
-            # If future, do nothing and wait for next check
+        def run_onetime(self, action, targets=(DEFAULT_ENDPOINT,)):
+            self.log(f"Executing one-time task: {action}")
+            self.dispatch_action(action, targets)
+            # Drop the finished task from config and presets
+            self.scheduler.call_soon(self.compact_tasks)
     
-        def schedule_jobs_from_config(self):
-            schedule.clear()
-            self.config = self.load_config() # Reload config to get latest
+        def schedule_jobs_from_config(self, reload=True):
+            reload_start = time.perf_counter()
+            if reload:
+                self.config = self.load_config() # Reload config to get latest
+            self.scheduler.lead_time = float(self.config.get("prewarm_seconds", 30))
+            self.scheduler.batch_window = float(self.config.get("batch_window_ms", 0)) / 1000
+            self.apply_slo()
+            self.sync_endpoints()
             tasks = self.config.get("tasks", [])
             
             if not tasks:
                 self.log("No tasks found in config.")
-            
+
+            start = time.perf_counter()
+            wanted = {}
             for task in tasks:
-                t_time = task.get("time")
-                t_action = task.get("action")
-                # Default to 'daily' for backward compatibility
-                t_type = task.get("type", "daily") 
-                t_enabled = task.get("enabled", True)
-
-                if not t_enabled:
-                    self.log(f"Skipping disabled task: {t_action} at {t_time}")
-                    continue
-                
-                if not t_time or not t_action:
+                if not task.get("enabled", True):
                     continue
+                key = task_identity(task)
+                # Identical duplicates each keep their own jobs
+                n = 1
+                unique_key = key
+                while unique_key in wanted:
+                    n += 1
+                    unique_key = f"{key}#{n}"
+                wanted[unique_key] = task
+
+            stale = [k for k in self.task_jobs if k not in wanted]
+            for key in stale:
+                for job_id in self.task_jobs.pop(key):
+                    self.scheduler.remove_job(job_id)
+                self.compiled_tasks.pop(key, None)
+            self.occurrences.remove_many(stale)
+            removed = len(stale)
+
+            added = 0
+            upcoming = []
+            for key, task in wanted.items():
+                if key not in self.task_jobs:
+                    compiled, self.task_jobs[key] = self.schedule_task(task)
+                    if compiled is not None:
+                        self.compiled_tasks[key] = compiled
+                        if self.task_jobs[key]:
+                            upcoming.append((key, compiled))
+                    added += 1
+            self.occurrences.add_many(upcoming)
+
+            self.active_targets = {name for compiled in self.compiled_tasks.values() for name in compiled.targets}
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            unchanged = len(wanted) - added
+            self.log(f"Schedule reconciled in {elapsed_ms:.1f} ms: "
+                     f"{added} added, {removed} removed, {unchanged} unchanged.")
+            self.log(f"Total scheduled jobs: {self.scheduler.job_count()}")
+            self.metrics.record_reload(time.perf_counter() - reload_start)
+
+        def schedule_task(self, task):
+            # Compiles one enabled task and registers its job; returns
+            # (CompiledTask or None, job ids)
+            try:
+                compiled = compile_task(task)
+            except Exception as e:
+                self.log(f"Failed to schedule task {task}: {e}")
+                return None, []
+            if compiled is None:
+                return None, []
+
+            action, t_time, targets = compiled.action, compiled.time, compiled.targets
+            if compiled.kind == "daily":
+                self.log(f"Scheduling Daily: {action} at {t_time}")
+                tag = f"Daily {action} at {t_time}"
+            elif compiled.kind == "weekly":
+                for day_name in compiled.unknown_days:
+                    self.log(f"Warning: Invalid day name '{day_name}' skipped.")
+                if not compiled.weekdays:
+                    return compiled, []
+                days = [WEEKDAYS[d] for d in range(7) if compiled.weekdays >> d & 1]
+                self.log(f"Scheduling Weekly ({','.join(days)}): {action} at {t_time}")
+                tag = f"Weekly {','.join(days)} {action} at {t_time}"
+            else:
+                t_date = compiled.date_str
+                fire_time = compiled.fire_time()
+                if fire_time <= self.clock():
+                    self.log(f"Task date {t_date} has passed. Not scheduling {action} at {t_time}.")
+                    return compiled, []
+                self.log(f"Scheduling One-time ({t_date}): {action} at {t_time}")
+                # A single absolute deadline; nothing runs before that date
+                job_id = self.scheduler.add_job(
+                    once_at(fire_time),
+                    lambda: self.run_onetime(action, targets),
+                    tag=f"One-time {t_date} {action} at {t_time}"
+                )
+                return compiled, [job_id]
+
+            # Daily and weekly tasks are a single job over their weekday mask
+            job_id = self.scheduler.add_job(
+                lambda after, m=compiled.weekdays, s=compiled.seconds: next_in_weekdays(m, s, after),
+                lambda: self.dispatch_action(action, targets),
+                tag=tag,
+                batch=(action, targets)
+            )
+            return compiled, [job_id]
     
+        def reload_config_data(self, data):
+            # Called on the scheduler thread with the new content of the config file
+            try:
+                config = json.loads(data)
+            except ValueError as e:
+                self.log(f"Ignoring invalid config file change: {e}")
+                return
+            self.log("Config file changed. Reloading schedule...")
+            self.config = config
+            self.schedule_jobs_from_config(reload=False)
+
+        def request_reload(self):
+            # Safe to call from a signal handler; the reload runs on the scheduler thread
+            self.scheduler.call_soon(self.schedule_jobs_from_config)
+
+        def request_reschedule(self, done=None):
+            # Reconcile the in-memory config on the scheduler thread; done()
+            # is called there afterwards, also when the pass failed
+            def reschedule():
                 try:
-                    if t_type == "daily":
-                        self.log(f"Scheduling Daily: {t_action} at {t_time}")
-                        schedule.every().day.at(t_time).do(self.execute_action, action=t_action)
-                    
-                    elif t_type == "weekly":
-                        days = task.get("days", [])
-                        self.log(f"Scheduling Weekly ({','.join(days)}): {t_action} at {t_time}")
-                        
-                        day_map = {
-                            "mon": "monday", "tue": "tuesday", "wed": "wednesday",
-                            "thu": "thursday", "fri": "friday", "sat": "saturday", "sun": "sunday"
-                        }
-                        
-                        for day_name in days:
-                            full_name = day_map.get(day_name.lower())
-                            if full_name:
-                                job_creator = getattr(schedule.every(), full_name, None)
-                                if job_creator:
-                                    job_creator.at(t_time).do(self.execute_action, action=t_action)
-                            else:
-                                self.log(f"Warning: Invalid day name '{day_name}' skipped.")
-                    
-                    elif t_type == "onetime":
-                        t_date = task.get("date")
-                        if t_date:
-                            self.log(f"Scheduling One-time ({t_date}): {t_action} at {t_time}")
-                            # Check every day at this time if the date matches
-                            schedule.every().day.at(t_time).do(
-                                self.run_if_date_matches, target_date=t_date, action=t_action
-                            )
-                except Exception as e:
-                    self.log(f"Failed to schedule task {task}: {e}")
-            
-            job_count = len(schedule.get_jobs())
-            self.log(f"Total scheduled jobs: {job_count}")
-            for job in schedule.get_jobs():
-                self.log(f" - Job: {job}")
-    
+                    self.schedule_jobs_from_config(reload=False)
+                finally:
+                    if done:
+                        done()
+            self.scheduler.call_soon(reschedule)
+
         def run_forever(self):
             self.log("Starting Scheduler Service...")
             if self.config.get("auto_connect", False):
-                self.connect_obs()
+                # Connect in the background so scheduling is not held up by OBS
+                self.conn.connect(wait=False)
                 
-            self.schedule_jobs_from_config()
-            
-            while True:
-                # Check for config file changes
-                try:
-                    if os.path.exists(self.config_file):
-                        current_mtime = os.path.getmtime(self.config_file)
-                        if current_mtime > self.last_mtime:
-                            self.log("Config file changed. Reloading schedule...")
-                            # Debounce slightly to ensure write is complete
-                            time.sleep(0.5)
-                            self.schedule_jobs_from_config()
-                except Exception as e:
-                    self.log(f"Error checking config file: {e}")
-    
-                schedule.run_pending()
-                time.sleep(1)
+            self.compact_tasks(reschedule=False)
+            self.schedule_jobs_from_config(reload=False)
+
+            # Reload on config file changes without polling. The SQLite store
+            # is only changed through this process; SIGHUP still reloads it.
+            if self.store is None:
+                self.watcher = ConfigWatcher(
+                    self.config_file,
+                    lambda data: self.scheduler.call_soon(lambda: self.reload_config_data(data)),
+                    log=self.log
+                )
+                self.watcher.start()
+                self.log(f"Watching {self.config_file} for changes ({self.watcher.mode}).")
+            else:
+                self.log(f"Using SQLite store {self.config_file}.")
+
+            self.start_metrics_server()
+            try:
+                self.scheduler.run_forever()
+            finally:
+                self.stop_metrics_server()
+                if self.watcher:
+                    self.watcher.stop()
+                self.config_writer.flush()
+                for conn in self.connections.values():
+                    conn.stop()
+                self.log("Scheduler Service stopped.")
     
+        # --- Expired Task Compaction ---
+
+        def compact_tasks(self, now=None, reschedule=True):
+            # Removes one-time tasks whose run time has passed from the config
+            # and all presets. Config "expired_tasks": "archive" (default) first
+            # appends them to archive_file, "delete" drops them, "keep" disables this.
+            mode = self.config.get("expired_tasks", "archive")
+            if mode == "keep":
+                return 0
+            now = self.clock() if now is None else now
+
+            with self.config_lock:
+                kept, expired = split_expired(self.config.get("tasks", []), now)
+                archived = [("config", task) for task in expired]
+                changed_presets = {}
+                for name, tasks in self.presets.items():
+                    if isinstance(tasks, list):
+                        kept_preset, expired_preset = split_expired(tasks, now)
+                        if expired_preset:
+                            changed_presets[name] = kept_preset
+                            archived += [(f"preset:{name}", task) for task in expired_preset]
+
+                if not archived:
+                    return 0
+                if mode == "archive" and not self.archive_tasks(archived, now):
+                    return 0 # Keep the tasks rather than lose them
+
+                if expired:
+                    self.config["tasks"] = kept
+                    self.save_config_file()
+                if changed_presets:
+                    self.presets.update(changed_presets)
+            self.log(f"Compacted {len(archived)} expired one-time task(s) ({mode}).")
+
+            if expired:
+                if reschedule:
+                    self.schedule_jobs_from_config(reload=False)
+                if self.on_tasks_changed:
+                    self.on_tasks_changed()
+            return len(archived)
+
+        def archive_tasks(self, entries, now):
+            # Appends [(source, task), ...] to the archive file; returns success
+            archive = load_json(self.archive_file, [], log=self.log)
+            if not isinstance(archive, list):
+                self.log(f"Error loading archive: {self.archive_file} is not a list")
+                return False
+            archived_at = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+            archive += [{"source": source, "archived_at": archived_at, "task": task} for source, task in entries]
+            try:
+                atomic_write(self.archive_file, json.dumps(archive, indent=4).encode())
+                return True
+            except Exception as e:
+                self.log(f"Error saving archive: {e}")
+                return False
+
         # --- Preset Management ---
     
-        def save_config_file(self):
+        def save_config_file(self, flush=False, tasks_changed=True):
+            # Queues the current config for a coalesced write; flush=True writes
+            # now. The SQLite store only rewrites its task rows if tasks_changed.
+            if self.store:
+                if tasks_changed:
+                    self.store.save_config(self.config)
+                else:
+                    self.store.save_settings(self.config)
+                return
             try:
-                with open(self.config_file, "w") as f:
-                    json.dump(self.config, f, indent=4)
-                self.last_mtime = os.path.getmtime(self.config_file) # Update mtime to avoid reload loop
+                self.config_writer.submit(json.dumps(self.config, indent=4).encode())
             except Exception as e:
                 self.log(f"Error saving config: {e}")
+                return
+            if flush:
+                self.config_writer.flush()
+
+        def write_config_data(self, data):
+            if self.watcher:
+                self.watcher.acknowledge(data) # Avoid reloading our own write
+            # Our last write is known to be valid JSON unless the file changed since
+            verified = self._config_identity is not None and file_identity(self.config_file) == self._config_identity
+            try:
+                atomic_write(self.config_file, data, verified=verified)
+            except OSError as e:
+                self.log(f"Error saving config: {e}")
+                return
+            self._config_identity = file_identity(self.config_file)
     
+        def apply_settings(self, settings, tasks=None):
+            # Merges settings (e.g. from the GUI) into the config and saves it;
+            # config["tasks"] is only replaced when 'tasks' is given, so a
+            # settings save never brings back tasks compacted in the meantime
+            with self.config_lock:
+                config = dict(self.config)
+                config.update(settings)
+                if tasks is not None:
+                    config["tasks"] = tasks
+                self.config = config
+                self.save_config_file(tasks_changed=tasks is not None)
+
+        # --- Single-task edits ---
+        # Each swaps in a new config["tasks"] list (the scheduler thread may be
+        # reading the old one), persists just that task when the SQLite store
+        # is in use, and reconciles the schedule on the scheduler thread.
+
+        def add_task(self, task):
+            with self.config_lock:
+                self.config["tasks"] = self.config.get("tasks", []) + [dict(task)]
+                if self.store:
+                    self.store.add_task(task)
+                else:
+                    self.save_config_file()
+            self.request_reschedule()
+
+        # The edits by index take the task the caller saw there as 'expected':
+        # compaction on the scheduler thread may have shifted the list since,
+        # so the task is looked up again and the edit skipped if it is gone.
+
+        def _task_index(self, index, expected):
+            # Caller holds config_lock
+            tasks = self.config.get("tasks", [])
+            if expected is None:
+                return index if 0 <= index < len(tasks) else None
+            key = task_identity(expected)
+            if 0 <= index < len(tasks) and task_identity(tasks[index]) == key:
+                return index
+            matches = [i for i, task in enumerate(tasks) if task_identity(task) == key]
+            if not matches:
+                self.log(f"Task #{index + 1} changed before the edit was saved; edit skipped.")
+                return None
+            return min(matches, key=lambda i: abs(i - index))
+
+        def update_task(self, index, task, expected=None):
+            with self.config_lock:
+                index = self._task_index(index, expected)
+                if index is None:
+                    return False
+                tasks = list(self.config.get("tasks", []))
+                tasks[index] = dict(task)
+                self.config["tasks"] = tasks
+                if self.store:
+                    self.store.update_task(index, task)
+                else:
+                    self.save_config_file()
+            self.request_reschedule()
+            return True
+
+        def set_task_enabled(self, index, enabled, expected=None):
+            with self.config_lock:
+                index = self._task_index(index, expected)
+                if index is None:
+                    return False
+                task = dict(self.config["tasks"][index])
+                task["enabled"] = enabled
+                return self.update_task(index, task)
+
+        def remove_task(self, index, expected=None):
+            with self.config_lock:
+                index = self._task_index(index, expected)
+                if index is None:
+                    return False
+                tasks = list(self.config.get("tasks", []))
+                del tasks[index]
+                self.config["tasks"] = tasks
+                if self.store:
+                    self.store.remove_task(index)
+                else:
+                    self.save_config_file()
+            self.request_reschedule()
+            return True
+
+        def find_tasks(self, start, end, host=None, endpoint=None):
+            # Enabled tasks firing in [start, end) -> [(fire_time, task), ...],
+            # e.g. find_tasks(now, now + 3600, host="10.0.0.11")
+            endpoints = None
+            if endpoint is not None:
+                endpoints = {endpoint}
+            if host is not None:
+                on_host = {name for name in self.connections if self.endpoint_settings(name)[0] == host}
+                endpoints = on_host if endpoints is None else endpoints & on_host
+            if self.store:
+                return self.store.tasks_between(start, end, endpoints)
+
+            results = []
+            for task in self.config.get("tasks", []):
+                if not task.get("enabled", True):
+                    continue
+                try:
+                    compiled = compile_task(task)
+                except Exception:
+                    continue
+                if compiled is None or (endpoints is not None and not endpoints.intersection(compiled.targets)):
+                    continue
+                if compiled.kind == "onetime":
+                    fire_time = compiled.fire_time()
+                    if start <= fire_time < end:
+                        results.append((fire_time, task))
+                    continue
+                fire_time = next_in_weekdays(compiled.weekdays, compiled.seconds, start - 1e-6)
+                while fire_time is not None and fire_time < end:
+                    results.append((fire_time, task))
+                    fire_time = next_in_weekdays(compiled.weekdays, compiled.seconds, fire_time)
+            results.sort(key=lambda item: item[0])
+            return results
+
+        # --- Fire latency ---
+
+        def apply_slo(self):
+            slo_ms = self.config.get("fire_lag_slo_ms")
+            self.metrics.lag_slo = float(slo_ms) / 1000 if slo_ms is not None else None
+
+        def start_metrics_server(self):
+            # Prometheus endpoint on config "metrics_host":"metrics_port"; off without a port
+            port = self.metrics_port if self.metrics_port is not None else self.config.get("metrics_port")
+            if port is None or self.metrics_server is not None:
+                return self.metrics_server
+            from obs_exporter import MetricsServer
+            try:
+                self.metrics_server = MetricsServer(self, self.config.get("metrics_host", "127.0.0.1"), int(port), log=self.log)
+            except (OSError, ValueError) as e:
+                self.log(f"Could not start metrics endpoint on port {port}: {e}")
+                return None
+            self.metrics_server.start()
+            return self.metrics_server
+
+        def stop_metrics_server(self):
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+                self.metrics_server = None
+
+        def latency_stats(self):
+            # p50/p95/p99 per action and per host for the stages in obs_metrics.STAGES
+            return self.metrics.stats()
+
+        def recent_fires(self, n=50):
+            return self.metrics.recent(n)
+
+        # --- Upcoming fires: [(time, CompiledTask), ...] in fire order ---
+
+        def next_fires(self, n=10):
+            return self.occurrences.next(n)
+
+        def fires_between(self, start, end):
+            return self.occurrences.between(start, end)
+
+        def find_conflicts(self, window=None, start=None, end=None):
+            # Fires on the same endpoint within 'window' seconds of each other
+            # (default: config "conflict_window_seconds", 60)
+            if window is None:
+                window = float(self.config.get("conflict_window_seconds", 60))
+            return self.occurrences.conflicts(window, start, end)
+
         def get_preset_names(self):
-            presets = self.load_presets_file()
-            return list(presets.keys())
+            return self.presets.names()
     
         def save_preset(self, name, tasks):
-            presets = self.load_presets_file()
-            presets[name] = tasks
-            self.save_presets_file(presets)
-            self.log(f"Preset '{name}' saved to {self.presets_file}.")
+            self.presets.set(name, tasks)
+            self.log(f"Preset '{name}' saved to {self.config_file if self.store else self.presets_file}.")
     
-        def load_preset(self, name):
-            presets = self.load_presets_file()
-            if name in presets:
-                self.config["tasks"] = presets[name]
-                self.save_config_file()
-                self.schedule_jobs_from_config()
+        def load_preset(self, name, reschedule=True):
+            tasks = self.presets.get(name)
+            if tasks is not None:
+                with self.config_lock:
+                    self.config["tasks"] = tasks
+                    self.save_config_file()
+                if reschedule:
+                    self.schedule_jobs_from_config(reload=False)
                 self.log(f"Preset '{name}' loaded.")
                 return True
             return False
     
         def delete_preset(self, name):
-            presets = self.load_presets_file()
-            if name in presets:
-                del presets[name]
-                self.save_presets_file(presets)
+            if self.presets.delete(name):
                 self.log(f"Preset '{name}' deleted.")
                 return True
             return False
 
         def import_presets(self, new_presets):
+            # Presets whose tasks would not compile are skipped
+            from obs_import import ImportReport
             if not isinstance(new_presets, dict):
                 return False, "Invalid format. Expected a dictionary of presets."
             
-            count = 0
-            current_presets = self.load_presets_file()
-            for name, tasks in new_presets.items():
-                if isinstance(tasks, list):
-                    current_presets[name] = tasks
-                    count += 1
+            report = ImportReport()
+            valid = dict(report.accept(("", name, tasks) for name, tasks in new_presets.items()))
+            for error in report.errors:
+                self.log(f"Import: {error}")
+            count = len(valid)
             
             if count > 0:
-                self.save_presets_file(current_presets)
+                self.presets.update(valid)
                 self.log(f"Imported {count} presets.")
-                return True, f"Successfully imported {count} presets."
+                return True, report.message()
             else:
                 return False, "No valid presets found to import."
-    
+
+        def import_presets_file(self, path, fmt=None):
+            # Streams a JSON or JSON Lines preset file (see obs_import) into the
+            # library with one write -> (success, message, ImportReport)
+            from obs_import import ImportReport, ImportFormatError, PresetSpool, read_presets
+            report = ImportReport()
+            try:
+                with PresetSpool() as spool:
+                    for name, tasks in report.accept(read_presets(path, fmt)):
+                        spool.add(name, tasks)
+                    if not len(spool):
+                        return False, "No valid presets found to import.", report
+                    if not self.presets.import_spool(spool):
+                        return False, "Failed to save the imported presets.", report
+            except ImportFormatError as e:
+                return False, str(e), report
+            except (OSError, UnicodeDecodeError) as e:
+                return False, f"Failed to read {path}: {e}", report
+            for error in report.errors:
+                self.log(f"Import: {error}")
+            self.log(f"Imported {report.imported} presets from {path}.")
+            return True, report.message(), report
+
+
+def simulate_command(args):
+    from obs_sim import simulate, load_simulation_config
+    try:
+        config = load_simulation_config(args.config, args.presets, args.preset, log=print)
+    except KeyError as e:
+        print(e.args[0])
+        return 1
+    start = None
+    if args.start:
+        fmt = "%Y-%m-%d %H:%M:%S" if " " in args.start else "%Y-%m-%d"
+        start = datetime.strptime(args.start, fmt).timestamp()
+
+    began = time.perf_counter()
+    result = simulate(config, args.days, start, keep_timeline=not args.counts_only)
+    elapsed = time.perf_counter() - began
+    if result.timeline is not None:
+        for fire_time, action, targets in result.timeline:
+            where = "" if targets == (DEFAULT_ENDPOINT,) else f"  [{', '.join(targets)}]"
+            print(f"{datetime.fromtimestamp(fire_time).strftime('%Y-%m-%d %a %H:%M:%S')}  {action}{where}")
+        print()
+    for day, counts in result.per_day.items():
+        summary = ", ".join(f"{action}: {n}" for action, n in sorted(counts.items()))
+        print(f"{day}  {sum(counts.values()):6d}  {summary}")
+    print(f"{result.total} action(s) over {args.days:g} day(s), simulated in {elapsed:.2f}s.")
+    return 0
+
+
+def main(argv=None):
+    # Headless entry point: python -m obs_core run --config obs_scheduler_config.json
+    import argparse
+    parser = argparse.ArgumentParser(prog="obs_core", description="OBS Auto Scheduler service (no GUI).")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", default="obs_scheduler_config.json", help="Path to the config file.")
+    common.add_argument("--presets", default="presets.json", help="Path to the presets file.")
+    common.add_argument("--archive", default="obs_scheduler_archive.json", help="Where expired one-time tasks are archived.")
+    common.add_argument("--log-file", default="obs_scheduler.log", help="Path to the log file.")
+    common.add_argument("--log-max-bytes", type=int, default=5 * 1024 * 1024, help="Rotate the log file at this size.")
+    common.add_argument("--log-backups", type=int, default=5, help="Number of rotated log files to keep.")
+    common.add_argument("--log-rotate-when", default=None, help="Rotate by time instead, e.g. 'midnight'.")
+    common.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on this local port.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("run", parents=[common], help="Run the scheduler until SIGTERM/SIGINT. SIGHUP reloads the config.")
+    commands.add_parser("compact", parents=[common], help="Remove (or archive) expired one-time tasks and exit.")
+    migrate_parser = commands.add_parser("migrate", parents=[common], help="Copy the JSON config and presets into a new SQLite store.")
+    migrate_parser.add_argument("--to", required=True, help="SQLite database to create, e.g. obs_scheduler.db.")
+    simulate_parser = commands.add_parser("simulate", parents=[common], help="Dry-run the schedule on a virtual clock and print what would fire.")
+    simulate_parser.add_argument("--days", type=float, default=7, help="Length of the simulated period.")
+    simulate_parser.add_argument("--start", default=None, help="Start of the period, 'YYYY-MM-DD[ HH:MM:SS]' (default: now).")
+    simulate_parser.add_argument("--preset", default=None, help="Simulate this preset's tasks instead of the config's.")
+    simulate_parser.add_argument("--counts-only", action="store_true", help="Print only the per-day action counts.")
+    import_parser = commands.add_parser("import-presets", parents=[common], help="Validate a JSON or JSON Lines preset file and add its presets.")
+    import_parser.add_argument("file", help="Presets to import: {name: [tasks]} or one preset per line (*.jsonl).")
+    import_parser.add_argument("--format", choices=("json", "jsonl"), default=None, help="Default: by file extension.")
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        from obs_sqlite import migrate_json
+        return 0 if migrate_json(args.config, args.presets, args.to) else 1
+
+    if args.command == "simulate":
+        return simulate_command(args)
+
+    setup_logging(args.log_file, args.log_max_bytes, args.log_backups, args.log_rotate_when)
+
+    core = OBSSchedulerCore(config_file=args.config)
+    core.presets_file = args.presets
+    core.archive_file = args.archive
+    core.metrics_port = args.metrics_port
+    try:
+        if args.command == "compact":
+            core.compact_tasks(reschedule=False)
+            return 0
+
+        if args.command == "import-presets":
+            success, message, report = core.import_presets_file(args.file, args.format)
+            print(message)
+            if report.error_count:
+                print(report.details(limit=len(report.errors)))
+            return 0 if success else 1
+
+        def handle_stop(signum, frame):
+            core.log(f"Received {signal.Signals(signum).name}, shutting down...")
+            core.scheduler.stop()
+
+        signal.signal(signal.SIGTERM, handle_stop)
+        signal.signal(signal.SIGINT, handle_stop)
+        if hasattr(signal, "SIGHUP"):
+            def handle_reload(signum, frame):
+                core.log("Received SIGHUP, reloading config...")
+                core.request_reload()
+            signal.signal(signal.SIGHUP, handle_reload)
+
+        core.run_forever()
+        return 0
+    finally:
+        # Flushes the config write, closes the SQLite store and drains the log queue
+        core.shutdown()
+        stop_logging()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,352 @@
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+class CancelJob:
+    # Return this from a job function to remove the job after it runs
+    pass
+
+
+def parse_time_of_day(t_time):
+    # "HH:MM" or "HH:MM:SS" -> seconds since midnight
+    parts = t_time.split(":")
+    if len(parts) not in (2, 3):
+        raise ValueError(f"Invalid time format '{t_time}'")
+    hour, minute = int(parts[0]), int(parts[1])
+    second = int(parts[2]) if len(parts) == 3 else 0
+    if not (0 <= hour < 24 and 0 <= minute < 60 and 0 <= second < 60):
+        raise ValueError(f"Invalid time '{t_time}'")
+    return hour * 3600 + minute * 60 + second
+
+
+def weekday_mask(days):
+    # ["mon", "Wednesday", ...] -> (bitmask with bit 0 = Monday, unknown names)
+    mask = 0
+    unknown = []
+    for day_name in days:
+        key = str(day_name).lower()[:3]
+        if key in WEEKDAYS:
+            mask |= 1 << WEEKDAYS.index(key)
+        else:
+            unknown.append(day_name)
+    return mask, unknown
+
+
+ALL_DAYS = (1 << 7) - 1
+
+
+# Local days by date ordinal -> (midnight timestamp, length in seconds). On
+# the usual 86400-second days a wall-clock time is midnight + seconds; only
+# days with a UTC offset change go through datetime. Assumes the process's
+# time zone does not change while it runs.
+_local_days = {}
+_last_day = (0.0, 0.0, 0, 0) # (start, end, ordinal, weekday) of the last lookup
+
+
+def _local_day(date_ordinal):
+    day = _local_days.get(date_ordinal)
+    if day is None:
+        if len(_local_days) >= 4096:
+            _local_days.clear()
+        start = datetime.fromordinal(date_ordinal).timestamp()
+        day = _local_days[date_ordinal] = (start, datetime.fromordinal(date_ordinal + 1).timestamp() - start)
+    return day
+
+
+def next_in_weekdays(mask, seconds_of_day, after):
+    # Next time at seconds_of_day on any weekday in 'mask' strictly after 'after'
+    global _last_day
+    if not mask & ALL_DAYS:
+        return None
+    start, end, ordinal, weekday = _last_day
+    if not start <= after < end:
+        date = datetime.fromtimestamp(after).date()
+        ordinal, weekday = date.toordinal(), date.weekday()
+        start, length = _local_day(ordinal)
+        _last_day = (start, start + length, ordinal, weekday)
+    for offset in range(8):
+        if mask >> ((weekday + offset) % 7) & 1:
+            candidate = at_date(ordinal + offset, seconds_of_day)
+            if candidate > after:
+                return candidate
+    return None
+
+
+def at_date(date_ordinal, seconds_of_day):
+    # Local wall-clock time on a given date (proleptic Gregorian ordinal)
+    start, length = _local_day(date_ordinal)
+    if length == 86400:
+        return start + seconds_of_day
+    return (datetime.fromordinal(date_ordinal) + timedelta(seconds=seconds_of_day)).timestamp()
+
+
+def once_at(timestamp):
+    # next_run_fn for a one-shot job: fires at 'timestamp' and never again
+    return lambda after: timestamp if timestamp > after else None
+
+
+class Job:
+    __slots__ = ("job_id", "next_run_fn", "func", "tag", "batch", "next_run")
+
+    def __init__(self, job_id, next_run_fn, func, tag, batch=None):
+        self.job_id = job_id
+        self.next_run_fn = next_run_fn
+        self.func = func
+        self.tag = tag
+        self.batch = batch
+        self.next_run = None
+
+    def __repr__(self):
+        if self.next_run is None:
+            return f"Job({self.tag}, next run: never)"
+        next_str = datetime.fromtimestamp(self.next_run).strftime("%Y-%m-%d %H:%M:%S")
+        return f"Job({self.tag}, next run: {next_str})"
+
+
+class DeadlineScheduler:
+    # Keeps every job in a heap ordered by its next fire time and sleeps
+    # exactly until the earliest one is due. Adding or removing jobs wakes
+    # the sleeping thread so it can pick up the new earliest deadline.
+    # max_sleep bounds a single wait so wall-clock jumps (NTP, DST, suspend)
+    # are noticed without polling. If on_lead is set it is called once per
+    # deadline, lead_time seconds before it fires, e.g. to warm up connections.
+    # Jobs added with a 'batch' payload that come due in the same tick (or
+    # within batch_window seconds of each other) are handed to on_batch
+    # together as [(deadline, payload), ...] instead of running one by one.
+    # on_wake, if set, is called (with the lock held) whenever the sleeper is
+    # woken, for loops that wait on something other than wait().
+
+    def __init__(self, clock=time.time, max_sleep=60.0, log=None):
+        self.clock = clock
+        self.max_sleep = max_sleep
+        self.log = log
+        self._jobs = {}
+        self._heap = []
+        self._calls = []
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._woken = False
+        self._running = False
+        self.lead_time = 0.0
+        self.on_lead = None
+        self._lead_done = None
+        self.batch_window = 0.0
+        self.on_batch = None
+        self.firing = None # deadline of the job running right now, for instrumentation
+        self.next_deadline = None # earliest deadline as of the last wait; read without the lock
+        self.on_wake = None
+
+    # --- Job management ---
+
+    def add_job(self, next_run_fn, func, tag="", batch=None):
+        with self._cond:
+            job = Job(next(self._ids), next_run_fn, func, tag, batch)
+            job.next_run = next_run_fn(self.clock())
+            self._jobs[job.job_id] = job
+            if job.next_run is not None:
+                heapq.heappush(self._heap, (job.next_run, job.job_id))
+            self._notify()
+            return job.job_id
+
+    def remove_job(self, job_id):
+        # Heap entries of removed jobs are discarded lazily
+        with self._cond:
+            if self._jobs.pop(job_id, None) is not None:
+                self._notify()
+                return True
+            return False
+
+    def clear(self):
+        with self._cond:
+            self._jobs.clear()
+            self._heap = []
+            self._notify()
+
+    def get_jobs(self):
+        with self._cond:
+            return sorted(self._jobs.values(), key=lambda j: (j.next_run is None, j.next_run or 0))
+
+    def job_count(self):
+        return len(self._jobs)
+
+    def next_run(self):
+        with self._cond:
+            entry = self._peek()
+            return entry[0] if entry else None
+
+    def _peek(self):
+        # Drop stale heap entries (removed or rescheduled jobs); caller holds the lock
+        while self._heap:
+            ts, job_id = self._heap[0]
+            job = self._jobs.get(job_id)
+            if job is not None and job.next_run == ts:
+                return self._heap[0]
+            heapq.heappop(self._heap)
+        return None
+
+    # --- Execution ---
+
+    def call_soon(self, func):
+        # Runs func on the scheduler thread before any further jobs
+        with self._cond:
+            self._calls.append(func)
+            self._notify()
+
+    def run_pending(self):
+        with self._cond:
+            calls, self._calls = self._calls, []
+        for func in calls:
+            try:
+                func()
+            except Exception as e:
+                if self.log:
+                    self.log(f"Scheduled call raised: {e}")
+
+        now = self.clock()
+        due = []
+        with self._cond:
+            while True:
+                entry = self._peek()
+                if entry is None or entry[0] > now:
+                    break
+                heapq.heappop(self._heap)
+                due.append(self._jobs[entry[1]])
+            batched = self._take_batch(due, now)
+
+        if batched:
+            self._run_batch(batched, now)
+        for job in due:
+            self._run_job(job, now)
+
+        self._run_lead_hook()
+        return len(due) + len(batched)
+
+    def _take_batch(self, due, now):
+        # Moves batchable jobs out of 'due' and pulls in batchable jobs due
+        # within batch_window; caller holds the lock
+        if not self.on_batch:
+            return []
+        batched = [job for job in due if job.batch is not None]
+        if not batched:
+            return []
+        if self.batch_window > 0:
+            deferred = []
+            while True:
+                entry = self._peek()
+                if entry is None or entry[0] > now + self.batch_window:
+                    break
+                heapq.heappop(self._heap)
+                job = self._jobs[entry[1]]
+                if job.batch is not None:
+                    batched.append(job)
+                else:
+                    deferred.append(entry)
+            for entry in deferred:
+                heapq.heappush(self._heap, entry)
+        if len(batched) < 2:
+            return []
+        due[:] = [job for job in due if job.batch is None]
+        batched.sort(key=lambda j: (j.next_run, j.job_id))
+        return batched
+
+    def _run_batch(self, jobs, now):
+        fired = [(job, job.next_run) for job in jobs]
+        try:
+            self.on_batch([(job.next_run, job.batch) for job in jobs])
+        except Exception as e:
+            if self.log:
+                self.log(f"Batch of {len(jobs)} jobs raised: {e}")
+        with self._cond:
+            for job, fired_at in fired:
+                self._reschedule(job, fired_at, None, now)
+
+    def _run_lead_hook(self):
+        if not self.on_lead or self.lead_time <= 0:
+            return
+        with self._cond:
+            entry = self._peek()
+            if entry is None or entry[0] == self._lead_done or entry[0] - self.lead_time > self.clock():
+                return
+            self._lead_done = deadline = entry[0]
+        try:
+            self.on_lead(deadline)
+        except Exception as e:
+            if self.log:
+                self.log(f"Lead hook raised: {e}")
+
+    def _run_job(self, job, now):
+        fired_at = job.next_run
+        self.firing = fired_at
+        try:
+            result = job.func()
+        except Exception as e:
+            result = None
+            if self.log:
+                self.log(f"Job {job.tag} raised: {e}")
+        finally:
+            self.firing = None
+
+        with self._cond:
+            self._reschedule(job, fired_at, result, now)
+
+    def _reschedule(self, job, fired_at, result, now):
+        # Caller holds the lock
+        if self._jobs.get(job.job_id) is not job or job.next_run != fired_at:
+            return  # Removed or replaced while running
+        if result is CancelJob or isinstance(result, CancelJob):
+            del self._jobs[job.job_id]
+            return
+        # Skip occurrences missed while the process was suspended
+        job.next_run = job.next_run_fn(max(fired_at, now))
+        if job.next_run is None:
+            del self._jobs[job.job_id]
+        else:
+            heapq.heappush(self._heap, (job.next_run, job.job_id))
+
+    def next_delay(self):
+        # Seconds until the next deadline or lead hook, capped at max_sleep
+        with self._cond:
+            delay = self.max_sleep
+            entry = self._peek()
+            self.next_deadline = entry[0] if entry else None
+            if entry is not None:
+                delay = min(delay, entry[0] - self.clock())
+                if self.on_lead and self.lead_time > 0 and entry[0] != self._lead_done:
+                    delay = min(delay, entry[0] - self.lead_time - self.clock())
+            return max(0.0, delay)
+
+    def wait(self, timeout=None):
+        # Sleep until the earliest deadline, a wake() call, or timeout
+        with self._cond:
+            delay = self.next_delay()
+            if timeout is not None:
+                delay = min(delay, timeout)
+            if delay > 0 and not self._woken and not self._calls:
+                self._cond.wait(delay)
+            self._woken = False
+
+    def wake(self):
+        with self._cond:
+            self._notify()
+
+    def _notify(self):
+        self._woken = True
+        self._cond.notify_all()
+        if self.on_wake:
+            self.on_wake()
+
+    def run_forever(self):
+        self._running = True
+        while self._running:
+            self.run_pending()
+            if self._running:
+                self.wait()
+
+    def stop(self):
+        self._running = False
+        self.wake()
@@ -0,0 +1,145 @@
+import http.server
+import threading
+
+from obs_log import dropped_records
+from obs_metrics import BUCKET_BOUNDS
+
+# Prometheus text exposition of scheduler and connection stats, served on a
+# local HTTP port from its own thread. A scrape only reads counters and
+# copies histograms under the metrics lock; it never takes the scheduler
+# lock, so it cannot hold up a fire.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Exported histogram bounds: every 4th internal bucket (about x2.4 apart)
+EXPORT_BOUNDS = BUCKET_BOUNDS[::4]
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Writer:
+    def __init__(self):
+        self.lines = []
+        self._declared = set()
+
+    def declare(self, name, kind, help_text):
+        if name not in self._declared:
+            self._declared.add(name)
+            self.lines.append(f"# HELP {name} {help_text}")
+            self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name, value, labels=None):
+        self.lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+    def histogram(self, name, histogram, labels):
+        cumulative = dict(histogram.cumulative())
+        for bound in EXPORT_BOUNDS:
+            self.sample(f"{name}_bucket", cumulative[bound], dict(labels, le=_number(bound)))
+        self.sample(f"{name}_bucket", histogram.count, dict(labels, le="+Inf"))
+        self.sample(f"{name}_sum", histogram.sum, labels)
+        self.sample(f"{name}_count", histogram.count, labels)
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+
+def render(core):
+    out = _Writer()
+    scheduler = core.scheduler
+
+    out.declare("obs_scheduler_jobs", "gauge", "Scheduled jobs.")
+    out.sample("obs_scheduler_jobs", scheduler.job_count())
+    next_deadline = scheduler.next_deadline
+    if next_deadline is not None:
+        out.declare("obs_scheduler_next_fire_timestamp_seconds", "gauge", "Epoch time of the next scheduled fire.")
+        out.sample("obs_scheduler_next_fire_timestamp_seconds", next_deadline)
+
+    metrics = core.metrics
+    for (kind, key, stage), histogram in sorted(metrics.histograms().items()):
+        name = "obs_scheduler_fire_seconds" if kind == "action" else "obs_scheduler_host_fire_seconds"
+        out.declare(name, "histogram", f"Fire latency by {kind} and stage (lag, reconnect, ack, total).")
+        out.histogram(name, histogram, {kind: key, "stage": stage})
+
+    out.declare("obs_scheduler_actions_total", "counter", "Executed actions by result.")
+    for (action, result), n in sorted(metrics.result_counts().items()):
+        out.sample("obs_scheduler_actions_total", n, {"action": action, "result": result})
+    out.declare("obs_scheduler_fire_lag_slo_violations_total", "counter", "Fires later than fire_lag_slo_ms.")
+    out.sample("obs_scheduler_fire_lag_slo_violations_total", metrics.slo_violations)
+
+    reloads = metrics.reload_histogram()
+    out.declare("obs_scheduler_config_reload_seconds", "histogram", "Config reload and schedule reconcile duration.")
+    out.histogram("obs_scheduler_config_reload_seconds", reloads, {})
+
+    connections = sorted(core.connections.items())
+    out.declare("obs_scheduler_connected", "gauge", "1 if the endpoint's OBS connection is up.")
+    for name, conn in connections:
+        out.sample("obs_scheduler_connected", 1 if conn.is_connected else 0, {"endpoint": name})
+    out.declare("obs_scheduler_reconnect_attempts_total", "counter", "Failed connection attempts per endpoint.")
+    for name, conn in connections:
+        out.sample("obs_scheduler_reconnect_attempts_total", conn.reconnect_attempts, {"endpoint": name})
+
+    out.declare("obs_scheduler_log_records_dropped_total", "counter", "Log records dropped because the log writer fell behind.")
+    out.sample("obs_scheduler_log_records_dropped_total", dropped_records())
+    return out.text()
+
+
+class MetricsServer:
+    # GET /metrics on host:port; runs until stop()
+
+    def __init__(self, core, host="127.0.0.1", port=9464, log=None):
+        self.core = core
+        self.log = log
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                try:
+                    body = render(server.core).encode()
+                except Exception as e:
+                    if server.log:
+                        server.log(f"Metrics snapshot failed: {e}")
+                    self.send_error(500)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass # Scrapes would flood the scheduler log
+
+        self.httpd = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.address = self.httpd.server_address[:2]
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+        if self.log:
+            self.log(f"Serving metrics on http://{self.address[0]}:{self.address[1]}/metrics")
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
@@ -0,0 +1,264 @@
+import json
+import re
+import tempfile
+
+from obs_core import ACTION_REQUESTS, compile_task
+
+# Streaming preset import. Preset files are read incrementally, so a library
+# of hundreds of megabytes never has to fit in memory:
+#   JSON        {"preset name": [task, ...], ...}
+#   JSON Lines  one preset per line, {"name": "...", "tasks": [...]} or
+#               {"preset name": [task, ...]}
+# Every task is checked the way the scheduler compiles it (time, action, type,
+# days, date). Presets with a bad task are skipped and reported; the rest are
+# parked in a PresetSpool (a temp file) and then applied by the preset store
+# with a single atomic write, so the store is only locked for that write.
+#
+#     report = ImportReport()
+#     with PresetSpool() as spool:
+#         for name, tasks in report.accept(read_presets(path)):
+#             spool.add(name, tasks)
+#         store.import_spool(spool)
+#     print(report.message())
+
+CHUNK = 1 << 16
+MAX_ERRORS = 100 # reported individually; the rest are only counted
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+NEWLINE = "\n"
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class ImportFormatError(ValueError):
+    # The file cannot be read as presets at all; nothing is imported
+    pass
+
+
+class _JSONReader:
+    # Text buffer over a file that is refilled on demand, for decoding one
+    # JSON value at a time
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.line = 1 # line number of buf[0]
+        self.eof = False
+
+    def _fill(self, size=CHUNK):
+        # Drops the consumed text and appends up to 'size' characters
+        if self.eof:
+            return False
+        chunk = self.f.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.line += self.buf.count(NEWLINE, 0, self.pos)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def where(self, pos=None):
+        pos = self.pos if pos is None else pos
+        return f"line {self.line + self.buf.count(NEWLINE, 0, pos)}"
+
+    def peek(self):
+        # Next non-whitespace character, or "" at the end of the file
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            found = repr(char) if char else "end of file"
+            raise ImportFormatError(f"Expected {' or '.join(repr(c) for c in chars)} at {self.where()}, found {found}.")
+        self.pos += 1
+        return char
+
+    def value(self):
+        # Decodes the value at the current position, reading more while it is
+        # cut off by the end of the buffer. Reads grow geometrically, so a
+        # large value is re-scanned only a few times.
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                truncated = e.pos >= len(self.buf) - 6 or e.msg.startswith("Unterminated string")
+                if truncated and self._fill(max(CHUNK, len(self.buf) - self.pos)):
+                    continue
+                raise ImportFormatError(f"Invalid JSON at {self.where(e.pos)}: {e.msg}.") from None
+            # A number may continue past the buffer
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json(f):
+    # {"name": [tasks], ...} -> (where, name, tasks) one preset at a time
+    reader = _JSONReader(f)
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+    else:
+        while True:
+            reader.peek() # the name's own line, not the one the comma is on
+            where = reader.where()
+            name = reader.value()
+            if not isinstance(name, str):
+                raise ImportFormatError(f"Expected a preset name at {where}.")
+            reader.expect(":")
+            yield where, name, reader.value()
+            if reader.expect(",}") == "}":
+                break
+    if reader.peek():
+        raise ImportFormatError(f"Unexpected data after the presets at {reader.where()}.")
+
+
+def iter_jsonl(f):
+    # One preset per line -> (where, name, tasks); a line that is not a preset
+    # is yielded with name None and the problem as 'tasks'
+    for number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        where = f"line {number}"
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield where, None, f"invalid JSON ({e.msg})"
+            continue
+        if not isinstance(record, dict):
+            yield where, None, "expected an object"
+        elif set(record) == {"name", "tasks"} and isinstance(record["name"], str):
+            yield where, record["name"], record["tasks"]
+        else:
+            for name, tasks in record.items():
+                yield where, name, tasks
+
+
+def read_presets(path, fmt=None):
+    # fmt: "json" or "jsonl"; by default chosen by the file extension
+    if fmt is None:
+        fmt = "jsonl" if path.lower().endswith(JSONL_SUFFIXES) else "json"
+    with open(path, "r", encoding="utf-8") as f:
+        yield from iter_jsonl(f) if fmt == "jsonl" else iter_json(f)
+
+
+def task_error(task):
+    # -> None if the scheduler accepts the task, else what is wrong with it
+    if not isinstance(task, dict):
+        return "not an object"
+    for key in ("time", "action", "type", "date"):
+        if key in task and not isinstance(task[key], str):
+            return f"'{key}' must be a string"
+    if "days" in task and not isinstance(task["days"], list):
+        return "'days' must be a list"
+    try:
+        compiled = compile_task(task)
+    except (ValueError, TypeError) as e:
+        # strptime's message describes the format, not the date
+        return f"invalid date '{task.get('date')}'" if str(e).startswith("time data") else str(e)
+    if compiled is None:
+        return "missing date" if task.get("time") and task.get("action") else "missing time or action"
+    if task["action"] not in ACTION_REQUESTS:
+        return f"unknown action '{task['action']}'"
+    if compiled.unknown_days:
+        return f"unknown day(s) {', '.join(map(str, compiled.unknown_days))}"
+    if compiled.kind == "weekly" and not compiled.weekdays:
+        return "no days selected"
+    return None
+
+
+def preset_errors(tasks):
+    # -> list of problems with a preset's task list (empty when valid)
+    if not isinstance(tasks, list):
+        return ["expected a list of tasks"]
+    errors = []
+    for index, task in enumerate(tasks, 1):
+        error = task_error(task)
+        if error:
+            errors.append(f"task {index}: {error}")
+    return errors
+
+
+class ImportReport:
+
+    def __init__(self):
+        self.imported = 0
+        self.skipped = 0
+        self.errors = [] # first MAX_ERRORS "where 'name': problem" lines
+        self.error_count = 0
+
+    def accept(self, entries):
+        # Passes the valid (name, tasks) of (where, name, tasks) entries on
+        for where, name, tasks in entries:
+            problems = [tasks] if name is None else preset_errors(tasks)
+            if problems:
+                self.skipped += 1
+                label = where if name is None else f"{where} '{name}'".lstrip()
+                for problem in problems:
+                    self.error_count += 1
+                    if len(self.errors) < MAX_ERRORS:
+                        self.errors.append(f"{label}: {problem}")
+                continue
+            self.imported += 1
+            yield name, tasks
+
+    def message(self):
+        text = f"Successfully imported {self.imported} presets."
+        if self.skipped:
+            text += f" Skipped {self.skipped} invalid preset(s)."
+        return text
+
+    def details(self, limit=20):
+        # Error lines for a dialog
+        lines = self.errors[:limit]
+        if self.error_count > len(lines):
+            lines.append(f"... and {self.error_count - len(lines)} more")
+        return "\n".join(lines)
+
+
+class PresetSpool:
+    # Validated presets in a temp file, in the order a dict update would leave
+    # them: a name seen again keeps its first place and takes the later tasks
+
+    def __init__(self, directory=None):
+        self.file = tempfile.TemporaryFile(dir=directory)
+        self._spans = {} # name -> (offset, length) of its compact JSON
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __len__(self):
+        return len(self._spans)
+
+    def __contains__(self, name):
+        return name in self._spans
+
+    def close(self):
+        self.file.close()
+
+    def add(self, name, tasks):
+        data = json.dumps(tasks).encode()
+        self.file.seek(0, 2)
+        self._spans[name] = (self.file.tell(), len(data))
+        self.file.write(data)
+
+    def names(self):
+        return list(self._spans)
+
+    def raw(self, name):
+        # The preset's tasks as compact JSON text
+        offset, length = self._spans[name]
+        self.file.seek(offset)
+        return self.file.read(length).decode()
@@ -0,0 +1,112 @@
+import collections
+import logging
+import queue
+import sys
+import threading
+
+# Asynchronous logging. setup_logging() puts a QueueHandler on the root
+# logger, so logging.info() on the fire path only enqueues the record; a
+# background QueueListener formats it and writes the console and the
+# rotating log file. The queue is bounded: when the writer cannot keep up,
+# records are dropped (and counted) instead of blocking the caller.
+
+FILE_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+_listener = None
+
+
+class DroppingQueueHandler(logging.Handler):
+    # Like logging.handlers.QueueHandler, but never blocks and never raises
+    # when the queue is full
+
+    def __init__(self, log_queue):
+        super().__init__()
+        self.queue = log_queue
+        self.dropped = 0
+
+    def emit(self, record):
+        # Render message and traceback now (args may change later); the
+        # listener's handlers add timestamps and write it out
+        try:
+            record.msg = self.format(record)
+            record.args = None
+            record.exc_info = None
+            record.exc_text = None
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+
+def setup_logging(log_file="obs_scheduler.log", max_bytes=5 * 1024 * 1024, backup_count=5,
+                  when=None, console=True, queue_size=10000):
+    # Rotates by size (max_bytes), or by time when 'when' is given
+    # (e.g. "midnight", see TimedRotatingFileHandler). Called by the entry
+    # points rather than at import time; calling it again is a no-op.
+    global _listener
+    if _listener is not None:
+        return _listener
+    import atexit
+    import logging.handlers
+
+    if when:
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            log_file, when=when, backupCount=backup_count, encoding="utf-8")
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter("%(message)s"))
+        handlers.append(console_handler)
+
+    log_queue = queue.Queue(queue_size)
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(DroppingQueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    # Writes out everything still queued
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def dropped_records():
+    # Records lost to a full queue since setup_logging(); exported as a metric
+    return sum(getattr(h, "dropped", 0) for h in logging.getLogger().handlers)
+
+
+class LogRing:
+    # Bounded buffer between any thread and the GUI log pane. append() is
+    # cheap and thread-safe; the GUI drains new lines in one batch on a timer.
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._pending = collections.deque(maxlen=capacity)
+        self.dropped = 0
+
+    def append(self, line):
+        with self._lock:
+            if len(self._pending) == self.capacity:
+                self.dropped += 1
+            self._pending.append(line)
+
+    def drain(self):
+        with self._lock:
+            lines = list(self._pending)
+            self._pending.clear()
+        return lines
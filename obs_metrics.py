@@ -0,0 +1,189 @@
+import bisect
+import collections
+import threading
+
+# Fire-latency instrumentation. Every executed action produces a FireRecord
+# with its timestamps; FireMetrics folds them into fixed-size log-scale
+# histograms per action and per host, so memory stays constant however long
+# the scheduler runs.
+
+# Stages measured for every fire (seconds)
+STAGES = (
+    "lag",       # dispatched - scheduled: how late the scheduler fired
+    "reconnect", # waited for a connection before the request could be sent
+    "ack",       # acked - sent: OBS round trip
+    "total",     # acked - scheduled: scheduled time to OBS confirmation
+)
+
+# Bucket upper bounds: 0.5 ms growing by 25% per bucket up to ~10 min
+BUCKET_BOUNDS = tuple(0.0005 * 1.25 ** i for i in range(64))
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "sum", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1) # last bucket: +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def percentile(self, p):
+        # Upper bound of the bucket holding the p-th percentile (0 < p <= 100),
+        # clamped to the observed range
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                bound = BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.max
+                return max(self.min, min(bound, self.max))
+        return self.max
+
+    def cumulative(self):
+        # [(upper bound, count <= bound), ...] ending with +Inf
+        total = 0
+        result = []
+        for bound, n in zip(BUCKET_BOUNDS + (float("inf"),), self.counts):
+            total += n
+            result.append((bound, total))
+        return result
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class FireRecord:
+    __slots__ = ("action", "endpoint", "host", "scheduled", "dispatched", "sent", "acked", "reconnect", "result")
+
+    def __init__(self, action, endpoint, host, scheduled, dispatched, sent, acked, reconnect, result):
+        self.action = action
+        self.endpoint = endpoint
+        self.host = host
+        self.scheduled = scheduled
+        self.dispatched = dispatched
+        self.sent = sent
+        self.acked = acked
+        self.reconnect = reconnect
+        self.result = result
+
+    def stages(self):
+        return {
+            "lag": max(0.0, self.dispatched - self.scheduled),
+            "reconnect": self.reconnect,
+            "ack": self.acked - self.sent,
+            "total": self.acked - self.scheduled,
+        }
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class FireMetrics:
+    # Thread-safe; record() is called from whichever thread ran the request
+
+    def __init__(self, recent=500, log=None):
+        self.log = log
+        self.lag_slo = None # seconds; fires later than this are logged and counted
+        self._lock = threading.Lock()
+        self._by_action = {}
+        self._by_host = {}
+        self._results = collections.Counter() # (action, result) -> n
+        self._recent = collections.deque(maxlen=recent)
+        self._reloads = LatencyHistogram() # config reload + reconcile durations
+        self.slo_violations = 0
+
+    def _histograms(self, table, key):
+        stages = table.get(key)
+        if stages is None:
+            stages = table[key] = {stage: LatencyHistogram() for stage in STAGES}
+        return stages
+
+    def record(self, record):
+        stages = record.stages()
+        with self._lock:
+            for table, key in ((self._by_action, record.action), (self._by_host, record.host)):
+                histograms = self._histograms(table, key)
+                for stage, seconds in stages.items():
+                    histograms[stage].record(seconds)
+            self._results[(record.action, record.result)] += 1
+            self._recent.append(record)
+            late = self.lag_slo is not None and stages["lag"] > self.lag_slo
+            if late:
+                self.slo_violations += 1
+        if late and self.log:
+            self.log(f"SLO: {record.action} on {record.endpoint} fired {stages['lag'] * 1000:.0f} ms late "
+                     f"(limit {self.lag_slo * 1000:.0f} ms).")
+
+    def record_failure(self, action, endpoint, scheduled, dispatched, result):
+        # A fire without an answer from OBS: 'dropped' (never sent) or 'lost'
+        # (sent, then the link failed). Counted by result; there are no
+        # latencies to record. A dropped fire always misses the lag SLO.
+        lag = max(0.0, dispatched - scheduled)
+        with self._lock:
+            self._results[(action, result)] += 1
+            late = self.lag_slo is not None and (result == "dropped" or lag > self.lag_slo)
+            if late:
+                self.slo_violations += 1
+        if late and self.log:
+            self.log(f"SLO: {action} on {endpoint} {result} ({lag * 1000:.0f} ms after its scheduled time).")
+
+    def record_reload(self, seconds):
+        with self._lock:
+            self._reloads.record(seconds)
+
+    def reload_histogram(self):
+        with self._lock:
+            return self._copy(self._reloads)
+
+    @staticmethod
+    def _copy(histogram):
+        copy = LatencyHistogram()
+        copy.counts = list(histogram.counts)
+        copy.count, copy.sum, copy.min, copy.max = histogram.count, histogram.sum, histogram.min, histogram.max
+        return copy
+
+    def stats(self):
+        # {"by_action": {action: {stage: {count, p50, p95, p99, max}}}, "by_host": {...}, ...}
+        with self._lock:
+            return {
+                "by_action": {k: {s: h.summary() for s, h in v.items()} for k, v in self._by_action.items()},
+                "by_host": {k: {s: h.summary() for s, h in v.items()} for k, v in self._by_host.items()},
+                "results": {f"{action}/{result}": n for (action, result), n in self._results.items()},
+                "slo_violations": self.slo_violations,
+                "reloads": self._reloads.summary(),
+            }
+
+    def histograms(self):
+        # Copies for exporters: {("action"|"host", key, stage): LatencyHistogram}
+        with self._lock:
+            result = {}
+            for kind, table in (("action", self._by_action), ("host", self._by_host)):
+                for key, stages in table.items():
+                    for stage, histogram in stages.items():
+                        result[(kind, key, stage)] = self._copy(histogram)
+            return result
+
+    def result_counts(self):
+        with self._lock:
+            return dict(self._results)
+
+    def recent(self, n=50):
+        with self._lock:
+            return [record.as_dict() for record in list(self._recent)[-n:]]
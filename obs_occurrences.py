@@ -0,0 +1,142 @@
+import bisect
+import threading
+import time
+from datetime import datetime
+
+from obs_engine import at_date
+
+DAY = 86400
+
+
+class OccurrenceIndex:
+    # Sorted list of upcoming fire times, (time, key), for every enabled task
+    # over a rolling horizon. Adding or removing a task touches only that
+    # task's entries; queries bisect into the list. The horizon grows on
+    # demand when a query reaches past it, and passed entries are dropped.
+
+    def __init__(self, horizon=7 * DAY, clock=time.time):
+        self.horizon = horizon
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._entries = [] # sorted (time, key)
+        self._tasks = {} # key -> CompiledTask
+        self._start = clock()
+        self._end = self._start + horizon
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _days(start, end):
+        # [(date ordinal, weekday bit), ...] for the local days overlapping
+        # [start, end); computed once per bulk operation
+        first = datetime.fromtimestamp(start).date()
+        last = datetime.fromtimestamp(end).date().toordinal()
+        weekday, ordinal = first.weekday(), first.toordinal()
+        return [(day, 1 << ((weekday + day - ordinal) % 7)) for day in range(ordinal, last + 1)]
+
+    def _occurrences(self, compiled, start, end, days=None):
+        # Fire times of one task in [start, end)
+        if compiled.kind == "onetime":
+            fire_time = compiled.fire_time()
+            return [fire_time] if start <= fire_time < end else []
+        times = []
+        for ordinal, bit in self._days(start, end) if days is None else days:
+            if compiled.weekdays & bit:
+                fire_time = at_date(ordinal, compiled.seconds)
+                if start <= fire_time < end:
+                    times.append(fire_time)
+        return times
+
+    # --- Maintenance ---
+
+    def add(self, key, compiled):
+        self.add_many([(key, compiled)])
+
+    def add_many(self, items):
+        # [(key, CompiledTask), ...]; a bulk add is one merge, not an insort
+        # per entry, so building the index stays O(n log n)
+        with self._lock:
+            added = []
+            days = self._days(self._start, self._end)
+            for key, compiled in items:
+                self._tasks[key] = compiled
+                added += [(fire_time, key) for fire_time in self._occurrences(compiled, self._start, self._end, days)]
+            if len(added) == 1:
+                bisect.insort(self._entries, added[0])
+            elif added:
+                self._entries += added
+                self._entries.sort()
+
+    def remove(self, key):
+        self.remove_many([key])
+
+    def remove_many(self, keys):
+        with self._lock:
+            removed = {key: self._tasks.pop(key) for key in keys if key in self._tasks}
+            if len(removed) > 1:
+                self._entries = [entry for entry in self._entries if entry[1] not in removed]
+                return
+            for key, compiled in removed.items():
+                for fire_time in self._occurrences(compiled, self._start, self._end):
+                    i = bisect.bisect_left(self._entries, (fire_time, key))
+                    if i < len(self._entries) and self._entries[i] == (fire_time, key):
+                        del self._entries[i]
+
+    def clear(self):
+        with self._lock:
+            self._entries = []
+            self._tasks = {}
+
+    def _advance(self, until):
+        # Drops passed entries and makes sure the index covers [now, until)
+        now = self.clock()
+        if now > self._start:
+            del self._entries[:bisect.bisect_left(self._entries, (now,))]
+            self._start = now
+        until = max(until, now + self.horizon)
+        if until <= self._end:
+            return
+        # Extend in whole days so small look-aheads do not rescan every task
+        until = self._end + max(DAY, until - self._end)
+        added = []
+        days = self._days(self._end, until)
+        for key, compiled in self._tasks.items():
+            added += [(fire_time, key) for fire_time in self._occurrences(compiled, self._end, until, days)]
+        self._end = until
+        if added:
+            self._entries += added
+            self._entries.sort()
+
+    # --- Queries: [(time, CompiledTask), ...] in fire order ---
+
+    def next(self, n=10, after=None):
+        # The first n fires at or after 'after' (default: now) within the horizon
+        with self._lock:
+            after = self.clock() if after is None else after
+            self._advance(after)
+            i = bisect.bisect_left(self._entries, (after,))
+            return [(t, self._tasks[key]) for t, key in self._entries[i:i + n]]
+
+    def between(self, start, end):
+        with self._lock:
+            self._advance(end)
+            lo = bisect.bisect_left(self._entries, (start,))
+            hi = bisect.bisect_left(self._entries, (end,))
+            return [(t, self._tasks[key]) for t, key in self._entries[lo:hi]]
+
+    def conflicts(self, window, start=None, end=None):
+        # Runs of fires on the same endpoint less than 'window' seconds apart
+        # -> [(endpoint, [(time, CompiledTask), ...]), ...] by first fire time
+        start = self.clock() if start is None else start
+        end = start + self.horizon if end is None else end
+        runs = []
+        current = {} # endpoint -> run being extended
+        for fire_time, compiled in self.between(start, end):
+            for name in compiled.targets:
+                run = current.get(name)
+                if run is None or fire_time - run[-1][0] >= window:
+                    run = current[name] = []
+                    runs.append((name, run))
+                run.append((fire_time, compiled))
+        return [(name, run) for name, run in runs if len(run) > 1]
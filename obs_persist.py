@@ -0,0 +1,158 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+# Crash-safe file persistence. A write goes to a temp file in the same
+# directory, is fsynced and then renamed over the target, so readers (and a
+# restart after power loss) see either the old or the new content, never a
+# truncated file. The previous content is kept as "<path>.bak" as long as it
+# was valid JSON, and loads fall back to it when the main file is damaged.
+
+
+def backup_path(path):
+    return path + ".bak"
+
+
+def file_identity(path):
+    # (mtime, size, inode), or None if the file does not exist
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    except OSError:
+        return None
+
+
+def _is_valid_json(path):
+    try:
+        with open(path, "rb") as f:
+            json.loads(f.read())
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def _fsync_dir(directory):
+    # Makes the rename itself durable; not possible (or needed) on Windows
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _keep_backup(path, directory, verified=False):
+    # Replaces <path>.bak with the current file if that is a good generation;
+    # verified=True skips re-parsing a file the caller already knows is valid
+    if not os.path.exists(path) or not (verified or _is_valid_json(path)):
+        return
+    tmp = os.path.join(directory, f".{os.path.basename(path)}.bak.{os.getpid()}.tmp")
+    try:
+        os.link(path, tmp)
+    except OSError:
+        # No hard links on this filesystem
+        shutil.copy2(path, tmp)
+    os.replace(tmp, backup_path(path))
+
+
+def atomic_write(path, data, backup=True, verified=False):
+    # Writes bytes to path via temp file + fsync + rename. Raises OSError.
+    # verified=True: the caller knows the current file is valid JSON.
+    atomic_write_with(path, lambda f: f.write(data), backup, verified)
+
+
+def atomic_write_with(path, write, backup=True, verified=False):
+    # Like atomic_write, but write(f) produces the content, so large files
+    # can be streamed. Nothing changes if write() raises.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp, os.stat(path).st_mode & 0o777)
+        except OSError:
+            os.chmod(tmp, 0o644)
+        if backup:
+            _keep_backup(path, directory, verified)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(directory)
+
+
+def load_json(path, default=None, log=None):
+    # Parses path, falling back to the backup generation when the file is
+    # missing its content or damaged. Returns 'default' if neither is usable.
+    for candidate in (path, backup_path(path)):
+        if not os.path.exists(candidate):
+            continue
+        try:
+            with open(candidate, "rb") as f:
+                data = json.loads(f.read())
+        except (OSError, ValueError) as e:
+            if log:
+                log(f"Error loading {candidate}: {e}")
+            continue
+        if candidate != path and log:
+            log(f"Recovered {path} from backup {candidate}.")
+        return data
+    return default
+
+
+class DebouncedWriter:
+    # Coalesces bursts of saves: submit() records the latest content and the
+    # write happens once, 'delay' seconds after the first submit of a burst.
+    # flush() writes any pending content immediately (e.g. on shutdown).
+
+    def __init__(self, write, delay=0.5, log=None):
+        self.write = write # callable(data)
+        self.delay = delay
+        self.log = log
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._pending = None
+        self._timer = None
+
+    def submit(self, data):
+        if self.delay <= 0:
+            with self._lock:
+                self._pending = data
+            self.flush()
+            return
+        with self._lock:
+            self._pending = data
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        # Writes in submission order; a write in progress finishes first
+        with self._write_lock:
+            with self._lock:
+                data, self._pending = self._pending, None
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if data is None:
+                return
+            try:
+                self.write(data)
+            except Exception as e:
+                if self.log:
+                    self.log(f"Error saving file: {e}")
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import threading
+
+from obs_persist import atomic_write, atomic_write_with, backup_path, file_identity, load_json
+
+
+class PresetStore:
+    # Keeps presets.json parsed in memory. The indented JSON text of each
+    # preset is cached after the first save, so later saves only re-encode
+    # the presets that changed and assemble the file from cached fragments.
+    # The cache is revalidated against the file's (mtime, size, inode) on
+    # every access and only re-parsed when identity and content hash changed.
+
+    def __init__(self, path, log=None):
+        self.path = path
+        self.log = log
+        self._lock = threading.RLock()
+        self._presets = {} # name -> task list (never handed out directly)
+        self._fragments = {} # name -> indented json text, filled on write
+        self._identity = None
+        self._hash = None
+        self._valid = False # the file on disk parsed as JSON
+
+    def _log(self, message):
+        if self.log:
+            self.log(message)
+
+    def _stat(self):
+        return file_identity(self.path)
+
+    def _refresh(self):
+        # Caller holds the lock
+        identity = self._stat()
+        if identity == self._identity:
+            return
+        self._identity = identity
+        if identity is None:
+            self._presets = {}
+            self._fragments = {}
+            self._hash = None
+            self._valid = False
+            return
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            self._log(f"Error loading presets: {e}")
+            return
+        digest = hashlib.sha256(data).hexdigest()
+        if digest == self._hash:
+            return # Touched but unchanged
+        try:
+            presets = json.loads(data)
+            self._valid = True
+        except ValueError as e:
+            self._log(f"Error loading presets: {e}")
+            self._valid = False
+            presets = load_json(backup_path(self.path), {}, log=self.log)
+            if presets:
+                self._log(f"Recovered {self.path} from backup {backup_path(self.path)}.")
+        if not isinstance(presets, dict):
+            presets = {}
+        self._presets = presets
+        self._fragments = {}
+        self._hash = digest
+
+    @staticmethod
+    def _encode(tasks):
+        # Indented the way json.dump(presets, f, indent=4) nests it
+        return json.dumps(tasks, indent=4).replace("\n", "\n    ")
+
+    @staticmethod
+    def _copy(tasks):
+        return json.loads(json.dumps(tasks))
+
+    def _write(self):
+        # Caller holds the lock
+        for name, tasks in self._presets.items():
+            if name not in self._fragments:
+                self._fragments[name] = self._encode(tasks)
+        if self._presets:
+            body = ",\n".join(f"    {json.dumps(name)}: {self._fragments[name]}" for name in self._presets)
+            text = "{\n" + body + "\n}"
+        else:
+            text = "{}"
+        data = text.encode()
+        try:
+            atomic_write(self.path, data, verified=self._valid)
+        except OSError as e:
+            self._log(f"Error saving presets: {e}")
+            self._identity = None # Re-read whatever is on disk next time
+            return False
+        self._hash = hashlib.sha256(data).hexdigest()
+        self._identity = self._stat()
+        self._valid = True
+        return True
+
+    # --- Public API ---
+
+    def names(self):
+        with self._lock:
+            self._refresh()
+            return list(self._presets)
+
+    def __contains__(self, name):
+        with self._lock:
+            self._refresh()
+            return name in self._presets
+
+    def get(self, name, default=None):
+        # Returns a fresh copy of the preset's task list
+        with self._lock:
+            self._refresh()
+            tasks = self._presets.get(name)
+            return default if tasks is None else self._copy(tasks)
+
+    def items(self):
+        with self._lock:
+            self._refresh()
+            return [(name, self._copy(tasks)) for name, tasks in self._presets.items()]
+
+    def set(self, name, tasks):
+        return self.update({name: tasks})
+
+    def update(self, presets):
+        # Adds or replaces several presets with a single write
+        with self._lock:
+            self._refresh()
+            for name, tasks in presets.items():
+                self._presets[name] = self._copy(tasks)
+                self._fragments.pop(name, None)
+            return self._write()
+
+    def import_spool(self, spool):
+        # Adds or replaces the presets of an obs_import.PresetSpool with a
+        # single write that streams the file instead of building it in memory.
+        # The cache is dropped afterwards and the file re-read when next used.
+        with self._lock:
+            self._refresh()
+
+            def fragments():
+                for name, tasks in self._presets.items():
+                    if name in spool:
+                        yield name, self._encode(json.loads(spool.raw(name)))
+                    else:
+                        yield name, self._fragments.get(name) or self._encode(tasks)
+                for name in spool.names():
+                    if name not in self._presets:
+                        yield name, self._encode(json.loads(spool.raw(name)))
+
+            def write(f):
+                separator = b"{\n"
+                for name, fragment in fragments():
+                    f.write(separator + f"    {json.dumps(name)}: {fragment}".encode())
+                    separator = b",\n"
+                f.write(b"\n}" if separator != b"{\n" else b"{}")
+
+            try:
+                atomic_write_with(self.path, write, verified=self._valid)
+            except OSError as e:
+                self._log(f"Error saving presets: {e}")
+                self._identity = None
+                return False
+            self._presets = {}
+            self._fragments = {}
+            self._identity = None
+            self._hash = None
+            return True
+
+    def delete(self, name):
+        with self._lock:
+            self._refresh()
+            if name not in self._presets:
+                return False
+            del self._presets[name]
+            self._fragments.pop(name, None)
+            return self._write()
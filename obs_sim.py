@@ -0,0 +1,143 @@
+import collections
+import time
+from datetime import datetime, timedelta
+
+from obs_core import OBSSchedulerCore, DEFAULT_ENDPOINT, SQLITE_SUFFIXES
+from obs_persist import load_json
+
+# Dry-run simulation of a whole schedule. The real scheduler (same job
+# construction, batching and rescheduling as the service) runs against a
+# virtual clock that jumps from one deadline to the next, and fired actions
+# go to a recording executor instead of OBS. Nothing connects to OBS and
+# nothing is written to disk.
+#
+#     result = simulate(config, days=7)
+#     for fire_time, action, targets in result.timeline: ...
+
+DAY = 86400
+
+
+class VirtualClock:
+
+    def __init__(self, start):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, to):
+        self.now = max(self.now, to)
+
+
+class Recorder:
+    # Collects fired actions. With keep_timeline=False only the per-day
+    # counts are kept, so very long runs use constant memory.
+
+    def __init__(self, keep_timeline=True):
+        self.timeline = [] if keep_timeline else None # [(time, action, targets), ...]
+        self.per_day = collections.OrderedDict() # "YYYY-MM-DD" -> Counter(action)
+        self.total = 0
+        self._day_start = self._day_end = None # local day of _day_key
+        self._day_key = None
+
+    def record(self, fire_time, action, targets):
+        if self.timeline is not None:
+            self.timeline.append((fire_time, action, tuple(targets)))
+        if self._day_start is None or not self._day_start <= fire_time < self._day_end:
+            day = datetime.fromtimestamp(fire_time).replace(hour=0, minute=0, second=0, microsecond=0)
+            self._day_start = day.timestamp()
+            self._day_end = (day + timedelta(days=1)).timestamp()
+            self._day_key = day.strftime("%Y-%m-%d")
+        counts = self.per_day.get(self._day_key)
+        if counts is None:
+            counts = self.per_day[self._day_key] = collections.Counter()
+        counts[action] += 1
+        self.total += 1
+
+
+class _DryRunEndpoint:
+    # Stands in for a ConnectionManager; never connects
+    is_connected = False
+    client = None
+    reconnect_attempts = 0
+
+    def __init__(self, name):
+        self.name = name
+
+    def stop(self):
+        pass
+
+
+class SimulatedCore(OBSSchedulerCore):
+    # OBSSchedulerCore over an in-memory config whose fired actions go to a
+    # Recorder. Compaction, saving, connections and pre-warming are disabled.
+
+    def __init__(self, config, clock, recorder, log_callback=None):
+        self._sim_config = dict(config)
+        self.recorder = recorder
+        super().__init__(config_file="<simulation>", log_callback=log_callback, clock=clock)
+        self.scheduler.on_lead = None
+
+    def load_config(self):
+        return dict(self._sim_config)
+
+    def add_endpoint(self, name):
+        conn = self.connections[name] = _DryRunEndpoint(name)
+        return conn
+
+    def save_config_file(self, flush=False, tasks_changed=True):
+        pass
+
+    def dispatch_action(self, action, targets=(DEFAULT_ENDPOINT,), scheduled=None):
+        self.recorder.record(self.scheduler.firing if scheduled is None else scheduled, action, targets)
+
+    def dispatch_batch(self, items):
+        for fire_time, (action, targets) in items:
+            self.recorder.record(fire_time, action, targets)
+
+    def run_onetime(self, action, targets=(DEFAULT_ENDPOINT,)):
+        self.dispatch_action(action, targets)
+
+
+def simulate(config, days=7, start=None, keep_timeline=True, log_callback=None):
+    # Replays 'days' days of config["tasks"] from 'start' (epoch seconds,
+    # default now) and returns the Recorder
+    start = time.time() if start is None else start
+    end = start + days * DAY
+    clock = VirtualClock(start)
+    recorder = Recorder(keep_timeline)
+    core = SimulatedCore(config, clock, recorder, log_callback)
+    core.schedule_jobs_from_config(reload=False)
+    scheduler = core.scheduler
+    while True:
+        deadline = scheduler.next_run()
+        if deadline is None or deadline >= end:
+            break
+        clock.advance(deadline)
+        scheduler.run_pending()
+    return recorder
+
+
+def load_simulation_config(config_file, presets_file=None, preset=None, log=None):
+    # Settings and tasks from a JSON or SQLite config; with 'preset' the tasks
+    # are replaced by that preset's
+    if config_file.lower().endswith(SQLITE_SUFFIXES):
+        from obs_sqlite import SQLiteStore
+        store = SQLiteStore(config_file, log=log)
+        try:
+            config = store.load_config()
+            tasks = store.presets.get(preset) if preset is not None else None
+        finally:
+            store.close()
+    else:
+        config = load_json(config_file, {}, log=log)
+        config = config if isinstance(config, dict) else {}
+        tasks = None
+        if preset is not None:
+            presets = load_json(presets_file, {}, log=log) if presets_file else {}
+            tasks = presets.get(preset) if isinstance(presets, dict) else None
+    if preset is not None:
+        if not isinstance(tasks, list):
+            raise KeyError(f"Preset '{preset}' not found.")
+        config["tasks"] = tasks
+    return config
@@ -0,0 +1,297 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from obs_core import compile_task
+from obs_engine import at_date
+from obs_persist import load_json
+
+# Optional SQLite storage for OBSSchedulerCore, selected by giving it a
+# config path ending in one of obs_core.SQLITE_SUFFIXES. Settings, tasks and
+# presets live in indexed tables, single tasks are updated row by row, and
+# the tasks table carries the compiled fields (seconds of day, weekday mask,
+# date ordinal) so time-window queries run in SQL.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    type TEXT,
+    action TEXT,
+    seconds INTEGER,
+    weekdays INTEGER,
+    date INTEGER,
+    enabled INTEGER NOT NULL DEFAULT 1,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_position ON tasks(position);
+CREATE INDEX IF NOT EXISTS tasks_due ON tasks(enabled, seconds);
+CREATE INDEX IF NOT EXISTS tasks_date ON tasks(date) WHERE date IS NOT NULL;
+CREATE TABLE IF NOT EXISTS task_targets (
+    endpoint TEXT NOT NULL,
+    task_id INTEGER NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    PRIMARY KEY (endpoint, task_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS task_targets_task ON task_targets(task_id);
+CREATE TABLE IF NOT EXISTS presets (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    tasks TEXT NOT NULL
+);
+"""
+
+
+def task_row(task):
+    # Columns derived from a task dict; tasks that do not compile keep NULLs
+    try:
+        compiled = compile_task(task)
+    except Exception:
+        compiled = None
+    enabled = 1 if task.get("enabled", True) else 0
+    data = json.dumps(task)
+    if compiled is None:
+        return (task.get("type", "daily"), task.get("action"), None, None, None, enabled, data), ()
+    return (
+        (compiled.kind, compiled.action, compiled.seconds, compiled.weekdays, compiled.date, enabled, data),
+        compiled.targets
+    )
+
+
+class SQLiteStore:
+    # One connection shared by the GUI and scheduler threads, serialized by a
+    # lock. _row_ids mirrors the order of the task list handed out by
+    # load_config(), so callers address tasks by list index.
+
+    def __init__(self, path, log=None):
+        self.path = path
+        self.log = log
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(SCHEMA)
+        self._row_ids = []
+        self.presets = SQLitePresets(self)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _transaction(self):
+        return _Transaction(self)
+
+    # --- Config ---
+
+    def is_empty(self):
+        with self._lock:
+            return not any(
+                self._db.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone()
+                for table in ("settings", "tasks", "presets")
+            )
+
+    def load_config(self):
+        with self._lock:
+            config = {key: json.loads(value) for key, value in self._db.execute("SELECT key, value FROM settings")}
+            rows = self._db.execute("SELECT id, data FROM tasks ORDER BY position, id").fetchall()
+        self._row_ids = [row_id for row_id, _ in rows]
+        config["tasks"] = [json.loads(data) for _, data in rows]
+        return config
+
+    def save_config(self, config):
+        # Replaces settings and the whole task list
+        with self._transaction() as db:
+            self._write_settings(db, config)
+            db.execute("DELETE FROM tasks")
+            self._row_ids = []
+            for position, task in enumerate(config.get("tasks", [])):
+                self._row_ids.append(self._insert(db, position, task))
+
+    def save_settings(self, config):
+        # Everything but the task list
+        with self._transaction() as db:
+            self._write_settings(db, config)
+
+    @staticmethod
+    def _write_settings(db, config):
+        db.execute("DELETE FROM settings")
+        db.executemany(
+            "INSERT INTO settings (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value)) for key, value in config.items() if key != "tasks"]
+        )
+
+    # --- Single tasks (by list index) ---
+
+    def _insert(self, db, position, task):
+        columns, targets = task_row(task)
+        row_id = db.execute(
+            "INSERT INTO tasks (position, type, action, seconds, weekdays, date, enabled, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (position,) + columns
+        ).lastrowid
+        db.executemany("INSERT OR IGNORE INTO task_targets (endpoint, task_id) VALUES (?, ?)",
+                       [(name, row_id) for name in targets])
+        return row_id
+
+    def add_task(self, task):
+        with self._transaction() as db:
+            position = db.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM tasks").fetchone()[0]
+            self._row_ids.append(self._insert(db, position, task))
+
+    def update_task(self, index, task):
+        row_id = self._row_ids[index]
+        columns, targets = task_row(task)
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE tasks SET type = ?, action = ?, seconds = ?, weekdays = ?, date = ?, enabled = ?, data = ? "
+                "WHERE id = ?",
+                columns + (row_id,)
+            )
+            db.execute("DELETE FROM task_targets WHERE task_id = ?", (row_id,))
+            db.executemany("INSERT OR IGNORE INTO task_targets (endpoint, task_id) VALUES (?, ?)",
+                           [(name, row_id) for name in targets])
+
+    def remove_task(self, index):
+        row_id = self._row_ids.pop(index)
+        with self._transaction() as db:
+            db.execute("DELETE FROM tasks WHERE id = ?", (row_id,))
+
+    # --- Queries ---
+
+    def tasks_between(self, start, end, endpoints=None):
+        # Enabled tasks firing in [start, end) -> [(fire_time, task), ...] by
+        # time, optionally only those targeting one of 'endpoints'
+        target_filter = ""
+        target_args = ()
+        if endpoints is not None:
+            endpoints = list(endpoints)
+            target_filter = (" AND id IN (SELECT task_id FROM task_targets WHERE endpoint IN (%s))"
+                             % ",".join("?" * len(endpoints)))
+            target_args = tuple(endpoints)
+
+        results = []
+        ordinal = datetime.fromtimestamp(start).toordinal()
+        day_start = at_date(ordinal, 0)
+        with self._lock:
+            while day_start < end:
+                next_start = at_date(ordinal + 1, 0)
+                if next_start - day_start == 86400:
+                    lo = max(0, int(start - day_start))
+                    hi = min(86400, int(end - day_start) + 1)
+                else:
+                    # UTC offset change: seconds of day are not seconds since
+                    # midnight, so take the whole day and filter on fire time
+                    lo, hi = 0, 86400
+                rows = self._db.execute(
+                    "SELECT seconds, data FROM tasks WHERE enabled = 1 AND seconds >= ? AND seconds < ? "
+                    "AND ((type = 'onetime' AND date = ?) OR (type != 'onetime' AND weekdays & ?))"
+                    + target_filter,
+                    (lo, hi, ordinal, 1 << (ordinal - 1) % 7) + target_args
+                ).fetchall()
+                for seconds, data in rows:
+                    fire_time = at_date(ordinal, seconds)
+                    if start <= fire_time < end:
+                        results.append((fire_time, json.loads(data)))
+                ordinal += 1
+                day_start = next_start
+        results.sort(key=lambda item: item[0])
+        return results
+
+
+class _Transaction:
+    def __init__(self, store):
+        self.store = store
+
+    def __enter__(self):
+        self.store._lock.acquire()
+        self.store._db.execute("BEGIN IMMEDIATE")
+        return self.store._db
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.store._db.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.store._lock.release()
+        return False
+
+
+class SQLitePresets:
+    # Same interface as obs_presets.PresetStore
+
+    def __init__(self, store):
+        self.store = store
+
+    def names(self):
+        with self.store._lock:
+            return [name for (name,) in self.store._db.execute("SELECT name FROM presets ORDER BY position")]
+
+    def __contains__(self, name):
+        with self.store._lock:
+            return self.store._db.execute("SELECT 1 FROM presets WHERE name = ?", (name,)).fetchone() is not None
+
+    def get(self, name, default=None):
+        with self.store._lock:
+            row = self.store._db.execute("SELECT tasks FROM presets WHERE name = ?", (name,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def items(self):
+        with self.store._lock:
+            rows = self.store._db.execute("SELECT name, tasks FROM presets ORDER BY position").fetchall()
+        return [(name, json.loads(tasks)) for name, tasks in rows]
+
+    def set(self, name, tasks):
+        return self.update({name: tasks})
+
+    def update(self, presets):
+        # Existing presets keep their place in the list
+        with self.store._transaction() as db:
+            position = db.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM presets").fetchone()[0]
+            for offset, (name, tasks) in enumerate(presets.items()):
+                db.execute(
+                    "INSERT INTO presets (name, position, tasks) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET tasks = excluded.tasks",
+                    (name, position + offset, json.dumps(tasks))
+                )
+        return True
+
+    def import_spool(self, spool):
+        # Adds or replaces the presets of an obs_import.PresetSpool in one
+        # transaction, one preset at a time
+        with self.store._transaction() as db:
+            position = db.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM presets").fetchone()[0]
+            for offset, name in enumerate(spool.names()):
+                db.execute(
+                    "INSERT INTO presets (name, position, tasks) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET tasks = excluded.tasks",
+                    (name, position + offset, spool.raw(name))
+                )
+        return True
+
+    def delete(self, name):
+        with self.store._transaction() as db:
+            return db.execute("DELETE FROM presets WHERE name = ?", (name,)).rowcount > 0
+
+
+def migrate_json(config_file, presets_file, db_path, log=print):
+    # One-shot import of the JSON files into an empty database
+    store = SQLiteStore(db_path, log=log)
+    try:
+        if not store.is_empty():
+            log(f"{db_path} already contains data; not migrating.")
+            return False
+        config = load_json(config_file, {}, log=log) if os.path.exists(config_file) else {}
+        presets = load_json(presets_file, {}, log=log) if os.path.exists(presets_file) else {}
+        config = config if isinstance(config, dict) else {}
+        presets = {name: tasks for name, tasks in presets.items() if isinstance(tasks, list)} if isinstance(presets, dict) else {}
+        store.save_config(config)
+        store.presets.update(presets)
+        log(f"Migrated {len(config.get('tasks', []))} task(s) and {len(presets)} preset(s) into {db_path}.")
+        return True
+    finally:
+        store.close()
@@ -0,0 +1,312 @@
+import asyncio
+import base64
+import json
+import os
+import random
+import threading
+
+from obs_ws import (
+    WebSocket, accept_key, auth_response, OBS_SUBPROTOCOL, CLOSE_AUTH_FAILED,
+    OBS_HELLO, OBS_IDENTIFY, OBS_IDENTIFIED, OBS_EVENT, OBS_REQUEST, OBS_REQUEST_RESPONSE,
+    OBS_REQUEST_BATCH, OBS_REQUEST_BATCH_RESPONSE,
+)
+
+# Local stand-in for OBS's websocket server (obs-websocket v5), for tests and
+# benchmarks without an OBS install. Speaks hello/identify with optional
+# authentication, the stream/record requests the scheduler sends, request
+# batches and the matching output events. Faults can be injected:
+#   latency / jitter   - seconds added before each response
+#   drop_rate          - chance a request kills the connection unanswered
+#   auth_failure_rate  - chance a correct password is still rejected
+#
+#     server = StandInOBS(password="secret", latency=0.005)
+#     host, port = server.start_in_thread()
+#     ...
+#     server.stop()
+#
+# or from a shell: python -m obs_standin --port 4455 --password secret
+
+RPC_VERSION = 1
+EVENT_OUTPUTS = 1 << 6 # eventSubscriptions bit for Stream/RecordStateChanged
+
+# obs-websocket RequestStatus codes
+STATUS_SUCCESS = 100
+STATUS_UNKNOWN_REQUEST = 204
+STATUS_OUTPUT_RUNNING = 500
+STATUS_OUTPUT_NOT_RUNNING = 501
+
+CLOSE_NOT_IDENTIFIED = 4007
+
+# requestType -> (output, wanted state, event type)
+OUTPUT_REQUESTS = {
+    "StartStream": ("stream", True, "StreamStateChanged"),
+    "StopStream": ("stream", False, "StreamStateChanged"),
+    "StartRecord": ("record", True, "RecordStateChanged"),
+    "StopRecord": ("record", False, "RecordStateChanged"),
+}
+
+
+class StandInOBS:
+
+    def __init__(self, host="127.0.0.1", port=0, password="", latency=0.0, jitter=0.0,
+                 drop_rate=0.0, auth_failure_rate=0.0, seed=None, log=None):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.auth_failure_rate = auth_failure_rate
+        self.log = log
+        self.random = random.Random(seed)
+        self.outputs = {"stream": False, "record": False}
+        self.stats = {"connections": 0, "identified": 0, "auth_failures": 0, "requests": 0, "batches": 0, "dropped": 0}
+        self.request_counts = {}
+        self._server = None
+        self._clients = set()
+        self._loop = None
+        self._thread = None
+
+    def _log(self, message):
+        if self.log:
+            self.log(f"[stand-in] {message}")
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        # Listens on the running loop; returns (host, port)
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._log(f"Listening on ws://{self.host}:{self.port}")
+        return self.host, self.port
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            for ws in list(self._clients):
+                ws.abort()
+            await self._server.wait_closed()
+            self._server = None
+
+    def start_in_thread(self):
+        # Runs the server on its own event loop thread, for synchronous callers
+        started = threading.Event()
+        result = {}
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                result["address"] = loop.run_until_complete(self.start())
+            except Exception as e:
+                result["error"] = e
+                started.set()
+                loop.close()
+                return
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(self.close())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="obs-standin", daemon=True)
+        self._thread.start()
+        started.wait()
+        if "error" in result:
+            raise result["error"]
+        return result["address"]
+
+    def stop(self):
+        if self._thread:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def drop_clients(self):
+        # Simulates OBS going away: closes every open connection
+        def abort():
+            for ws in list(self._clients):
+                ws.abort()
+        if self._loop:
+            self._loop.call_soon_threadsafe(abort)
+
+    # --- Connection handling ---
+
+    async def _handshake(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+            return None
+        headers = {}
+        for line in request.decode("latin-1").split("\r\n")[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        key = headers.get("sec-websocket-key")
+        if not key or headers.get("upgrade", "").lower() != "websocket":
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            return None
+        response = (
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept_key(key)}\r\n"
+        )
+        if OBS_SUBPROTOCOL in headers.get("sec-websocket-protocol", ""):
+            response += f"Sec-WebSocket-Protocol: {OBS_SUBPROTOCOL}\r\n"
+        writer.write((response + "\r\n").encode())
+        await writer.drain()
+        return WebSocket(reader, writer, mask=False)
+
+    async def _handle(self, reader, writer):
+        ws = await self._handshake(reader, writer)
+        if ws is None:
+            writer.close()
+            return
+        self.stats["connections"] += 1
+        self._clients.add(ws)
+        try:
+            subscriptions = await self._identify(ws)
+            if subscriptions is None:
+                return
+            while True:
+                message = json.loads(await ws.recv())
+                op = message.get("op")
+                if op not in (OBS_REQUEST, OBS_REQUEST_BATCH):
+                    continue
+                if self.drop_rate and self.random.random() < self.drop_rate:
+                    self.stats["dropped"] += 1
+                    self._log("Dropping connection instead of answering.")
+                    ws.abort()
+                    return
+                await self._delay()
+                if op == OBS_REQUEST:
+                    response, events = self._request(message["d"])
+                    await ws.send(json.dumps({"op": OBS_REQUEST_RESPONSE, "d": response}))
+                else:
+                    response, events = self._batch(message["d"])
+                    await ws.send(json.dumps({"op": OBS_REQUEST_BATCH_RESPONSE, "d": response}))
+                if subscriptions & EVENT_OUTPUTS:
+                    for event in events:
+                        await ws.send(json.dumps({"op": OBS_EVENT, "d": event}))
+        except (ConnectionError, ValueError, KeyError, asyncio.TimeoutError):
+            pass
+        finally:
+            self._clients.discard(ws)
+            ws.abort()
+
+    async def _identify(self, ws):
+        # Hello -> Identify -> Identified; returns the event subscriptions or
+        # None when the client was rejected
+        hello = {"obsWebSocketVersion": "5.0.0", "rpcVersion": RPC_VERSION}
+        salt = challenge = None
+        if self.password:
+            salt = base64.b64encode(os.urandom(32)).decode()
+            challenge = base64.b64encode(os.urandom(32)).decode()
+            hello["authentication"] = {"salt": salt, "challenge": challenge}
+        await ws.send(json.dumps({"op": OBS_HELLO, "d": hello}))
+
+        message = json.loads(await asyncio.wait_for(ws.recv(), 10))
+        if message.get("op") != OBS_IDENTIFY:
+            await ws.close(CLOSE_NOT_IDENTIFIED)
+            return None
+        data = message.get("d", {})
+        if self.password:
+            valid = data.get("authentication") == auth_response(self.password, salt, challenge)
+            if not valid or (self.auth_failure_rate and self.random.random() < self.auth_failure_rate):
+                self.stats["auth_failures"] += 1
+                self._log("Authentication failed.")
+                await ws.close(CLOSE_AUTH_FAILED)
+                return None
+        await self._delay()
+        await ws.send(json.dumps({"op": OBS_IDENTIFIED, "d": {"negotiatedRpcVersion": RPC_VERSION}}))
+        self.stats["identified"] += 1
+        return int(data.get("eventSubscriptions", 0) or 0)
+
+    async def _delay(self):
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    # --- Requests ---
+
+    def _execute(self, request_type):
+        # Applies one request -> (requestStatus, responseData, events)
+        self.stats["requests"] += 1
+        self.request_counts[request_type] = self.request_counts.get(request_type, 0) + 1
+        if request_type in OUTPUT_REQUESTS:
+            output, wanted, event_type = OUTPUT_REQUESTS[request_type]
+            if self.outputs[output] == wanted:
+                code = STATUS_OUTPUT_RUNNING if wanted else STATUS_OUTPUT_NOT_RUNNING
+                return {"result": False, "code": code}, None, []
+            self.outputs[output] = wanted
+            state = "OBS_WEBSOCKET_OUTPUT_STARTED" if wanted else "OBS_WEBSOCKET_OUTPUT_STOPPED"
+            event = {"eventType": event_type, "eventIntent": EVENT_OUTPUTS,
+                     "eventData": {"outputActive": wanted, "outputState": state}}
+            return {"result": True, "code": STATUS_SUCCESS}, None, [event]
+        if request_type == "GetStreamStatus":
+            return {"result": True, "code": STATUS_SUCCESS}, {"outputActive": self.outputs["stream"]}, []
+        if request_type == "GetRecordStatus":
+            return {"result": True, "code": STATUS_SUCCESS}, {"outputActive": self.outputs["record"]}, []
+        if request_type == "GetVersion":
+            data = {"obsWebSocketVersion": "5.0.0", "rpcVersion": RPC_VERSION,
+                    "availableRequests": sorted(OUTPUT_REQUESTS) + ["GetRecordStatus", "GetStreamStatus", "GetVersion"]}
+            return {"result": True, "code": STATUS_SUCCESS}, data, []
+        return {"result": False, "code": STATUS_UNKNOWN_REQUEST, "comment": f"Unknown request type: {request_type}"}, None, []
+
+    def _request(self, data):
+        status, response_data, events = self._execute(data.get("requestType"))
+        response = {"requestType": data.get("requestType"), "requestId": data.get("requestId"), "requestStatus": status}
+        if response_data is not None:
+            response["responseData"] = response_data
+        return response, events
+
+    def _batch(self, data):
+        self.stats["batches"] += 1
+        results = []
+        events = []
+        for request in data.get("requests", []):
+            status, response_data, request_events = self._execute(request.get("requestType"))
+            result = {"requestType": request.get("requestType"), "requestId": request.get("requestId"), "requestStatus": status}
+            if response_data is not None:
+                result["responseData"] = response_data
+            results.append(result)
+            events += request_events
+            if data.get("haltOnFailure") and not status["result"]:
+                break
+        return {"requestId": data.get("requestId"), "results": results}, events
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="obs_standin", description="Local OBS WebSocket v5 stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4455)
+    parser.add_argument("--password", default="", help="Require authentication with this password.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay before every response.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra random delay, up to this much.")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Chance a request drops the connection.")
+    parser.add_argument("--auth-failure-rate", type=float, default=0.0, help="Chance a correct password is rejected.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server = StandInOBS(args.host, args.port, args.password, args.latency_ms / 1000, args.jitter_ms / 1000,
+                        args.drop_rate, args.auth_failure_rate, args.seed, log=print)
+
+    async def serve():
+        await server.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
@@ -0,0 +1,241 @@
+import itertools
+
+from obs_core import task_targets
+
+# Task list for the GUI. TaskListView keeps the task dicts, a lazily filled
+# cache of their display rows and a stable id per task, and shows them in a
+# ttk.Treeview that only ever holds the rows that fit on screen. Scrolling
+# refills those few items; adding, editing or toggling a task touches one
+# cached row and at most one Treeview item, so the cost of an edit does not
+# grow with the size of the schedule.
+
+
+def display_time(t_time):
+    # "HH:MM[:SS]" (24h) -> "hh:MM[:SS] AM/PM", like the time spinners; other
+    # values are shown unchanged
+    parts = t_time.split(":") if isinstance(t_time, str) else ()
+    if len(parts) not in (2, 3) or not all(p.isdigit() and len(p) <= 2 for p in parts):
+        return t_time
+    hour, minute = int(parts[0]), int(parts[1])
+    second = int(parts[2]) if len(parts) == 3 else 0
+    if hour > 23 or minute > 59 or second > 61:
+        return t_time
+    text = f"{hour % 12 or 12:02d}:{minute:02d}"
+    if len(parts) == 3:
+        text += f":{second:02d}"
+    return f"{text} {'PM' if hour >= 12 else 'AM'}"
+
+
+def display_row(task):
+    # Task dict -> ((Freq, Details, Time, Action), tag)
+    t_type = task.get("type", "daily")
+    if t_type == "weekly":
+        freq, details = "Weekly", ",".join(task.get("days", []))
+    elif t_type == "onetime":
+        freq, details = "One-time", task.get("date", "")
+    elif t_type == "daily":
+        freq, details = "Daily", "Every day"
+    else:
+        freq, details = "Daily", ""
+    if task.get("targets"):
+        details += f" @ {','.join(task_targets(task))}"
+    tag = "enabled" if task.get("enabled", True) else "disabled"
+    return (freq, details, display_time(task.get("time")), task.get("action")), tag
+
+
+class TaskListView:
+
+    def __init__(self, tree, scrollbar):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.tasks = []
+        self._rows = [] # cached display_row() per task, None until shown
+        self._ids = [] # stable id per task
+        self._new_id = itertools.count(1)
+        self.selected = None # stable id of the selected task
+        self.first = 0 # index of the top visible task
+        self.visible = int(tree.cget("height")) or 10
+        self._slots = [] # Treeview items, top to bottom
+        self._slot_rows = [] # (id, row) each slot currently shows
+
+        # The scrollbar spans the whole list, not the items in the Treeview
+        tree.configure(yscrollcommand="")
+        scrollbar.configure(command=self.yview)
+        tree.bind("<Configure>", self._on_configure)
+        tree.bind("<<TreeviewSelect>>", self._on_select)
+        tree.bind("<MouseWheel>", self._on_wheel)
+        tree.bind("<Button-4>", self._on_wheel)
+        tree.bind("<Button-5>", self._on_wheel)
+        for key, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"), ("<Next>", "page"),
+                          ("<Home>", "home"), ("<End>", "end")):
+            tree.bind(key, lambda event, step=step: self._on_key(step))
+
+    def __len__(self):
+        return len(self.tasks)
+
+    # --- Model ---
+
+    def set_tasks(self, tasks):
+        # Replaces the whole list (takes ownership of 'tasks')
+        self.tasks = tasks
+        self._rows = [None] * len(tasks)
+        self._ids = [next(self._new_id) for _ in tasks]
+        self.selected = None
+        self.first = min(self.first, max(0, len(tasks) - self.visible))
+        self.render()
+
+    def append(self, task):
+        self.tasks.append(task)
+        self._rows.append(None)
+        self._ids.append(next(self._new_id))
+        self.render()
+
+    def update(self, index, task=None):
+        # Call after tasks[index] changed (or pass its replacement)
+        if task is not None:
+            self.tasks[index] = task
+        self._rows[index] = None
+        self.render()
+
+    def remove(self, index):
+        if self._ids[index] == self.selected:
+            self.selected = None
+        del self.tasks[index]
+        del self._rows[index]
+        del self._ids[index]
+        self.first = min(self.first, max(0, len(self.tasks) - self.visible))
+        self.render()
+
+    def invalidate(self):
+        # Rebuilds every display row, e.g. after tasks were changed in place
+        self._rows = [None] * len(self.tasks)
+        if len(self._ids) != len(self.tasks):
+            self._ids = [next(self._new_id) for _ in self.tasks]
+            self.selected = None
+        self.render()
+
+    def row(self, index):
+        row = self._rows[index]
+        if row is None:
+            row = self._rows[index] = display_row(self.tasks[index])
+        return row
+
+    def selected_index(self):
+        if self.selected is None:
+            return None
+        try:
+            return self._ids.index(self.selected)
+        except ValueError:
+            self.selected = None
+            return None
+
+    def select(self, index):
+        self.selected = self._ids[index]
+        self.see(index)
+
+    def see(self, index):
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + self.visible:
+            self.first = index - self.visible + 1
+        self.render()
+
+    # --- Rendering ---
+
+    def render(self):
+        # Shows tasks[first:first + visible]; only items whose row changed
+        # are reconfigured
+        tree = self.tree
+        count = max(0, min(self.visible, len(self.tasks) - self.first))
+        while len(self._slots) < count:
+            self._slots.append(tree.insert("", "end"))
+            self._slot_rows.append(None)
+        if len(self._slots) > count:
+            tree.delete(*self._slots[count:])
+            del self._slots[count:]
+            del self._slot_rows[count:]
+
+        selected_slot = None
+        for offset, slot in enumerate(self._slots):
+            index = self.first + offset
+            shown = (self._ids[index], self.row(index))
+            if self._slot_rows[offset] != shown:
+                values, tag = shown[1]
+                tree.item(slot, values=values, tags=(tag,))
+                self._slot_rows[offset] = shown
+            if shown[0] == self.selected:
+                selected_slot = slot
+        if tuple(tree.selection()) != ((selected_slot,) if selected_slot else ()):
+            tree.selection_set((selected_slot,) if selected_slot else ())
+        if selected_slot:
+            tree.focus(selected_slot)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self.tasks)
+        if total <= self.visible:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.visible) / total))
+
+    def _scroll_to(self, first):
+        first = max(0, min(int(first), len(self.tasks) - self.visible))
+        if first != self.first:
+            self.first = first
+            self.render()
+
+    # --- Events ---
+
+    def yview(self, *args):
+        # Scrollbar command: ("moveto", fraction) or ("scroll", n, "units"|"pages")
+        if args[0] == "moveto":
+            self._scroll_to(float(args[1]) * len(self.tasks))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self.visible if args[2] == "pages" else 1)
+            self._scroll_to(self.first + step)
+
+    def _on_configure(self, event):
+        # Number of whole rows that fit, measured from a rendered row
+        top, height = 25, 20
+        if self._slots:
+            bbox = self.tree.bbox(self._slots[0])
+            if bbox:
+                top, height = bbox[1], bbox[3]
+        visible = max(1, (event.height - top) // height)
+        if visible != self.visible:
+            self.visible = visible
+            self.first = max(0, min(self.first, len(self.tasks) - visible))
+            self.render()
+
+    def _on_select(self, event):
+        # Ignores the empty selection set while the selected task is scrolled away
+        selection = self.tree.selection()
+        if selection and selection[0] in self._slots:
+            offset = self._slots.index(selection[0])
+            if self._slot_rows[offset]:
+                self.selected = self._slot_rows[offset][0]
+
+    def _on_wheel(self, event):
+        if event.num == 4:
+            step = -3
+        elif event.num == 5:
+            step = 3
+        else:
+            step = -3 if event.delta > 0 else 3
+        self._scroll_to(self.first + step)
+        return "break"
+
+    def _on_key(self, step):
+        if not self.tasks:
+            return "break"
+        index = self.selected_index()
+        if step == "home":
+            index = 0
+        elif step == "end":
+            index = len(self.tasks) - 1
+        else:
+            if step in ("page", "-page"):
+                step = self.visible if step == "page" else -self.visible
+            index = 0 if index is None else max(0, min(len(self.tasks) - 1, index + step))
+        self.select(index)
+        return "break"
@@ -0,0 +1,177 @@
+import hashlib
+import os
+import select
+import struct
+import sys
+import threading
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ConfigWatcher:
+    # Calls on_change(data) from a background thread whenever the watched
+    # file's content actually changes. Uses inotify on Linux and falls back
+    # to stat polling elsewhere. Bursts of writes are coalesced: the file is
+    # only read once no further events arrived for 'debounce' seconds.
+
+    def __init__(self, path, on_change, debounce=0.05, poll_interval=1.0, log=None):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.log = log
+        self.last_hash = None
+        self.mode = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._fd = None
+        self._wake_pipe = None
+        self._last_stat = None
+
+    def start(self):
+        self._last_stat = self._stat()
+        data = self._read()
+        if data is not None:
+            self.last_hash = content_hash(data)
+
+        if sys.platform.startswith("linux"):
+            try:
+                self._fd = self._init_inotify()
+                self._wake_pipe = os.pipe()
+                self.mode = "inotify"
+            except OSError as e:
+                self._log(f"inotify unavailable ({e}), falling back to polling.")
+        if self._fd is None:
+            self.mode = "polling"
+
+        target = self._run_inotify if self._fd is not None else self._run_polling
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._wake_pipe:
+            os.write(self._wake_pipe[1], b"x")
+        if self._thread:
+            self._thread.join(timeout=2)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._wake_pipe:
+            for fd in self._wake_pipe:
+                os.close(fd)
+            self._wake_pipe = None
+
+    def acknowledge(self, data):
+        # Record content we wrote ourselves so it does not trigger a reload
+        self.last_hash = content_hash(data)
+
+    def _log(self, message):
+        if self.log:
+            self.log(message)
+
+    def _read(self):
+        try:
+            with open(self.path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _check(self):
+        data = self._read()
+        if data is None:
+            return
+        digest = content_hash(data)
+        if digest == self.last_hash:
+            return
+        self.last_hash = digest
+        try:
+            self.on_change(data)
+        except Exception as e:
+            self._log(f"Error handling config change: {e}")
+
+    # --- inotify ---
+
+    def _init_inotify(self):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Watch the directory so atomic rename-over replacements are seen too
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        directory = os.path.dirname(self.path).encode()
+        if libc.inotify_add_watch(fd, directory, mask) < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, "inotify_add_watch failed")
+        return fd
+
+    def _drain(self):
+        # Returns True if any pending event concerns the watched file
+        name = os.path.basename(self.path).encode()
+        relevant = False
+        while True:
+            try:
+                buf = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return relevant
+            if not buf:
+                return relevant
+            offset = 0
+            while offset < len(buf):
+                _, _, _, length = EVENT_HEADER.unpack_from(buf, offset)
+                offset += EVENT_HEADER.size
+                if buf[offset:offset + length].rstrip(b"\0") == name:
+                    relevant = True
+                offset += length
+
+    def _run_inotify(self):
+        # Blocks without a timeout; stop() writes to the wake pipe
+        while True:
+            ready, _, _ = select.select([self._fd, self._wake_pipe[0]], [], [])
+            if self._stop.is_set():
+                return
+            if not self._drain():
+                continue
+            # Coalesce the rest of the burst before reading the file
+            while select.select([self._fd], [], [], self.debounce)[0]:
+                self._drain()
+            self._check()
+
+    # --- polling fallback ---
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size, st.st_ino)
+        except OSError:
+            return None
+
+    def _run_polling(self):
+        last = self._last_stat
+        while not self._stop.wait(self.poll_interval):
+            current = self._stat()
+            if current == last:
+                continue
+            # Wait until the file stops changing
+            while not self._stop.wait(self.debounce):
+                settled = self._stat()
+                if settled == current:
+                    break
+                current = settled
+            last = current
+            self._check()
@@ -0,0 +1,100 @@
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Runs blocking GUI work (connecting, disk writes, imports) off the Tk thread.
+# Each lane is one worker thread, so jobs in a lane run in submission order:
+# config and preset writes go through "disk" and cannot overtake each other,
+# while a slow connection attempt on "obs" does not hold them up. Finished
+# futures are handed back through a queue that the Tk thread drains with
+# root.after, so done/failed callbacks may touch widgets.
+#
+#     worker.submit(core.connect_obs, lane="obs", label="Connecting to OBS",
+#                   done=on_connected, failed=on_error)
+
+POLL_MS = 50
+
+
+class UIWorker:
+
+    def __init__(self, root, on_busy=None, log=None):
+        self.root = root
+        self.on_busy = on_busy # on_busy(labels) on the Tk thread when pending work changes
+        self.log = log
+        self._lanes = {}
+        self._pending = {} # future -> (label, done, failed)
+        self._finished = queue.SimpleQueue()
+        self._polling = False
+        self._closed = False
+
+    def submit(self, fn, *args, lane="disk", label=None, done=None, failed=None):
+        # Runs fn(*args) on the lane's thread; done(result) or failed(error)
+        # follow on the Tk thread. Returns the Future.
+        executor = self._lanes.get(lane)
+        if executor is None:
+            executor = self._lanes[lane] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"ui-{lane}")
+        return self.watch(executor.submit(fn, *args), label, done, failed)
+
+    def watch(self, future, label=None, done=None, failed=None):
+        # Tracks a future completed elsewhere (e.g. by the scheduler thread)
+        if self._closed:
+            return future
+        self._pending[future] = (label, done, failed)
+        future.add_done_callback(self._finished.put)
+        self._changed()
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_MS, self._poll)
+        return future
+
+    def future(self, label=None, done=None, failed=None):
+        # A Future for the caller to resolve from any thread
+        return self.watch(Future(), label, done, failed)
+
+    def busy(self):
+        # Distinct labels of pending work, oldest first
+        return list(dict.fromkeys(label for label, _, _ in self._pending.values() if label))
+
+    def shutdown(self, wait=True):
+        # Waits for queued jobs; their callbacks are dropped
+        self._closed = True
+        for executor in self._lanes.values():
+            executor.shutdown(wait=wait)
+        self._pending.clear()
+
+    def _changed(self):
+        if self.on_busy:
+            self.on_busy(self.busy())
+
+    def _poll(self):
+        if self._closed:
+            return
+        changed = False
+        while True:
+            try:
+                future = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            entry = self._pending.pop(future, None)
+            if entry is None or future.cancelled():
+                changed = changed or entry is not None
+                continue
+            changed = True
+            label, done, failed = entry
+            try:
+                error = future.exception()
+                if error is None:
+                    if done:
+                        done(future.result())
+                elif failed:
+                    failed(error)
+                elif self.log:
+                    self.log(f"{label or 'Background task'} failed: {error}")
+            except Exception as e:
+                if self.log:
+                    self.log(f"Error handling result of {label or 'background task'}: {e}")
+        if changed:
+            self._changed()
+        if self._pending:
+            self.root.after(POLL_MS, self._poll)
+        else:
+            self._polling = False
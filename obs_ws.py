@@ -0,0 +1,309 @@
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import os
+import struct
+
+# Minimal RFC 6455 websocket framing and obs-websocket v5 client for asyncio.
+# Only what OBS needs: text frames, ping/pong, close, no extensions.
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OBS_SUBPROTOCOL = "obswebsocket.json"
+
+OP_CONT = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+# obs-websocket v5 message opcodes
+OBS_HELLO = 0
+OBS_IDENTIFY = 1
+OBS_IDENTIFIED = 2
+OBS_EVENT = 5
+OBS_REQUEST = 6
+OBS_REQUEST_RESPONSE = 7
+OBS_REQUEST_BATCH = 8
+OBS_REQUEST_BATCH_RESPONSE = 9
+
+# Identify close code sent by OBS when authentication fails
+CLOSE_AUTH_FAILED = 4009
+
+
+class NotSent(ConnectionError):
+    # The connection was already closed, so the frame never reached the socket
+    pass
+
+
+class OBSRequestError(Exception):
+    def __init__(self, request_type, code, comment=None):
+        self.request_type = request_type
+        self.code = code
+        message = f"Request {request_type} returned code {code}."
+        if comment:
+            message += f" With message: {comment}"
+        super().__init__(message)
+
+
+def accept_key(key):
+    return base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+
+
+def auth_response(password, salt, challenge):
+    # obs-websocket v5 authentication string
+    secret = base64.b64encode(hashlib.sha256((password + salt).encode()).digest())
+    return base64.b64encode(hashlib.sha256(secret + challenge.encode()).digest()).decode()
+
+
+class WebSocket:
+    # One websocket connection over asyncio streams. Clients mask their
+    # frames, servers do not.
+
+    def __init__(self, reader, writer, mask):
+        self.reader = reader
+        self.writer = writer
+        self.mask = mask
+        self.closed = False
+        self.close_code = None
+
+    async def send(self, text):
+        await self._send_frame(OP_TEXT, text.encode())
+
+    async def _send_frame(self, opcode, payload):
+        if self.closed:
+            raise NotSent("websocket is closed")
+        header = bytearray([0x80 | opcode])
+        length = len(payload)
+        mask_bit = 0x80 if self.mask else 0
+        if length < 126:
+            header.append(mask_bit | length)
+        elif length < 65536:
+            header.append(mask_bit | 126)
+            header += struct.pack("!H", length)
+        else:
+            header.append(mask_bit | 127)
+            header += struct.pack("!Q", length)
+        if self.mask:
+            key = os.urandom(4)
+            header += key
+            payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+        self.writer.write(bytes(header) + payload)
+        await self.writer.drain()
+
+    async def _read_frame(self):
+        head = await self.reader.readexactly(2)
+        fin = head[0] & 0x80
+        opcode = head[0] & 0x0F
+        masked = head[1] & 0x80
+        length = head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", await self.reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+        key = await self.reader.readexactly(4) if masked else None
+        payload = await self.reader.readexactly(length)
+        if key:
+            payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+        return fin, opcode, payload
+
+    async def recv(self):
+        # Returns the next text message; raises ConnectionError once closed
+        fragments = []
+        while True:
+            try:
+                fin, opcode, payload = await self._read_frame()
+            except (asyncio.IncompleteReadError, ConnectionError, OSError) as e:
+                self.closed = True
+                raise ConnectionError(f"websocket connection lost: {e}") from e
+            if opcode == OP_PING:
+                await self._send_frame(OP_PONG, payload)
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                self.close_code = struct.unpack("!H", payload[:2])[0] if len(payload) >= 2 else None
+                if not self.closed:
+                    try:
+                        await self._send_frame(OP_CLOSE, payload[:2])
+                    except (ConnectionError, OSError):
+                        pass
+                self.closed = True
+                self.writer.close()
+                raise ConnectionError(f"websocket closed by peer (code {self.close_code})")
+            fragments.append(payload)
+            if fin:
+                return b"".join(fragments).decode()
+
+    async def close(self, code=1000):
+        if not self.closed:
+            try:
+                await self._send_frame(OP_CLOSE, struct.pack("!H", code))
+            except (ConnectionError, OSError):
+                pass
+            self.closed = True
+        self.writer.close()
+
+    def abort(self):
+        # Synchronous close, usable outside the event loop's coroutines
+        self.closed = True
+        self.writer.close()
+
+
+async def open_websocket(host, port, timeout=3, subprotocol=OBS_SUBPROTOCOL):
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    key = base64.b64encode(os.urandom(16)).decode()
+    request = (
+        f"GET / HTTP/1.1\r\n"
+        f"Host: {host}:{port}\r\n"
+        f"Upgrade: websocket\r\n"
+        f"Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\n"
+        f"Sec-WebSocket-Version: 13\r\n"
+        f"Sec-WebSocket-Protocol: {subprotocol}\r\n\r\n"
+    )
+    try:
+        writer.write(request.encode())
+        response = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+        writer.close()
+        raise ConnectionError(f"websocket handshake failed: {e}") from e
+    except BaseException:
+        # Timeout or cancellation: don't leak the socket
+        writer.close()
+        raise
+    lines = response.decode("latin-1").split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    if " 101 " not in lines[0] + " " or headers.get("sec-websocket-accept") != accept_key(key):
+        writer.close()
+        raise ConnectionError(f"websocket handshake failed: {lines[0]}")
+    return WebSocket(reader, writer, mask=True)
+
+
+class AsyncOBSClient:
+    # obs-websocket v5 client: hello/identify (with auth), requests and
+    # request batches. Many requests can be in flight on one connection;
+    # a reader task matches responses to them by requestId.
+
+    def __init__(self, host="localhost", port=4455, password="", timeout=3):
+        self.host = host
+        self.port = int(port)
+        self.password = password
+        self.timeout = timeout
+        self.ws = None
+        self.negotiated_rpc_version = None
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._reader_task = None
+
+    @property
+    def connected(self):
+        return self.ws is not None and not self.ws.closed
+
+    async def connect(self):
+        self.ws = await open_websocket(self.host, self.port, self.timeout)
+        try:
+            hello = json.loads(await asyncio.wait_for(self.ws.recv(), self.timeout))
+            if hello.get("op") != OBS_HELLO:
+                raise ConnectionError("expected Hello from server")
+            identify = {"rpcVersion": hello["d"].get("rpcVersion", 1), "eventSubscriptions": 0}
+            auth = hello["d"].get("authentication")
+            if auth:
+                if not self.password:
+                    raise ConnectionError("authentication enabled but no password provided")
+                identify["authentication"] = auth_response(self.password, auth["salt"], auth["challenge"])
+            await self.ws.send(json.dumps({"op": OBS_IDENTIFY, "d": identify}))
+            try:
+                identified = json.loads(await asyncio.wait_for(self.ws.recv(), self.timeout))
+            except ConnectionError:
+                if self.ws.close_code == CLOSE_AUTH_FAILED:
+                    raise ConnectionError("Authentication failed.")
+                raise
+            if identified.get("op") != OBS_IDENTIFIED:
+                raise ConnectionError("failed to identify client with the server")
+            self.negotiated_rpc_version = identified["d"].get("negotiatedRpcVersion")
+        except BaseException:
+            self.ws.abort()
+            raise
+        self._reader_task = asyncio.get_running_loop().create_task(self._read_loop())
+
+    async def _read_loop(self):
+        error = ConnectionError("connection closed")
+        try:
+            while True:
+                message = json.loads(await self.ws.recv())
+                if message.get("op") in (OBS_REQUEST_RESPONSE, OBS_REQUEST_BATCH_RESPONSE):
+                    future = self._pending.pop(message["d"].get("requestId"), None)
+                    if future and not future.done():
+                        future.set_result(message["d"])
+                # Events (op 5) are not subscribed to and otherwise ignored
+        except ConnectionError as e:
+            error = e
+        except ValueError as e:
+            error = ConnectionError(f"invalid message from server: {e}")
+        finally:
+            self.ws.abort()
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    async def _call(self, op, payload):
+        if not self.connected:
+            raise NotSent("not connected")
+        request_id = str(next(self._ids))
+        payload["requestId"] = request_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self.ws.send(json.dumps({"op": op, "d": payload}))
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self.ws.abort()
+            raise ConnectionError(f"timed out waiting for {payload.get('requestType', 'batch')}")
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def request(self, request_type, data=None):
+        payload = {"requestType": request_type}
+        if data:
+            payload["requestData"] = data
+        response = await self._call(OBS_REQUEST, payload)
+        status = response.get("requestStatus", {})
+        if not status.get("result"):
+            raise OBSRequestError(request_type, status.get("code"), status.get("comment"))
+        return response.get("responseData")
+
+    async def request_batch(self, request_types, halt_on_failure=False):
+        # Serial realtime batch; returns [(requestType, ok, comment), ...] in order
+        response = await self._call(OBS_REQUEST_BATCH, {
+            "haltOnFailure": halt_on_failure,
+            "executionType": 0,
+            "requests": [{"requestType": t, "requestId": str(i)} for i, t in enumerate(request_types)],
+        })
+        results = {}
+        for result in response.get("results", []):
+            status = result.get("requestStatus", {})
+            results[result.get("requestId")] = (status.get("result", False), status.get("comment") or f"code {status.get('code')}")
+        return [
+            (request_type,) + results.get(str(i), (False, "no result returned"))
+            for i, request_type in enumerate(request_types)
+        ]
+
+    async def close(self):
+        if self.ws:
+            await self.ws.close()
+        if self._reader_task:
+            # A peer that never answers the close frame must not hang shutdown;
+            # wait_for cancels the reader when the timeout expires
+            try:
+                await asyncio.wait_for(self._reader_task, self.timeout)
+            except (Exception, asyncio.CancelledError):
+                pass
+            self._reader_task = None
@@ -0,0 +1,22 @@
+import os
+import time
+
+import obs_engine
+
+
+def _reset_tz(tz):
+    if tz is None:
+        os.environ.pop("TZ", None)
+    else:
+        os.environ["TZ"] = tz
+    time.tzset()
+    # Day boundaries are cached per process
+    obs_engine._local_days.clear()
+    obs_engine._last_day = (0.0, 0.0, 0, 0)
+
+
+def use_tz(test, tz):
+    # Switches the process time zone for one test case
+    old = os.environ.get("TZ")
+    _reset_tz(tz)
+    test.addCleanup(_reset_tz, old)
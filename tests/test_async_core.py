@@ -0,0 +1,101 @@
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+
+from obs_async import AsyncOBSSchedulerCore
+from obs_conn import LOST
+from obs_standin import StandInOBS
+
+
+class AsyncCoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        with open("config.json", "w") as f:
+            json.dump({"tasks": []}, f)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_reschedule_wakes_loop(self):
+        # No jobs, so the loop would otherwise sleep for max_sleep
+        async def scenario():
+            core = AsyncOBSSchedulerCore("config.json")
+            runner = asyncio.ensure_future(core.run_scheduler())
+            await asyncio.sleep(0.05)
+            done = threading.Event()
+            started = time.monotonic()
+            threading.Thread(target=core.request_reschedule, kwargs={"done": done.set}).start()
+            await asyncio.get_running_loop().run_in_executor(None, done.wait, 5)
+            elapsed = time.monotonic() - started
+            core.stop()
+            await runner
+            core.config_writer.flush()
+            return done.is_set(), elapsed
+
+        done, elapsed = asyncio.run(scenario())
+        self.assertTrue(done)
+        self.assertLess(elapsed, 1.0)
+
+    def test_run_forever_compacts_and_schedules_while_connecting(self):
+        # OBS accepts the TCP connection but never answers the handshake
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        self.addCleanup(server.close)
+        with open("config.json", "w") as f:
+            json.dump({
+                "auto_connect": True,
+                "host": "127.0.0.1",
+                "port": server.getsockname()[1],
+                "expired_tasks": "delete",
+                "tasks": [
+                    {"type": "onetime", "date": "2000-01-01", "time": "12:00", "action": "Start Streaming"},
+                    {"type": "daily", "time": "12:00", "action": "Stop Streaming"},
+                ],
+            }, f)
+
+        async def scenario():
+            core = AsyncOBSSchedulerCore("config.json")
+            runner = asyncio.ensure_future(core.run_forever())
+            await asyncio.sleep(0.3)
+            state = ([t["action"] for t in core.config["tasks"]], core.scheduler.job_count())
+            core.stop()
+            await asyncio.wait_for(runner, 5)
+            return state
+
+        tasks, jobs = asyncio.run(scenario())
+        self.assertEqual(tasks, ["Stop Streaming"])
+        self.assertEqual(jobs, 1)
+
+    def test_request_lost_after_send_is_not_replayed(self):
+        # The stand-in answers after the client has given up waiting
+        server = StandInOBS(latency=0.5)
+        host, port = server.start_in_thread()
+        self.addCleanup(server.stop)
+        with open("config.json", "w") as f:
+            json.dump({"host": host, "port": port, "retry_window_seconds": 5, "tasks": []}, f)
+
+        async def scenario():
+            core = AsyncOBSSchedulerCore("config.json")
+            self.assertTrue((await core.connect_obs())[0])
+            core.conn.client.timeout = 0.2
+            results = await core.execute_action("Start Streaming")
+            await asyncio.sleep(0.6)
+            await core.shutdown()
+            return results
+
+        self.assertEqual(asyncio.run(scenario()), {"default": LOST})
+        self.assertEqual(server.request_counts.get("StartStream"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
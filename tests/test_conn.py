@@ -0,0 +1,97 @@
+import json
+import os
+import socket
+import tempfile
+import time
+import unittest
+
+from obs_conn import ConnectionManager, CONNECTED, DROPPED, LOST, QUEUED, send_batch
+from obs_core import OBSSchedulerCore
+from obs_standin import StandInOBS
+
+
+def wait_for(condition, timeout=5.0):
+    end = time.time() + timeout
+    while not condition():
+        if time.time() > end:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class ConnectionManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandInOBS(seed=1)
+        host, port = self.server.start_in_thread()
+        self.addCleanup(self.server.stop)
+        self.conn = ConnectionManager(lambda: (host, port, ""), backoff_initial=0.05)
+        self.conn.start()
+        self.addCleanup(self.conn.stop)
+        self.assertTrue(self.conn.connect()[0])
+
+    def start_stream(self, on_failed=None):
+        return self.conn.run(lambda client: send_batch(client, ["StartStream"]), "batch (Start Streaming)",
+                             time.time() + 10, on_failed)
+
+    def test_request_lost_after_send_is_not_replayed(self):
+        # The server reads the batch, then closes without answering
+        self.server.drop_rate = 1.0
+        failures = []
+        self.assertEqual(self.start_stream(failures.append), LOST)
+        self.assertEqual(failures, [LOST])
+        self.assertTrue(wait_for(lambda: self.conn.state == CONNECTED))
+        time.sleep(0.2)
+        self.assertEqual(self.server.stats["dropped"], 1)
+        self.assertNotIn("StartStream", self.server.request_counts)
+
+    def test_request_on_closed_socket_is_retried(self):
+        self.conn.client.base_client.ws.shutdown()
+        self.assertEqual(self.start_stream(), QUEUED)
+        self.assertTrue(wait_for(lambda: self.server.request_counts.get("StartStream") == 1))
+        time.sleep(0.2)
+        self.assertEqual(self.server.request_counts["StartStream"], 1)
+
+
+class PendingRequestTest(unittest.TestCase):
+
+    def test_expired_request_behind_a_later_deadline_is_dropped(self):
+        # Nothing listens on the port, so requests stay queued
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        messages = []
+        failures = []
+        conn = ConnectionManager(lambda: ("127.0.0.1", port, ""), log=messages.append, backoff_initial=0.05)
+        conn.start()
+        self.addCleanup(conn.stop)
+        now = time.time()
+        self.assertEqual(conn.run(lambda client: None, "late", now + 30, lambda r: failures.append(("late", r))), QUEUED)
+        self.assertEqual(conn.run(lambda client: None, "early", now + 0.2, lambda r: failures.append(("early", r))), QUEUED)
+        self.assertTrue(wait_for(lambda: any(m.startswith("Dropping early") for m in messages)))
+        self.assertEqual([request.description for request in conn._pending], ["late"])
+        conn.disconnect()
+        self.assertEqual(failures, [("early", DROPPED), ("late", DROPPED)])
+
+
+class FireMetricsTest(unittest.TestCase):
+
+    def test_lost_fire_is_counted(self):
+        server = StandInOBS(drop_rate=1.0)
+        host, port = server.start_in_thread()
+        self.addCleanup(server.stop)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "config.json")
+            with open(path, "w") as f:
+                json.dump({"host": host, "port": port, "fire_lag_slo_ms": 1000, "tasks": []}, f)
+            core = OBSSchedulerCore(path)
+            try:
+                self.assertTrue(core.connect_obs()[0])
+                self.assertEqual(core.execute_action("Start Streaming"), {"default": LOST})
+                self.assertEqual(core.metrics.result_counts(), {("Start Streaming", LOST): 1})
+            finally:
+                core.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+import unittest
+
+from obs_core import OBSSchedulerCore, task_identity
+
+
+class ConfigTest(unittest.TestCase):
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        with open("config.json", "w") as f:
+            json.dump({"expired_tasks": "delete", "tasks": [
+                {"type": "onetime", "date": "2000-01-01", "time": "12:00", "action": "Start Streaming"},
+                {"type": "daily", "time": "12:00", "action": "Stop Streaming"},
+            ]}, f)
+        self.core = OBSSchedulerCore("config.json")
+
+    def tearDown(self):
+        self.core.shutdown()
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_settings_save_keeps_compacted_tasks_out(self):
+        self.assertEqual(self.core.compact_tasks(reschedule=False), 1)
+        self.core.apply_settings({"host": "10.0.0.5"})
+        self.assertEqual(self.core.config["host"], "10.0.0.5")
+        self.assertEqual([t["action"] for t in self.core.config["tasks"]], ["Stop Streaming"])
+
+    def test_settings_save_can_replace_tasks(self):
+        self.core.apply_settings({}, tasks=[])
+        self.assertEqual(self.core.config["tasks"], [])
+
+    def test_edits_follow_tasks_shifted_by_compaction(self):
+        # The GUI saw "Stop Streaming" at index 1; compaction moved it to 0
+        seen = dict(self.core.config["tasks"][1])
+        self.core.compact_tasks(reschedule=False)
+        self.assertTrue(self.core.set_task_enabled(1, False, seen))
+        self.assertEqual(self.core.config["tasks"], [dict(seen, enabled=False)])
+        self.assertTrue(self.core.remove_task(1, seen))
+        self.assertEqual(self.core.config["tasks"], [])
+
+    def test_edit_of_removed_task_is_skipped(self):
+        gone = dict(self.core.config["tasks"][0])
+        self.core.compact_tasks(reschedule=False)
+        self.assertFalse(self.core.update_task(0, dict(gone, time="13:00"), gone))
+        self.assertFalse(self.core.remove_task(0, gone))
+        self.assertEqual([t["action"] for t in self.core.config["tasks"]], ["Stop Streaming"])
+
+
+class ReconcileTest(unittest.TestCase):
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        self.messages = []
+        self.core = OBSSchedulerCore("config.json", log_callback=self.messages.append)
+
+    def tearDown(self):
+        self.core.shutdown()
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def reconcile(self, tasks):
+        self.messages.clear()
+        self.core.apply_settings({}, tasks=tasks)
+        self.core.schedule_jobs_from_config(reload=False)
+        summary = [m for m in self.messages if m.startswith("Schedule reconciled")][-1]
+        return summary.split(": ", 1)[1]
+
+    def test_counts_added_removed_and_unchanged(self):
+        daily = {"type": "daily", "time": "10:00", "action": "Start Streaming"}
+        weekly = {"type": "weekly", "days": ["mon"], "time": "11:00", "action": "Stop Streaming"}
+        self.assertEqual(self.reconcile([daily, weekly]), "2 added, 0 removed, 0 unchanged.")
+        jobs = dict(self.core.task_jobs)
+        # Editing a task replaces its job; untouched tasks keep theirs
+        self.assertEqual(self.reconcile([daily, dict(weekly, time="12:00")]), "1 added, 1 removed, 1 unchanged.")
+        self.assertEqual(self.core.task_jobs[task_identity(daily)], jobs[task_identity(daily)])
+        self.assertEqual(self.core.scheduler.job_count(), 2)
+        # Identical duplicates get their own jobs; disabled tasks get none
+        self.assertEqual(self.reconcile([daily, daily, dict(weekly, time="12:00", enabled=False)]),
+                         "1 added, 1 removed, 1 unchanged.")
+        self.assertEqual(self.core.scheduler.job_count(), 2)
+        self.assertEqual(self.reconcile([]), "0 added, 2 removed, 0 unchanged.")
+        self.assertEqual(self.core.scheduler.job_count(), 0)
+
+
+class SQLiteConfigTest(ConfigTest):
+
+    def setUp(self):
+        super().setUp()
+        self.core.shutdown()
+        with open("config.json") as f:
+            config = json.load(f)
+        self.core = OBSSchedulerCore("config.db")
+        self.core.apply_settings(config, tasks=config["tasks"])
+
+    def test_edits_follow_tasks_shifted_by_compaction(self):
+        super().test_edits_follow_tasks_shifted_by_compaction()
+        self.assertEqual(self.core.store.load_config()["tasks"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
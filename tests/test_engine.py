@@ -0,0 +1,113 @@
+import unittest
+from datetime import date, datetime
+
+from obs_engine import ALL_DAYS, CancelJob, DeadlineScheduler, at_date, next_in_weekdays, once_at, weekday_mask
+from support import use_tz
+
+
+def local(text):
+    return datetime.strptime(text, "%Y-%m-%d %H:%M").timestamp()
+
+
+class FakeClock:
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class DSTTest(unittest.TestCase):
+    # 2026-03-08 has 23 hours in New York, 2026-11-01 has 25
+
+    def setUp(self):
+        use_tz(self, "America/New_York")
+
+    def test_at_date_keeps_wall_clock_time(self):
+        for day in ("2026-03-07", "2026-03-08", "2026-03-09", "2026-11-01"):
+            ordinal = date.fromisoformat(day).toordinal()
+            self.assertEqual(at_date(ordinal, 12 * 3600), local(f"{day} 12:00"))
+            self.assertEqual(at_date(ordinal, 18 * 3600 + 30 * 60), local(f"{day} 18:30"))
+
+    def test_next_in_weekdays_across_transition(self):
+        noon = 12 * 3600
+        after = local("2026-03-07 12:00")
+        self.assertEqual(next_in_weekdays(ALL_DAYS, noon, after), local("2026-03-08 12:00"))
+        self.assertEqual(next_in_weekdays(ALL_DAYS, noon, local("2026-03-08 12:00")), local("2026-03-09 12:00"))
+        self.assertEqual(local("2026-03-08 12:00") - after, 23 * 3600)
+        self.assertEqual(next_in_weekdays(ALL_DAYS, noon, local("2026-10-31 12:00")) - local("2026-10-31 12:00"),
+                         25 * 3600)
+
+    def test_next_in_weekdays_skips_to_mask(self):
+        mask, unknown = weekday_mask(["Mon", "friday", "someday"])
+        self.assertEqual(unknown, ["someday"])
+        # 2026-03-08 is a Sunday
+        self.assertEqual(next_in_weekdays(mask, 9 * 3600, local("2026-03-06 10:00")), local("2026-03-09 09:00"))
+        self.assertIsNone(next_in_weekdays(0, 9 * 3600, local("2026-03-06 10:00")))
+
+    def test_daily_job_fires_at_local_time_through_transition(self):
+        clock = FakeClock(local("2026-03-06 13:00"))
+        scheduler = DeadlineScheduler(clock=clock)
+        fired = []
+        scheduler.add_job(lambda after: next_in_weekdays(ALL_DAYS, 12 * 3600, after),
+                          lambda: fired.append(clock.now), "daily")
+        for _ in range(4):
+            clock.now = scheduler.next_run()
+            self.assertEqual(scheduler.run_pending(), 1)
+        self.assertEqual([datetime.fromtimestamp(t).strftime("%m-%d %H:%M") for t in fired],
+                         ["03-07 12:00", "03-08 12:00", "03-09 12:00", "03-10 12:00"])
+
+
+class DeadlineSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock(1000.0)
+        self.scheduler = DeadlineScheduler(clock=self.clock)
+
+    def test_runs_due_jobs_in_deadline_order(self):
+        fired = []
+        for when in (1030.0, 1010.0, 1020.0):
+            self.scheduler.add_job(once_at(when), lambda when=when: fired.append(when))
+        self.assertEqual(self.scheduler.next_run(), 1010.0)
+        self.clock.now = 1025.0
+        self.assertEqual(self.scheduler.run_pending(), 2)
+        self.assertEqual(fired, [1010.0, 1020.0])
+        self.assertEqual(self.scheduler.job_count(), 1)
+
+    def test_removed_and_cancelled_jobs_stop(self):
+        fired = []
+        every = lambda after: after + 10
+        removed = self.scheduler.add_job(every, lambda: fired.append("removed"))
+        self.scheduler.add_job(every, lambda: (fired.append("cancel"), CancelJob)[1])
+        self.assertTrue(self.scheduler.remove_job(removed))
+        self.clock.now = 1010.0
+        self.scheduler.run_pending()
+        self.clock.now = 1020.0
+        self.scheduler.run_pending()
+        self.assertEqual(fired, ["cancel"])
+        self.assertIsNone(self.scheduler.next_run())
+
+    def test_missed_occurrences_are_skipped(self):
+        fired = []
+        self.scheduler.add_job(lambda after: (after // 10 + 1) * 10, lambda: fired.append(self.clock.now))
+        self.clock.now = 1055.0
+        self.assertEqual(self.scheduler.run_pending(), 1)
+        self.assertEqual(fired, [1055.0])
+        self.assertEqual(self.scheduler.next_run(), 1060.0)
+
+    def test_jobs_in_batch_window_run_together(self):
+        batches = []
+        self.scheduler.on_batch = batches.append
+        self.scheduler.batch_window = 0.5
+        self.scheduler.add_job(once_at(1010.0), None, batch="a")
+        self.scheduler.add_job(once_at(1010.3), None, batch="b")
+        self.scheduler.add_job(once_at(1011.0), None, batch="c")
+        self.clock.now = 1010.0
+        self.assertEqual(self.scheduler.run_pending(), 2)
+        self.assertEqual(batches, [[(1010.0, "a"), (1010.3, "b")]])
+        self.assertEqual(self.scheduler.next_run(), 1011.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
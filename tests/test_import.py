@@ -0,0 +1,118 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from obs_core import OBSSchedulerCore
+from obs_import import CHUNK, ImportFormatError, ImportReport, iter_json, iter_jsonl
+
+
+def task(t_time="10:00", action="Start Streaming", **extra):
+    return dict({"type": "daily", "time": t_time, "action": action}, **extra)
+
+
+def accept(entries):
+    report = ImportReport()
+    return [name for name, _ in report.accept(entries)], report
+
+
+class ImportValidationTest(unittest.TestCase):
+
+    def test_json_errors_name_the_preset_line(self):
+        text = json.dumps({
+            "good": [task()],
+            "bad time": [task("25:00")],
+            "bad action": [task(), task(action="Explode")],
+            "bad day": [{"type": "weekly", "days": ["mon", "funday"], "time": "10:00", "action": "Start Streaming"}],
+            "bad date": [{"type": "onetime", "date": "06/01/2026", "time": "10:00", "action": "Start Streaming"}],
+            "not a list": {},
+        }, indent=4)
+        # Preset names start the lines indented by one level
+        line_of = {line.split('"')[1]: f"line {n}" for n, line in enumerate(text.split("\n"), 1)
+                   if line.startswith('    "')}
+        names, report = accept(iter_json(io.StringIO(text)))
+        self.assertEqual(names, ["good"])
+        self.assertEqual((report.imported, report.skipped), (1, 5))
+        self.assertEqual(report.errors, [
+            f"{line_of['bad time']} 'bad time': task 1: Invalid time '25:00'",
+            f"{line_of['bad action']} 'bad action': task 2: unknown action 'Explode'",
+            f"{line_of['bad day']} 'bad day': task 1: unknown day(s) funday",
+            f"{line_of['bad date']} 'bad date': task 1: invalid date '06/01/2026'",
+            f"{line_of['not a list']} 'not a list': expected a list of tasks",
+        ])
+
+    def test_line_numbers_across_buffer_refills(self):
+        # Enough presets that the reader refills its buffer several times
+        presets = {f"p{n}": [task()] for n in range(3 * CHUNK // 50)}
+        presets["last"] = [task("7")]
+        text = json.dumps(presets, indent=4)
+        expected = text.split("\n").index('    "last": [') + 1
+        _, report = accept(iter_json(io.StringIO(text)))
+        self.assertEqual(report.errors, [f"line {expected} 'last': task 1: Invalid time format '7'"])
+        broken = text[:-2] + ",\n    oops\n}"
+        with self.assertRaises(ImportFormatError) as caught:
+            list(iter_json(io.StringIO(broken)))
+        self.assertIn(f"line {broken.count(chr(10))}", str(caught.exception))
+
+    def test_format_errors(self):
+        for text, message in (
+            ("[]", "Expected '{' at line 1, found '['."),
+            ('{\n"a": [],\n\n"b" []}', "Expected ':' at line 4, found '['."),
+            ('{"a": []}\n{}', "Unexpected data after the presets at line 2."),
+            ('{"a": [],\n', "Invalid JSON at line 2: Expecting value."),
+            ('{"a": [],\n7: []}', "Expected a preset name at line 2."),
+        ):
+            with self.assertRaises(ImportFormatError) as caught:
+                list(iter_json(io.StringIO(text)))
+            self.assertIn(message, str(caught.exception))
+
+    def test_jsonl_errors_use_file_lines(self):
+        text = "\n".join([
+            json.dumps({"name": "good", "tasks": [task()]}),
+            "",
+            "{not json",
+            json.dumps([1, 2]),
+            json.dumps({"a": [task()], "b": [task(targets="x", time="1:2:3:4")]}),
+        ])
+        names, report = accept(iter_jsonl(io.StringIO(text)))
+        self.assertEqual(names, ["good", "a"])
+        self.assertEqual(len(report.errors), 3)
+        self.assertTrue(report.errors[0].startswith("line 3: invalid JSON"))
+        self.assertEqual(report.errors[1:], ["line 4: expected an object",
+                                             "line 5 'b': task 1: Invalid time format '1:2:3:4'"])
+
+
+class CoreImportTest(unittest.TestCase):
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        self.core = OBSSchedulerCore("config.json")
+
+    def tearDown(self):
+        self.core.shutdown()
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_import_keeps_valid_presets(self):
+        with open("import.jsonl", "w") as f:
+            f.write(json.dumps({"keep": [task()]}) + "\n" + json.dumps({"drop": [task(action="")]}) + "\n")
+        ok, message, report = self.core.import_presets_file("import.jsonl")
+        self.assertTrue(ok)
+        self.assertEqual(message, "Successfully imported 1 presets. Skipped 1 invalid preset(s).")
+        self.assertEqual(report.errors, ["line 2 'drop': task 1: missing time or action"])
+        self.assertEqual(self.core.presets.names(), ["keep"])
+
+    def test_unreadable_file_imports_nothing(self):
+        with open("import.json", "w") as f:
+            f.write('{"keep": [')
+        ok, message, _ = self.core.import_presets_file("import.json")
+        self.assertFalse(ok)
+        self.assertTrue(message.startswith("Invalid JSON at line 1"))
+        self.assertEqual(self.core.presets.names(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
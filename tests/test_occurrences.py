@@ -0,0 +1,79 @@
+import unittest
+from datetime import datetime
+
+from obs_core import compile_task
+from obs_occurrences import DAY, OccurrenceIndex
+from support import use_tz
+
+
+def local(text):
+    return datetime.strptime(text, "%Y-%m-%d %H:%M").timestamp()
+
+
+def daily(t_time, action="Start Streaming", **extra):
+    return compile_task(dict({"type": "daily", "time": t_time, "action": action}, **extra))
+
+
+class FakeClock:
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class OccurrenceIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        use_tz(self, "America/New_York")
+        # Monday 2026-06-01
+        self.clock = FakeClock(local("2026-06-01 09:00"))
+        self.index = OccurrenceIndex(horizon=3 * DAY, clock=self.clock)
+
+    def fires(self, entries):
+        return [(datetime.fromtimestamp(t).strftime("%d %H:%M"), compiled.action) for t, compiled in entries]
+
+    def test_next_in_fire_order(self):
+        self.index.add_many([
+            ("a", daily("10:00")),
+            ("b", compile_task({"type": "weekly", "days": ["tue"], "time": "08:00", "action": "Stop Streaming"})),
+            ("c", compile_task({"type": "onetime", "date": "2026-06-01", "time": "09:30", "action": "Stop Streaming"})),
+        ])
+        self.assertEqual(self.fires(self.index.next(4)), [
+            ("01 09:30", "Stop Streaming"), ("01 10:00", "Start Streaming"),
+            ("02 08:00", "Stop Streaming"), ("02 10:00", "Start Streaming"),
+        ])
+        # Passed fires are dropped as the clock moves on
+        self.clock.now = local("2026-06-01 12:00")
+        self.assertEqual(self.fires(self.index.next(1)), [("02 08:00", "Stop Streaming")])
+
+    def test_between_extends_the_horizon(self):
+        self.index.add("a", daily("10:00"))
+        self.assertEqual(len(self.index), 3)
+        found = self.index.between(local("2026-06-06 00:00"), local("2026-06-08 00:00"))
+        self.assertEqual(self.fires(found), [("06 10:00", "Start Streaming"), ("07 10:00", "Start Streaming")])
+
+    def test_remove_one_and_many(self):
+        self.index.add_many([("a", daily("10:00")), ("b", daily("11:00")), ("c", daily("12:00"))])
+        self.index.remove("b")
+        self.assertEqual({t for t, _ in self.fires(self.index.next(10))},
+                         {f"{d:02} {h}" for d in (1, 2, 3) for h in ("10:00", "12:00")})
+        self.index.remove_many(["a", "c", "unknown"])
+        self.assertEqual(len(self.index), 0)
+        self.index.add("a", daily("10:00"))
+        self.assertEqual(len(self.index.next(10)), 3)
+
+    def test_conflicts_per_endpoint(self):
+        self.index.add_many([
+            ("a", daily("10:00", targets=["x", "y"])),
+            ("b", daily("10:01", "Stop Streaming", targets=["x"])),
+            ("c", daily("10:03", targets=["y"])),
+        ])
+        conflicts = self.index.conflicts(90, end=local("2026-06-02 00:00"))
+        self.assertEqual([(name, self.fires(run)) for name, run in conflicts],
+                         [("x", [("01 10:00", "Start Streaming"), ("01 10:01", "Stop Streaming")])])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import obs_persist
+from obs_core import OBSSchedulerCore
+from obs_presets import PresetStore
+
+
+class AtomicWriteTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = os.path.join(self._tmp.name, "config.json")
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_previous_generation_is_kept_as_backup(self):
+        obs_persist.atomic_write(self.path, b'{"n": 1}')
+        self.assertFalse(os.path.exists(obs_persist.backup_path(self.path)))
+        obs_persist.atomic_write(self.path, b'{"n": 2}')
+        self.assertEqual(self.read(self.path), b'{"n": 2}')
+        self.assertEqual(self.read(obs_persist.backup_path(self.path)), b'{"n": 1}')
+        self.assertEqual(sorted(os.listdir(self._tmp.name)), ["config.json", "config.json.bak"])
+
+    def test_damaged_file_does_not_replace_backup(self):
+        obs_persist.atomic_write(self.path, b'{"n": 1}')
+        obs_persist.atomic_write(self.path, b"{trunc")
+        obs_persist.atomic_write(self.path, b'{"n": 3}')
+        self.assertEqual(self.read(obs_persist.backup_path(self.path)), b'{"n": 1}')
+
+    def test_failed_write_leaves_file_untouched(self):
+        obs_persist.atomic_write(self.path, b'{"n": 1}')
+
+        def fail(f):
+            f.write(b'{"n": ')
+            raise OSError("disk full")
+        with self.assertRaises(OSError):
+            obs_persist.atomic_write_with(self.path, fail)
+        self.assertEqual(self.read(self.path), b'{"n": 1}')
+        self.assertEqual(os.listdir(self._tmp.name), ["config.json"])
+
+    def test_load_recovers_from_backup(self):
+        obs_persist.atomic_write(self.path, b'{"n": 1}')
+        obs_persist.atomic_write(self.path, b'{"n": 2}')
+        with open(self.path, "wb") as f:
+            f.write(b'{"n": ') # torn by a crash outside atomic_write
+        messages = []
+        self.assertEqual(obs_persist.load_json(self.path, log=messages.append), {"n": 1})
+        self.assertTrue(messages[-1].startswith("Recovered"))
+        os.remove(obs_persist.backup_path(self.path))
+        self.assertEqual(obs_persist.load_json(self.path, default={}), {})
+
+
+class VerifiedBackupTest(unittest.TestCase):
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        self.checks = mock.patch("obs_persist._is_valid_json", wraps=obs_persist._is_valid_json)
+        self.is_valid_json = self.checks.start()
+        self.addCleanup(self.checks.stop)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_preset_saves_do_not_reparse_own_file(self):
+        store = PresetStore("presets.json")
+        for n in range(3):
+            store.set(f"p{n}", [])
+        self.assertEqual(self.is_valid_json.call_count, 0)
+        with open("presets.json.bak") as f:
+            self.assertEqual(list(json.load(f)), ["p0", "p1"])
+
+    def test_config_writes_verify_only_foreign_content(self):
+        core = OBSSchedulerCore("config.json")
+        self.addCleanup(core.shutdown)
+        core.write_config_data(b'{"n": 1}')
+        core.write_config_data(b'{"n": 2}')
+        self.assertEqual(self.is_valid_json.call_count, 0)
+        # A damaged hand edit is parsed and not kept as the backup
+        with open("config.json", "w") as f:
+            f.write("{broken")
+        core.write_config_data(b'{"n": 3}')
+        self.assertEqual(self.is_valid_json.call_count, 1)
+        with open("config.json.bak") as f:
+            self.assertEqual(json.load(f), {"n": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import unittest
+
+from obs_presets import PresetStore
+
+
+def task(t_time, action="Start Streaming"):
+    return {"type": "daily", "time": t_time, "action": action}
+
+
+class PresetStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = os.path.join(self._tmp.name, "presets.json")
+        self.store = PresetStore(self.path)
+
+    def write_foreign(self, presets):
+        # Another process replaces the file
+        tmp = self.path + ".other"
+        with open(tmp, "w") as f:
+            json.dump(presets, f)
+        os.replace(tmp, self.path)
+
+    def test_file_matches_plain_json_dump(self):
+        self.store.update({"morning": [task("08:00")], "evening": [task("20:00", "Stop Streaming")]})
+        self.store.set("morning", [task("09:00")])
+        with open(self.path) as f:
+            text = f.read()
+        self.assertEqual(text, json.dumps({"morning": [task("09:00")], "evening": [task("20:00", "Stop Streaming")]},
+                                          indent=4))
+
+    def test_external_edit_invalidates_cache(self):
+        self.store.set("morning", [task("08:00")])
+        self.write_foreign({"night": [task("23:00")]})
+        self.assertEqual(self.store.names(), ["night"])
+        # The next save builds on the edited file, not the stale cache
+        self.store.set("morning", [task("08:30")])
+        with open(self.path) as f:
+            self.assertEqual(list(json.load(f)), ["night", "morning"])
+
+    def test_touch_without_change_keeps_cache(self):
+        self.store.set("morning", [task("08:00")])
+        fragments = self.store._fragments
+        os.utime(self.path, ns=(0, 0))
+        self.assertEqual(self.store.get("morning"), [task("08:00")])
+        self.assertIs(self.store._fragments, fragments)
+        self.assertIn("morning", fragments)
+
+    def test_returned_tasks_are_copies(self):
+        self.store.set("morning", [task("08:00")])
+        tasks = self.store.get("morning")
+        tasks[0]["time"] = "10:00"
+        self.assertEqual(self.store.items(), [("morning", [task("08:00")])])
+
+    def test_damaged_file_falls_back_to_backup(self):
+        self.store.set("morning", [task("08:00")])
+        self.store.set("evening", [task("20:00")])
+        with open(self.path, "w") as f:
+            f.write('{"morning": [')
+        messages = []
+        store = PresetStore(self.path, log=messages.append)
+        self.assertEqual(store.names(), ["morning"])
+        self.assertTrue(any(m.startswith("Recovered") for m in messages))
+
+    def test_delete(self):
+        self.store.update({"a": [], "b": []})
+        self.assertTrue(self.store.delete("a"))
+        self.assertFalse(self.store.delete("a"))
+        self.assertNotIn("a", self.store)
+        self.assertEqual(PresetStore(self.path).names(), ["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
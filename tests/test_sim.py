@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from obs_sim import simulate
+from support import use_tz
+
+
+def local(text):
+    return datetime.strptime(text, "%Y-%m-%d %H:%M").timestamp()
+
+
+CONFIG = {"tasks": [
+    {"type": "daily", "time": "10:00", "action": "Start Streaming"},
+    {"type": "daily", "time": "10:00", "action": "Start Recording", "targets": ["b"]},
+    {"type": "weekly", "days": ["mon", "wed"], "time": "08:00", "action": "Stop Streaming"},
+    {"type": "onetime", "date": "2026-06-03", "time": "12:00", "action": "Stop Recording"},
+    {"type": "onetime", "date": "2026-07-01", "time": "12:00", "action": "Stop Recording"},
+    {"type": "daily", "time": "11:00", "action": "Start Streaming", "enabled": False},
+]}
+
+
+class SimulationTest(unittest.TestCase):
+
+    def setUp(self):
+        use_tz(self, "America/New_York")
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_counts_for_one_week(self):
+        # 2026-06-01 is a Monday
+        result = simulate(CONFIG, days=7, start=local("2026-06-01 00:00"))
+        self.assertEqual(result.total, 17)
+        self.assertEqual(list(result.per_day), [f"2026-06-0{d}" for d in range(1, 8)])
+        self.assertEqual(dict(result.per_day["2026-06-03"]),
+                         {"Start Streaming": 1, "Start Recording": 1, "Stop Streaming": 1, "Stop Recording": 1})
+        self.assertEqual(dict(result.per_day["2026-06-02"]), {"Start Streaming": 1, "Start Recording": 1})
+        self.assertEqual(result.timeline[:3], [
+            (local("2026-06-01 08:00"), "Stop Streaming", ("default",)),
+            (local("2026-06-01 10:00"), "Start Streaming", ("default",)),
+            (local("2026-06-01 10:00"), "Start Recording", ("b",)),
+        ])
+        self.assertEqual(os.listdir("."), [])
+
+    def test_counts_without_timeline(self):
+        result = simulate(CONFIG, days=7, start=local("2026-06-01 00:00"), keep_timeline=False)
+        self.assertIsNone(result.timeline)
+        self.assertEqual(result.total, 17)
+
+    def test_daily_task_over_dst_change(self):
+        config = {"tasks": [{"type": "daily", "time": "02:30", "action": "Start Streaming"},
+                            {"type": "daily", "time": "12:00", "action": "Stop Streaming"}]}
+        result = simulate(config, days=3, start=local("2026-03-07 00:00"))
+        self.assertEqual({day: sum(counts.values()) for day, counts in result.per_day.items()},
+                         {"2026-03-07": 2, "2026-03-08": 2, "2026-03-09": 2})
+        self.assertIn((local("2026-03-08 12:00"), "Stop Streaming", ("default",)), result.timeline)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from obs_sqlite import SQLiteStore, migrate_json
+from support import use_tz
+
+
+def daily(t_time, action="Start Streaming", **extra):
+    return dict({"type": "daily", "time": t_time, "action": action}, **extra)
+
+
+class SQLiteStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "config.db")
+        self.store = SQLiteStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self._tmp.cleanup()
+
+    def test_settings_save_keeps_task_rows(self):
+        self.store.save_config({"host": "a", "tasks": [daily("10:00", targets=["x"]), daily("11:00")]})
+        row_ids = list(self.store._row_ids)
+        self.store.save_settings({"host": "b", "tasks": []})
+        config = self.store.load_config()
+        self.assertEqual(config["host"], "b")
+        self.assertEqual([t["time"] for t in config["tasks"]], ["10:00", "11:00"])
+        self.assertEqual(self.store._row_ids, row_ids)
+
+    def reopen(self):
+        self.store.close()
+        self.store = SQLiteStore(self.path)
+        return self.store.load_config()
+
+    def test_config_round_trip(self):
+        config = {"host": "obs.local", "port": 4455, "endpoints": {"b": {"host": "b.local"}},
+                  "tasks": [daily("10:00", targets=["b"]), daily("09:00", enabled=False),
+                            {"type": "weekly", "days": ["mon", "bogus"], "time": "x", "action": "Stop Streaming"}]}
+        self.store.save_config(config)
+        self.assertEqual(self.reopen(), config)
+
+    def test_single_task_edits_round_trip(self):
+        self.store.save_config({"tasks": [daily("10:00"), daily("11:00"), daily("12:00")]})
+        self.store.load_config()
+        self.store.update_task(1, daily("11:30", targets=["b"]))
+        self.store.remove_task(0)
+        self.store.add_task(daily("13:00"))
+        self.assertEqual([t["time"] for t in self.reopen()["tasks"]], ["11:30", "12:00", "13:00"])
+        rows = self.store._db.execute("SELECT endpoint FROM task_targets").fetchall()
+        self.assertEqual(sorted(endpoint for (endpoint,) in rows), ["b", "default", "default"])
+
+    def test_presets_round_trip(self):
+        self.store.presets.update({"b": [daily("08:00")], "a": []})
+        self.store.presets.set("b", [daily("09:00")])
+        self.reopen()
+        self.assertEqual(self.store.presets.items(), [("b", [daily("09:00")]), ("a", [])])
+        self.assertTrue(self.store.presets.delete("a"))
+        self.assertNotIn("a", self.store.presets)
+
+    def test_tasks_between_over_several_days(self):
+        use_tz(self, "America/New_York")
+        self.store.save_config({"tasks": [
+            daily("10:00"),
+            daily("11:00", enabled=False),
+            {"type": "weekly", "days": ["wed"], "time": "10:00", "action": "Stop Streaming", "targets": ["b"]},
+            {"type": "onetime", "date": "2026-06-02", "time": "23:59", "action": "Stop Streaming"},
+        ]})
+        # 2026-06-01 is a Monday; the window ends right at Wednesday 10:00
+        start = datetime(2026, 6, 1, 10, 0).timestamp()
+        found = self.store.tasks_between(start, datetime(2026, 6, 3, 10, 0).timestamp())
+        self.assertEqual([(datetime.fromtimestamp(when).strftime("%d %H:%M"), task["action"]) for when, task in found],
+                         [("01 10:00", "Start Streaming"), ("02 10:00", "Start Streaming"),
+                          ("02 23:59", "Stop Streaming")])
+        found = self.store.tasks_between(start, datetime(2026, 6, 4).timestamp(), endpoints=["b"])
+        self.assertEqual([datetime.fromtimestamp(when).strftime("%d %H:%M") for when, _ in found], ["03 10:00"])
+
+    def test_cascade_uses_task_index(self):
+        plan = self.store._db.execute("EXPLAIN QUERY PLAN DELETE FROM task_targets WHERE task_id = 1").fetchall()
+        self.assertIn("task_targets_task", " ".join(str(row[-1]) for row in plan))
+
+    def test_tasks_between_on_dst_day(self):
+        use_tz(self, "America/New_York")
+        self.store.save_config({"tasks": [
+            daily("12:00"),
+            {"type": "onetime", "date": "2026-03-08", "time": "18:30", "action": "Stop Streaming"},
+        ]})
+        # 2026-03-08 has 23 hours in New York
+        for t_time, action in (("12:00", "Start Streaming"), ("18:30", "Stop Streaming")):
+            fire = datetime.strptime(f"2026-03-08 {t_time}", "%Y-%m-%d %H:%M").timestamp()
+            found = self.store.tasks_between(fire - 300, fire + 300)
+            self.assertEqual([(when, task["action"]) for when, task in found], [(fire, action)])
+
+    def test_migrate_ignores_non_dict_presets(self):
+        config_file = os.path.join(self._tmp.name, "config.json")
+        presets_file = os.path.join(self._tmp.name, "presets.json")
+        with open(config_file, "w") as f:
+            json.dump({"tasks": [daily("10:00")]}, f)
+        with open(presets_file, "w") as f:
+            json.dump(["not", "a", "dict"], f)
+        messages = []
+        db_path = os.path.join(self._tmp.name, "migrated.db")
+        self.assertTrue(migrate_json(config_file, presets_file, db_path, log=messages.append))
+        self.assertIn("1 task(s) and 0 preset(s)", messages[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from obs_watch import ConfigWatcher
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+class ConfigWatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = os.path.join(self._tmp.name, "config.json")
+        self.write(b'{"tasks": []}')
+        self.changes = []
+
+    def write(self, data):
+        with open(self.path, "wb") as f:
+            f.write(data)
+
+    def replace(self, data):
+        # Atomic rename-over, like atomic_write
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+    def watcher(self, polling=False):
+        watcher = ConfigWatcher(self.path, self.changes.append, debounce=0.02, poll_interval=0.02)
+        if polling:
+            def unavailable():
+                raise OSError("disabled for this test")
+            watcher._init_inotify = unavailable
+        watcher.start()
+        self.addCleanup(watcher.stop)
+        return watcher
+
+    def test_check_skips_unchanged_content(self):
+        watcher = ConfigWatcher(self.path, self.changes.append)
+        watcher._check()
+        watcher._check()
+        self.assertEqual(self.changes, [b'{"tasks": []}'])
+        self.write(b'{"tasks": [1]}')
+        watcher._check()
+        self.assertEqual(self.changes[1:], [b'{"tasks": [1]}'])
+
+    def test_acknowledged_write_is_not_reported(self):
+        watcher = ConfigWatcher(self.path, self.changes.append)
+        watcher.acknowledge(b'{"tasks": [1]}')
+        self.write(b'{"tasks": [1]}')
+        watcher._check()
+        self.assertEqual(self.changes, [])
+
+    def check_reports_changes_once(self, polling):
+        watcher = self.watcher(polling)
+        self.assertEqual(watcher.mode, "polling" if polling else "inotify")
+        self.replace(b'{"tasks": [1]}')
+        self.assertTrue(wait_for(lambda: self.changes == [b'{"tasks": [1]}']))
+        # Same bytes again (new inode and mtime) and a write we made ourselves
+        self.replace(b'{"tasks": [1]}')
+        watcher.acknowledge(b'{"tasks": [2]}')
+        self.write(b'{"tasks": [2]}')
+        self.write(b'{"tasks": [3]}')
+        self.assertTrue(wait_for(lambda: len(self.changes) > 1))
+        time.sleep(0.2)
+        self.assertEqual(self.changes, [b'{"tasks": [1]}', b'{"tasks": [3]}'])
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+    def test_inotify_reports_changes_once(self):
+        self.check_reports_changes_once(polling=False)
+
+    def test_polling_reports_changes_once(self):
+        self.check_reports_changes_once(polling=True)
+
+
+if __name__ == "__main__":
+    unittest.main()